@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from line_framer import make_framer
+from byte_format import make_decoder
+
+
+def cobs_encode(data):
+    out = bytearray()
+    for block in data.split(b'\0'):
+        while len(block) >= 254:
+            out.append(0xFF)
+            out += block[:254]
+            block = block[254:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out) + b'\0'
+
+
+def slip_encode(data):
+    return b'\xc0' + data.replace(b'\xdb', b'\xdb\xdd').replace(b'\xc0', b'\xdb\xdc') + b'\xc0'
+
+
+def make_stream(spec, frame_count, frame_size, seed=1):
+    # 프레이밍 방식에 맞게 감싼 무작위 바이너리 프레임들
+    rng = random.Random(seed)
+    frames = [rng.randbytes(frame_size) for _ in range(frame_count)]
+    if spec == "COBS":
+        return b''.join(cobs_encode(frame) for frame in frames)
+    if spec == "SLIP":
+        return b''.join(slip_encode(frame) for frame in frames)
+    if spec.startswith("LEN:"):
+        size = int(spec.split(":")[1])
+        return b''.join(len(frame).to_bytes(size, 'little') + frame for frame in frames)
+    return b''.join(frames)
+
+
+def run(stream, spec, display, chunk):
+    # 읽기 스레드와 같은 경로: 청크 -> 프레이밍 -> 프레임 묶음을 한 번에 문자열로
+    framer = make_framer(spec)
+    decode = make_decoder(display)
+    lines = 0
+    view = memoryview(stream)
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk):
+        frames = framer.feed(view[offset:offset + chunk])
+        if frames:
+            lines += len(decode(frames))
+    return time.perf_counter() - start, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="바이너리 프레이밍(FIXED/LEN/COBS/SLIP)과 hex 표시 처리 속도를 잰다")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--frame-size", type=int, default=32)
+    parser.add_argument("--chunk", type=int, default=4096, help="한 번에 읽는 바이트 수")
+    parser.add_argument("--baud", type=int, default=3000000, help="비교할 포트 속도")
+    args = parser.parse_args()
+
+    line_rate = args.baud / 10 / 1e6
+    print(f"port @ {args.baud} baud = {line_rate:.2f} MB/s")
+    print(f"{'framing':<10} {'display':<7} {'MB':>6} {'MB/s':>8} {'frames/s':>10} {'x port':>7}")
+    for spec in (f"FIXED:{args.frame_size}", "LEN:2", "COBS", "SLIP"):
+        stream = make_stream(spec, args.frames, args.frame_size)
+        for display in ("text", "hex"):
+            elapsed, lines = run(stream, spec, display, args.chunk)
+            rate = len(stream) / elapsed / 1e6
+            print(f"{spec:<10} {display:<7} {len(stream) / 1e6:>6.2f} {rate:>8.1f} {lines / elapsed:>10.0f} "
+                  f"{rate / line_rate:>6.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
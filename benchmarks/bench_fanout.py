@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import selectors
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanout_server import FanoutServer
+
+
+def drain(port, count, ready, done, result):
+    # 다른 프로세스에서 클라이언트 count 개를 열고 받은 바이트 수를 센다
+    sockets = [socket.create_connection(("127.0.0.1", port)) for _ in range(count)]
+    selector = selectors.DefaultSelector()
+    received = {}
+    for sock in sockets:
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+        received[sock] = 0
+    ready.set()
+    while not done.is_set() or any(key for key in selector.select(0.2)):
+        for key, _ in selector.select(0.2):
+            try:
+                data = key.fileobj.recv(262144)
+            except BlockingIOError:
+                continue
+            received[key.fileobj] += len(data)
+    result.put([received[sock] for sock in sockets])
+
+
+def run(clients, rate, seconds, batch, slow):
+    # 읽기 스레드처럼 batch 줄씩 rate 줄/초로 넣고, 이 프로세스(발행 + 보내기 스레드)가 쓴 CPU 를 잰다
+    server = FanoutServer(port=0, max_client_bytes=1024 * 1024)
+    server.start()
+    ready = multiprocessing.Event()
+    done = multiprocessing.Event()
+    result = multiprocessing.Queue()
+    reader = None
+    if clients:
+        reader = multiprocessing.Process(target=drain, args=(server.port, clients, ready, done, result))
+        reader.start()
+        ready.wait()
+    stalled = []
+    for _ in range(slow):
+        # 읽지 않는 클라이언트. 커널 버퍼가 작아야 서버 쪽 큐가 금방 찬다
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(("127.0.0.1", server.port))
+        stalled.append(sock)
+    while len(server.clients) < clients + slow:
+        time.sleep(0.01)
+    lines = [f"sensor temp=23.{i % 10} rpm={1000 + i} status=OK seq={i}" for i in range(batch)]
+    interval = batch / rate
+    batches = int(rate * seconds / batch)
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for index in range(batches):
+        server.publish_lines([(time.time_ns(), line) for line in lines])
+        delay = start + (index + 1) * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    received = []
+    if reader is not None:
+        time.sleep(0.5)
+        done.set()
+        received = result.get()
+        reader.join()
+    stats = server.stats()
+    server.stop()
+    for sock in stalled:
+        sock.close()
+    return cpu / elapsed, stats, received
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 서버가 클라이언트 수에 따라 쓰는 CPU 와 느린 클라이언트 처리를 잰다")
+    parser.add_argument("--rate", type=int, default=20000, help="초당 줄 수")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--batch", type=int, default=200, help="한 번에 넣는 줄 수 (읽기 한 번에 나온 줄)")
+    args = parser.parse_args()
+
+    print(f"{args.rate} lines/s, {args.batch} lines per batch")
+    print(f"{'clients':>7} {'stalled':>7} {'cpu %':>7} {'MB/s out':>9} {'min recv %':>10} {'dropped MB':>10}")
+    for clients, slow in ((0, 0), (1, 0), (10, 0), (50, 0), (50, 1)):
+        load, stats, received = run(clients, args.rate, args.seconds, args.batch, slow)
+        published = stats["bytes_published"]
+        sent = sum(received)
+        share = min(received) / published * 100 if received and published else 0
+        print(f"{clients:>7} {slow:>7} {load * 100:>6.1f}% {sent / args.seconds / 1e6:>9.1f} {share:>9.1f}% "
+              f"{stats['dropped_bytes'] / 1e6:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import field_extractor
+from field_extractor import FieldRule, FieldExtractor, FieldStore, FieldSeries, export_fields
+
+RULES = {
+    "named": [FieldRule("temp"), FieldRule("vbat")],
+    "regex": [FieldRule("adc", r"ch\d raw=0x[0-9a-f]+ mv=(?P<mv>\d+)")],
+    "auto": [FieldRule("*")],
+}
+
+
+def make_lines(count, seed=1):
+    rng = random.Random(seed)
+    templates = [
+        "I ({tick}) sensor: temp={temp:.1f} vbat={vbat:.2f}",
+        "I ({tick}) adc: ch{channel} raw=0x{raw:04x} mv={mv}",
+        "D ({tick}) main: loop {tick} heap={heap}",
+        "W ({tick}) wifi: 연결 끊김, 재시도 {channel}",
+    ]
+    timestamp_ns = time.time_ns() - count * 100_000
+    lines = []
+    for tick in range(count):
+        timestamp_ns += 100_000
+        lines.append((timestamp_ns, rng.choice(templates).format(
+            tick=tick, temp=40 + rng.random() * 5, vbat=3.6 + rng.random() * 0.2, channel=rng.randint(0, 7),
+            raw=rng.randint(0, 0xfff), mv=rng.randint(0, 3300), heap=rng.randint(10000, 50000))))
+    return lines
+
+
+def fill_series(samples):
+    series = FieldSeries("value", max_samples=samples)
+    rng = random.Random(2)
+    timestamp_ns = time.time_ns() - samples * 1000
+    for index in range(samples):
+        series.append(timestamp_ns + index * 1000, rng.gauss(0, 1))
+    return series
+
+
+def time_series(series, buckets, repeat):
+    end_ns = series.last_timestamp() + 1
+    start_ns = series.timestamps[series.head]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        series.stats(start_ns)
+    stats_seconds = (time.perf_counter() - started) / repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        points = series.decimate(start_ns, end_ns, buckets)
+    decimate_seconds = (time.perf_counter() - started) / repeat
+    return stats_seconds, decimate_seconds, len(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="줄마다 필드를 뽑는 비용과 수백만 표본의 통계/그래프 줄이기 시간을 잰다")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--samples", default="100000,1000000,2000000", help="통계/줄이기를 잴 표본 수 목록")
+    parser.add_argument("--buckets", type=int, default=800, help="그래프 가로 픽셀 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    entries = make_lines(args.lines)
+    print(f"{'rules':<8} {'us/line':>8} {'samples':>9}")
+    for name, rules in RULES.items():
+        store = FieldStore(FieldExtractor(rules), "COM3")
+        started = time.perf_counter()
+        for index in range(0, len(entries), 200):
+            store.extract(entries[index:index + 200])
+        seconds = time.perf_counter() - started
+        print(f"{name:<8} {seconds / len(entries) * 1e6:>8.2f} {store.samples:>9}")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for extension in (".csv", ".npz"):
+            started = time.perf_counter()
+            success, message = export_fields([store], os.path.join(out_dir, "fields" + extension))
+            print(f"export {extension}: {(time.perf_counter() - started) * 1000:.0f}ms"
+                  + ("" if success else f" ({message})"))
+
+    numpy = field_extractor.numpy
+    modes = [("numpy", numpy)] if numpy is not None else []
+    modes.append(("python", None))
+    print(f"{'samples':>9} {'mode':<7} {'stats':>9} {'decimate':>9} {'points':>7}")
+    for samples in (int(value) for value in args.samples.split(",")):
+        series = fill_series(samples)
+        for mode, module in modes:
+            field_extractor.numpy = module
+            stats_seconds, decimate_seconds, points = time_series(series, args.buckets, args.repeat)
+            print(f"{samples:>9} {mode:<7} {stats_seconds * 1000:>7.1f}ms {decimate_seconds * 1000:>7.1f}ms "
+                  f"{points:>7}")
+        field_extractor.numpy = numpy
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
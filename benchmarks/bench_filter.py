@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from line_store import LineStore
+from log_filter import LineIndex, FilteredLines, parse_filter
+
+TEMPLATES = [
+    "I ({tick}) wifi: sta connected, rssi=-{value}",
+    "W ({tick}) sensor: temp={value}.{frac}C over limit",
+    "I ({tick}) adc: ch{channel} raw=0x{hex} mv={value}",
+    "E ({tick}) uart: rx overrun, dropped {value} bytes",
+    "D ({tick}) main: loop {tick} heap={value}",
+    "I ({tick}) mqtt: publish topic=dev/{channel}/state len={value}",
+    "W ({tick}) power: 전압 저하 {value}mV",
+    "E ({tick}) i2c: nak from 0x{hex} retry {channel}",
+]
+FILTERS = [
+    "wifi",
+    "overrun",
+    "nak -retry",
+    "port:COM3 sensor",
+    "re:temp=\\d{3}\\.",
+    "-loop",
+    "전압",
+    "publish state",
+]
+# 빈 줄이나 텍스트 끝에서 맞는 정규식. 예전에는 끝에서 맞으면 처음부터 다시 찾느라 멈추지 않았다
+EDGE_FILTERS = ["re:^$", "re:$", "re:^", "-re:^$", "re:a$", "re:^b"]
+EDGE_LINES = ["a", "", "b", "", "ba", ""]
+
+
+def make_lines(count, ports, seed=1):
+    rng = random.Random(seed)
+    timestamp_ns = time.time_ns() - count * 100_000
+    lines = []
+    for tick in range(count):
+        timestamp_ns += 100_000
+        text = rng.choice(TEMPLATES).format(tick=tick, value=rng.randint(0, 999), frac=rng.randint(0, 9),
+                                            channel=rng.randint(0, 7), hex=f"{rng.randint(0, 0xffff):04x}")
+        lines.append((timestamp_ns, f"[{rng.choice(ports)}] {text}"))
+    return lines
+
+
+def check_filters(entries, filters):
+    # 보관된 줄 전체에 적용한 결과가 새 줄을 하나씩 검사한 결과와 같은지 확인한다
+    store = LineStore()
+    index = LineIndex(store)
+    store.append_batch(entries)
+    index.update()
+    for text in filters:
+        line_filter = parse_filter(text)
+        view = FilteredLines(store, index, line_filter)
+        empty = LineStore()
+        checker = FilteredLines(empty, LineIndex(empty), line_filter)
+        expected = [seq for seq, (timestamp_ns, line) in enumerate(entries) if checker.matches(timestamp_ns, line)]
+        if list(view.seqs) != expected:
+            raise AssertionError(f"필터 '{text}' 결과가 다릅니다: {list(view.seqs)[:10]} != {expected[:10]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보관된 기록 전체에 필터를 바꿔 적용하는 시간과 줄마다의 색인/검사 비용을 잰다")
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--batch", type=int, default=200, help="한 번에 넣는 줄 수 (렌더 루프 배치와 비슷하게)")
+    args = parser.parse_args()
+
+    entries = make_lines(args.lines, ["COM3", "COM4", "ttyUSB0"])
+    base_ns = entries[0][0]
+    check_filters([(base_ns + offset, line) for offset, line in enumerate(EDGE_LINES)], EDGE_FILTERS)
+    check_filters(entries[:20000], FILTERS)
+    store = LineStore()
+    started = time.perf_counter()
+    for index in range(0, len(entries), args.batch):
+        store.append_batch(entries[index:index + args.batch])
+    store_seconds = time.perf_counter() - started
+
+    store = LineStore()
+    index = LineIndex(store)
+    started = time.perf_counter()
+    for offset in range(0, len(entries), args.batch):
+        store.append_batch(entries[offset:offset + args.batch])
+        index.update()
+    indexed_seconds = time.perf_counter() - started
+    print(f"ingest: {store_seconds / len(entries) * 1e6:.2f} us/line store only, "
+          f"{(indexed_seconds - store_seconds) / len(entries) * 1e6:.2f} us/line index, "
+          f"{len(index.postings)} tokens")
+
+    print(f"{'filter':<24} {'lines':>8} {'apply':>9} {'per new line':>13}")
+    for text in FILTERS:
+        line_filter = parse_filter(text)
+        started = time.perf_counter()
+        view = FilteredLines(store, index, line_filter)
+        apply_seconds = time.perf_counter() - started
+        sample = entries[:20000]
+        started = time.perf_counter()
+        for timestamp_ns, line in sample:
+            view.matches(timestamp_ns, line)
+        check_seconds = (time.perf_counter() - started) / len(sample)
+        print(f"{text:<24} {len(view):>8} {apply_seconds * 1000:>7.1f}ms {check_seconds * 1e6:>10.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
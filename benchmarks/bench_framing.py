@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serial
+from line_framer import make_framer
+
+
+def make_payload(line_count, line_length):
+    lines = []
+    for i in range(line_count):
+        body = f"[{i:08d}] sensor=ok temp=41.2 vbat=3.71 "
+        lines.append((body + "x" * max(0, line_length - len(body))).encode('utf-8') + b'\r\n')
+    return b''.join(lines)
+
+
+class LegacySplitJoin:
+    # 기존 UARTHandler.read_data 의 split/join 경로
+    def __init__(self):
+        self.read_buffer = bytearray()
+
+    def feed(self, data):
+        self.read_buffer += data
+        if b'\n' in self.read_buffer:
+            lines = self.read_buffer.split(b'\n')
+            self.read_buffer = lines[-1]
+            return b'\n'.join(lines[:-1]).decode('utf-8', errors='replace').strip()
+        return None
+
+
+def capture_chunks(port, payload, chunk_size):
+    # loop:// 는 바이트 단위로 큐에 넣기 때문에 전송 시간은 따로 측정하고,
+    # 실제로 읽힌 청크 경계를 그대로 재사용해서 프레이밍 비용만 비교한다
+    chunks = []
+    start = time.perf_counter()
+    for offset in range(0, len(payload), chunk_size):
+        port.write(payload[offset:offset + chunk_size])
+        while port.in_waiting:
+            chunks.append(port.read(port.in_waiting))
+    return time.perf_counter() - start, chunks
+
+
+def run_legacy(chunks):
+    framer = LegacySplitJoin()
+    entries = 0
+    start = time.perf_counter()
+    for data in chunks:
+        if framer.feed(data):
+            entries += 1
+    return time.perf_counter() - start, entries
+
+
+def run_legacy_lines(chunks):
+    # 기존 경로에서 줄 단위 항목을 얻으려면 디코딩된 덩어리를 다시 나눠야 한다
+    framer = LegacySplitJoin()
+    entries = 0
+    start = time.perf_counter()
+    for data in chunks:
+        text = framer.feed(data)
+        if text:
+            entries += len(text.split('\n'))
+    return time.perf_counter() - start, entries
+
+
+def run_framer_only(chunks, spec):
+    # 프레이밍만 (줄마다 디코딩하는 비용 제외)
+    framer = make_framer(spec)
+    entries = 0
+    start = time.perf_counter()
+    for data in chunks:
+        entries += len(framer.feed(data))
+    return time.perf_counter() - start, entries
+
+
+def run_framer(chunks, spec):
+    framer = make_framer(spec)
+    entries = 0
+    start = time.perf_counter()
+    for data in chunks:
+        frames = framer.feed(data)
+        if frames:
+            entries += len([frame.decode('utf-8', errors='replace') for frame in frames])
+    return time.perf_counter() - start, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="split/join 경로와 LineFramer 비교 (loop://)")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--line-length", type=int, default=80)
+    parser.add_argument("--chunk", type=int, default=4096, help="한 번에 쓰고 읽는 바이트 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    payload = make_payload(args.lines, args.line_length)
+    port = serial.serial_for_url("loop://", timeout=0)
+    size_mb = len(payload) / 1e6
+
+    transport, chunks = capture_chunks(port, payload, args.chunk)
+    port.close()
+
+    print(f"payload: {size_mb:.1f} MB, {args.lines} lines, {len(chunks)} chunks of ~{args.chunk} B")
+    print(f"loop:// transport {transport * 1000:8.1f} ms")
+    for name, runner in (("split/join", lambda: run_legacy(chunks)),
+                         ("split/join+split", lambda: run_legacy_lines(chunks)),
+                         ("LineFramer frames", lambda: run_framer_only(chunks, "LF")),
+                         ("LineFramer+decode", lambda: run_framer(chunks, "LF"))):
+        best = None
+        for _ in range(args.repeat):
+            elapsed, entries = runner()
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{name:<18} {best * 1000:8.1f} ms  {size_mb / best:7.1f} MB/s  "
+              f"{args.lines / best:10.0f} lines/s  queue entries: {entries}")
+
+
+if __name__ == "__main__":
+    main()
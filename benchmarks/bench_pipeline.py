@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import json
+import queue
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter
+from log_handler import LogHandler
+from port_session import PortSession
+from render_scheduler import RenderScheduler
+from metrics import port_stats, render_stats
+
+
+class HeadlessDisplay:
+    # LogDisplay 대신 화면에 보일 마지막 rows 줄만 포맷해서 그리는 비용을 흉내 낸다
+    def __init__(self, rows=40):
+        self.rows = rows
+        self.store = None
+        self.format_entry = None
+
+    def attach(self, store, format_entry, highlight_engine=None):
+        self.store = store
+        self.format_entry = format_entry
+
+    def refresh(self, force=False):
+        if self.store is not None:
+            "\n".join(self.format_entry(timestamp_ns, text)
+                      for timestamp_ns, text in self.store.get_range(self.store.end_seq - self.rows, self.rows))
+
+
+def open_transport(kind):
+    # (포트 이름, 데이터를 밀어 넣는 함수, 정리 함수)
+    if kind == "pty":
+        import tty
+        master_fd, slave_fd = os.openpty()
+        tty.setraw(slave_fd)
+
+        def write(data):
+            view = memoryview(data)
+            while view:
+                view = view[os.write(master_fd, view):]
+
+        def close():
+            os.close(master_fd)
+            os.close(slave_fd)
+        return os.ttyname(slave_fd), write, close
+    return "loop://", None, lambda: None
+
+
+def feed(write, rate, seconds, line_length, stop):
+    # rate 줄/초로 1ms 마다 나눠서 보낸다. 보낸 줄 수를 돌려준다
+    line = b"x" * (line_length - 1) + b"\n"
+    total = int(rate * seconds)
+    per_tick = max(1, rate // 1000)
+    started = time.perf_counter()
+    sent = 0
+    while sent < total and not stop.is_set():
+        count = min(per_tick, total - sent)
+        write(line * count)
+        sent += count
+        delay = started + sent / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return sent, time.perf_counter() - started
+
+
+def run_rate(args, rate, out_dir):
+    port, write, close = open_transport(args.transport)
+    log_queue = queue.Queue()
+    log_handler = LogHandler(HeadlessDisplay())
+    log_handler.start_logging(out_dir, f"bench_{rate}")
+    session = PortSession(1, port, log_queue, log_handler)
+    success, message = session.connect(3000000, "LF")
+    if not success:
+        close()
+        raise SystemExit(f"{port}: {message}")
+    if write is None:
+        write = session.handler.serial.write
+
+    interp = tkinter.Tcl()
+    scheduler = RenderScheduler(interp, log_queue,
+                                lambda batches: [log_handler.update_log_batch(entries) for _, entries in batches])
+    scheduler.start()
+
+    result = {}
+    stop = threading.Event()
+
+    def feeder():
+        result["sent"], result["feed_seconds"] = feed(write, rate, args.seconds, args.line_length, stop)
+
+    thread = threading.Thread(target=feeder, daemon=True)
+    thread.start()
+    deadline = None
+    while True:
+        interp.tk.dooneevent(0)
+        if not thread.is_alive():
+            if deadline is None:
+                deadline = time.perf_counter() + args.drain_seconds
+            if scheduler.rendered_lines >= result["sent"] or time.perf_counter() >= deadline:
+                break
+    stop.set()
+    drain_started = deadline - args.drain_seconds
+    result["drain_seconds"] = time.perf_counter() - drain_started
+    scheduler.stop()
+    session.close()
+    log_handler.stop_logging()
+    close()
+
+    stats = {"port": port_stats(port, session.handler, log_handler.writer), "render": render_stats(scheduler)}
+    received = scheduler.rendered_lines
+    render_p99 = stats["render"]["arrival_to_render"]["p99_ms"]
+    result.update({
+        "rate": rate,
+        "received": received,
+        "achieved_rate": received / max(result["feed_seconds"] + result["drain_seconds"], 1e-9),
+        "sustained": received == result["sent"] and stats["port"]["file_spilled_lines"] == 0
+                     and render_p99 <= args.max_p99_ms,
+        "stats": stats,
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="포트 -> 프레이밍 -> 큐 -> 화면/파일 전체 경로의 최대 처리량과 꼬리 지연을 잰다")
+    parser.add_argument("--transport", choices=["pty", "loop"], default="pty" if os.name == "posix" else "loop")
+    parser.add_argument("--rates", default="10000,25000,50000,100000,200000", help="줄/초 목록")
+    parser.add_argument("--seconds", type=float, default=3.0, help="속도마다 보낼 시간")
+    parser.add_argument("--line-length", type=int, default=80)
+    parser.add_argument("--drain-seconds", type=float, default=2.0, help="보내기를 마친 뒤 기다릴 최대 시간")
+    parser.add_argument("--max-p99-ms", type=float, default=100.0, help="이보다 p99 지연이 크면 감당하지 못한 것으로 본다")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        print(f"{'rate':>8} {'sent':>8} {'recv':>8} {'lines/s':>9} {'render p50':>10} {'p99':>8} {'max':>8} "
+              f"{'file p99':>9} {'queue':>6} {'frames':>6}  ok")
+        for rate in (int(value) for value in args.rates.split(",")):
+            result = run_rate(args, rate, out_dir)
+            results.append(result)
+            render = result["stats"]["render"]
+            latency = render["arrival_to_render"]
+            print(f"{rate:>8} {result['sent']:>8} {result['received']:>8} {result['achieved_rate']:>9.0f} "
+                  f"{latency['p50_ms']:>8.1f}ms {latency['p99_ms']:>6.1f}ms {latency['max_ms']:>6.1f}ms "
+                  f"{result['stats']['port']['file_write_latency']['p99_ms']:>7.1f}ms "
+                  f"{render['queue_peak']:>6} {render['dropped_frames']:>6}  {'yes' if result['sustained'] else 'NO'}")
+    sustained = [result["rate"] for result in results if result["sustained"]]
+    print(f"max sustained: {max(sustained) if sustained else 0} lines/s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
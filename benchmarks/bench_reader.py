@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import tty
+import argparse
+import resource
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from uart_handler import UARTHandler
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Reader:
+    # 뷰어의 읽기 스레드처럼 read_data 를 계속 부르면서 호출 횟수와 받은 줄 수를 센다
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = 0
+        self.lines = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while True:
+            data = self.handler.read_data()
+            self.calls += 1
+            if data == "COM_PORT_DISCONNECTED":
+                return
+            if data:
+                self.lines += len(data)
+            elif not self.handler.is_connected():
+                return
+
+
+def feed(master_fd, payload, bytes_per_second):
+    # bytes_per_second 가 0 이면 pty 가 받아주는 만큼 최대한 빨리 쓴다
+    view = memoryview(payload)
+    started = time.perf_counter()
+    sent = 0
+    while sent < len(payload):
+        step = len(payload) - sent
+        if bytes_per_second:
+            step = min(step, max(1, bytes_per_second // 1000))
+            due = started + sent / bytes_per_second
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sent += os.write(master_fd, view[sent:sent + step])
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pty 를 통해 UARTHandler 읽기 경로의 대기 비용과 처리량을 잰다")
+    parser.add_argument("--idle", type=float, default=3.0, help="유휴 측정 시간(초)")
+    parser.add_argument("--baud", type=int, default=3000000, help="흉내 낼 전송 속도 (0 이면 최대 속도)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="전송 시간(초)")
+    parser.add_argument("--line-length", type=int, default=80)
+    args = parser.parse_args()
+
+    if os.name != 'posix':
+        print("pty 가 필요합니다 (POSIX 전용)")
+        return 1
+
+    master_fd, slave_fd = os.openpty()
+    tty.setraw(slave_fd)
+    handler = UARTHandler()
+    success, message = handler.connect(os.ttyname(slave_fd), args.baud or 115200)
+    if not success:
+        print(message)
+        return 1
+    reader = Reader(handler)
+    reader.thread.start()
+
+    cpu = cpu_seconds()
+    time.sleep(args.idle)
+    print(f"idle: {reader.calls / args.idle:.1f} wakeups/s, "
+          f"{(cpu_seconds() - cpu) / args.idle * 100:.2f}% CPU")
+
+    bytes_per_second = args.baud // 10  # 8N1 은 바이트당 10비트
+    line = b"x" * (args.line_length - 1) + b"\n"
+    total_bytes = (bytes_per_second or 4 * 1024 * 1024) * args.seconds
+    line_count = int(total_bytes // len(line))
+    calls = reader.calls
+    cpu = cpu_seconds()
+    elapsed = feed(master_fd, line * line_count, bytes_per_second)
+    deadline = time.perf_counter() + 2.0
+    while reader.lines < line_count and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    print(f"load: {line_count} lines sent in {elapsed:.2f}s, {reader.lines} received, "
+          f"{(reader.calls - calls) / elapsed:.0f} reads/s, "
+          f"{(cpu_seconds() - cpu) / elapsed * 100:.1f}% CPU")
+
+    started = time.perf_counter()
+    handler.disconnect()
+    reader.thread.join(timeout=2)
+    print(f"stop: {(time.perf_counter() - started) * 1000:.1f} ms, thread alive={reader.thread.is_alive()}")
+    os.close(master_fd)
+    os.close(slave_fd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
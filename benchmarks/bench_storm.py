@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storm_compactor import StormCompactor
+
+
+def make_lines(kind, count):
+    # same: 펌웨어가 루프에 빠져 똑같은 줄을 찍는 경우
+    # storm: 같은 오류를 찍지만 숫자만 바뀌는 경우
+    # mixed: 평소처럼 서로 다른 줄 사이에 가끔 같은 줄
+    if kind == "same":
+        return ["E (1234) spi: transfer timeout"] * count
+    if kind == "storm":
+        return [f"E (1234) spi: transfer timeout addr=0x{i & 0xffff:04x} retry={i}" for i in range(count)]
+    return [f"sensor{i % 7} temp=23.{i % 10} rpm={1000 + i} status={'OK' if i % 13 else 'WARN'} seq={i}"
+            if i % 5 else "heartbeat" for i in range(count)]
+
+
+def run(mode, lines, line_rate, batch):
+    # 읽기 스레드가 batch 줄씩 넘기는 것처럼 line_rate 줄/초 간격의 시각을 붙여서 넣는다
+    compactor = StormCompactor(mode)
+    step = int(1e9 / line_rate)
+    batches = [[(index * step, lines[index]) for index in range(start, min(start + batch, len(lines)))]
+               for start in range(0, len(lines), batch)]
+    shown = 0
+    start = time.perf_counter()
+    for entries in batches:
+        shown += len(compactor.process(entries))
+    shown += len(compactor.flush(len(lines) * step, force=True))
+    return time.perf_counter() - start, shown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="폭주 줄이기(exact/normalized)의 처리 속도와 줄어드는 줄 수를 잰다")
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--rate", type=int, default=50000, help="입력 줄의 초당 줄 수 (시각 간격)")
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'input':<6} {'mode':<10} {'lines/s':>10} {'ns/line':>8} {'shown':>8} {'kept %':>7}")
+    for kind in ("same", "storm", "mixed"):
+        lines = make_lines(kind, args.lines)
+        for mode in ("exact", "normalized"):
+            elapsed, shown = run(mode, lines, args.rate, args.batch)
+            print(f"{kind:<6} {mode:<10} {len(lines) / elapsed:>10.0f} {elapsed / len(lines) * 1e9:>8.0f} "
+                  f"{shown:>8} {shown / len(lines) * 100:>6.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
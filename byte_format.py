@@ -0,0 +1,72 @@
+import re
+
+DISPLAY_MODES = ["text", "hex"]
+TX_MODES = ["text", "hex", "escape"]
+
+# 출력 가능한 ASCII 는 그대로, 나머지는 '.' 로 바꾸는 translate 표
+PRINTABLE = bytes(byte if 32 <= byte < 127 else ord('.') for byte in range(256))
+
+# escape 입력에서 쓸 수 있는 이스케이프. 나머지 글자는 UTF-8 로 보낸다
+ESCAPES = {"n": b'\n', "r": b'\r', "t": b'\t', "0": b'\0', "\\": b'\\'}
+ESCAPE = re.compile(r'\\(x[0-9A-Fa-f]{2}|.?)', re.DOTALL)
+
+
+def decode_text(frames):
+    return [frame.decode('utf-8', errors='replace') for frame in frames]
+
+
+def decode_hex(frames):
+    # 바이트 단위 반복 없이 프레임마다 bytes.hex 와 translate 한 번씩만 부른다
+    printable = PRINTABLE
+    return [f"{frame.hex(' ')}  |{frame.translate(printable).decode('ascii')}|" for frame in frames]
+
+
+def make_decoder(mode):
+    if mode == "hex":
+        return decode_hex
+    if mode in ("text", "", None):
+        return decode_text
+    raise ValueError(f"알 수 없는 표시 방식: {mode}")
+
+
+def parse_tx_input(text, mode="text"):
+    # 전송 입력을 포트로 보낼 값으로 바꾼다. text 는 문자열 그대로 (줄 끝은 전송할 때 붙인다),
+    # hex 와 escape 는 입력한 바이트만 보내므로 bytes 를 돌려준다
+    #   hex     "01 02 ff", "0102FF", "0x01,0x02"
+    #   escape  "AT\r\n", "\x02data\x03"
+    if mode == "text":
+        return text
+    if mode == "hex":
+        digits = text.replace("0x", "").replace("0X", "").replace(",", " ")
+        try:
+            return bytes.fromhex(digits)
+        except ValueError:
+            raise ValueError(f"16진수로 읽을 수 없습니다: {text}")
+    if mode == "escape":
+        return parse_escapes(text)
+    raise ValueError(f"알 수 없는 전송 방식: {mode}")
+
+
+def parse_escapes(text):
+    # \xNN, \n, \r, \t, \0, \\ 만 바이트로 바꾼다
+    out = bytearray()
+    position = 0
+    for match in ESCAPE.finditer(text):
+        out += text[position:match.start()].encode('utf-8')
+        code = match.group(1)
+        if code.startswith("x") and len(code) == 3:
+            out.append(int(code[1:], 16))
+        elif code in ESCAPES:
+            out += ESCAPES[code]
+        else:
+            raise ValueError(f"이스케이프를 해석할 수 없습니다: '\\{code}'")
+        position = match.end()
+    out += text[position:].encode('utf-8')
+    return bytes(out)
+
+
+def format_sent(command):
+    # 화면과 파일에 남길 전송 기록
+    if isinstance(command, (bytes, bytearray)):
+        return command.hex(' ')
+    return command
@@ -0,0 +1,234 @@
+import os
+import time
+import queue
+import struct
+import bisect
+import datetime
+import threading
+from line_framer import make_framer
+from utils import format_log_entry
+from byte_format import make_decoder
+
+# 파일 헤더: 매직, 버전, 예약, 기록 시작 시각(ns)
+FILE_MAGIC = b'UCAP'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHHq')
+# 레코드 헤더: 방향, 플래그, 소스 번호, 수신 시각(ns), 데이터 길이
+RECORD_HEADER = struct.Struct('<BBHqI')
+# 인덱스 항목: 시각(ns), 레코드 시작 위치
+INDEX_ENTRY = struct.Struct('<qQ')
+INDEX_SUFFIX = ".idx"
+
+DIRECTION_RX = 0
+DIRECTION_TX = 1
+
+_STOP = object()
+
+
+class CaptureWriter:
+    # 받은 원본 바이트를 디코딩하지 않고 레코드로 묶어서 저장한다.
+    # index_bytes 마다 한 번씩 (시각, 위치) 를 .idx 파일에 남겨서 나중에 처음부터 읽지 않고 찾아갈 수 있게 한다.
+    def __init__(self, index_bytes=1024 * 1024, index_seconds=1.0, buffer_size=1024 * 1024,
+                 flush_interval=1.0, max_queue=8192):
+        self.index_bytes = index_bytes
+        self.index_seconds = index_seconds
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.file = None
+        self.index_file = None
+        self.file_path = None
+        self.thread = None
+        self.queue = None
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped_records = 0
+        self.error = None
+
+    @property
+    def is_open(self):
+        return self.file is not None
+
+    def open(self, file_path):
+        try:
+            self.file = open(file_path, 'wb', buffering=self.buffer_size)
+            self.index_file = open(file_path + INDEX_SUFFIX, 'wb')
+            self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0, time.time_ns()))
+        except Exception as e:
+            self.close()
+            return False, str(e)
+        self.file_path = file_path
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped_records = 0
+        self.error = None
+        self.queue = queue.Queue(maxsize=self.max_queue)
+        self.thread = threading.Thread(target=self.run, name="capture-writer", daemon=True)
+        self.thread.start()
+        return True, file_path
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join()
+            self.thread = None
+        for handle in (self.file, self.index_file):
+            if handle:
+                handle.close()
+        self.file = None
+        self.index_file = None
+
+    def record(self, direction, timestamp_ns, data, source=0):
+        if self.thread is None:
+            return
+        try:
+            self.queue.put_nowait((direction, timestamp_ns, bytes(data), source))
+        except queue.Full:
+            self.dropped_records += 1
+
+    def run(self):
+        offset = self.file.tell()
+        last_index_offset = None
+        last_index_time = 0
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            try:
+                if item is _STOP:
+                    self.file.flush()
+                    self.index_file.flush()
+                    return
+                if item is not None:
+                    direction, timestamp_ns, data, source = item
+                    if (last_index_offset is None or offset - last_index_offset >= self.index_bytes
+                            or timestamp_ns - last_index_time >= self.index_seconds * 1e9):
+                        self.index_file.write(INDEX_ENTRY.pack(timestamp_ns, offset))
+                        last_index_offset = offset
+                        last_index_time = timestamp_ns
+                    self.file.write(RECORD_HEADER.pack(direction, 0, source, timestamp_ns, len(data)))
+                    self.file.write(data)
+                    offset += RECORD_HEADER.size + len(data)
+                    self.records_written += 1
+                    self.bytes_written += len(data)
+                now = time.monotonic()
+                if now - last_flush >= self.flush_interval:
+                    self.file.flush()
+                    self.index_file.flush()
+                    last_flush = now
+            except Exception as e:
+                self.error = str(e)
+
+
+class CaptureReader:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        header = self.file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            self.file.close()
+            raise ValueError("캡처 파일 헤더가 없습니다")
+        magic, version, _, self.started_ns = FILE_HEADER.unpack(header)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            self.file.close()
+            raise ValueError("지원하지 않는 캡처 파일입니다")
+        self.index_times, self.index_offsets = self.load_index()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load_index(self):
+        times = []
+        offsets = []
+        try:
+            with open(self.file_path + INDEX_SUFFIX, 'rb') as index_file:
+                data = index_file.read()
+            for timestamp_ns, offset in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+                times.append(timestamp_ns)
+                offsets.append(offset)
+        except OSError:
+            pass
+        if not offsets:
+            # 인덱스가 없으면 처음부터 읽는다
+            times, offsets = [self.started_ns], [FILE_HEADER.size]
+        return times, offsets
+
+    def seek_offset(self, timestamp_ns):
+        # timestamp_ns 보다 앞선 마지막 인덱스 위치부터 읽으면 된다
+        position = bisect.bisect_right(self.index_times, timestamp_ns) - 1
+        return self.index_offsets[max(0, position)]
+
+    def records(self, start_ns=None, end_ns=None):
+        offset = self.seek_offset(start_ns) if start_ns is not None else FILE_HEADER.size
+        self.file.seek(offset)
+        read = self.file.read
+        while True:
+            header = read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            direction, _, source, timestamp_ns, length = RECORD_HEADER.unpack(header)
+            data = read(length)
+            if len(data) < length:
+                return  # 기록 중에 끊긴 마지막 레코드
+            if start_ns is not None and timestamp_ns < start_ns:
+                continue
+            if end_ns is not None and timestamp_ns > end_ns:
+                return
+            yield direction, timestamp_ns, data, source
+
+    def iter_lines(self, start_ns=None, end_ns=None, framing="LF", display="text"):
+        # 방향과 소스별로 따로 프레이밍해서 (시각, 방향, 소스, 줄) 을 돌려준다
+        decode = make_decoder(display)
+        framers = {}
+        for direction, timestamp_ns, data, source in self.records(start_ns, end_ns):
+            key = (direction, source)
+            framer = framers.get(key)
+            if framer is None:
+                framer = framers[key] = make_framer(framing)
+            for text in decode(framer.feed(data)):
+                yield timestamp_ns, direction, source, text
+        for (direction, source), framer in framers.items():
+            for text in decode(framer.flush()):
+                yield None, direction, source, text
+
+
+def parse_time_arg(value, started_ns):
+    # "+초" 는 캡처 시작 기준, 그 외에는 "YYYY-MM-DD HH:MM:SS[.ffffff]" 로컬 시각
+    if value is None:
+        return None
+    value = value.strip()
+    if value.startswith("+"):
+        return started_ns + int(float(value[1:]) * 1e9)
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            moment = datetime.datetime.strptime(value, fmt)
+            return int(moment.timestamp()) * 1_000_000_000 + moment.microsecond * 1000
+        except ValueError:
+            continue
+    raise ValueError(f"시각 형식을 알 수 없습니다: {value}")
+
+
+def export_text(capture_path, out_path, start=None, end=None, framing="LF", precision="s", display="text"):
+    with CaptureReader(capture_path) as reader:
+        start_ns = parse_time_arg(start, reader.started_ns)
+        end_ns = parse_time_arg(end, reader.started_ns)
+        count = 0
+        with open(out_path, 'w', encoding='utf-8', buffering=1024 * 1024) as out:
+            for timestamp_ns, direction, _, text in reader.iter_lines(start_ns, end_ns, framing, display):
+                if direction == DIRECTION_TX:
+                    text = f"전송: {text}"
+                out.write(format_log_entry(timestamp_ns, text, precision) + "\n")
+                count += 1
+    return count
+
+
+def capture_path_for(log_path):
+    return os.path.splitext(log_path)[0] + ".ucap"
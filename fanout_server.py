@@ -0,0 +1,294 @@
+import socket
+import selectors
+import threading
+from collections import deque
+from utils import format_log_entry
+from capture_format import DIRECTION_RX
+
+DROP_POLICIES = ["drop_oldest", "disconnect"]
+MAX_INBOX = 64 * 1024  # 클라이언트가 보낸 줄 하나의 최대 길이. 넘으면 그 줄을 버린다
+
+
+def fanout_settings(options):
+    # setup.txt 의 OPT: 항목에서 공유 서버 설정을 읽는다. fanout_port 가 없거나 0 이면 None
+    #   OPT:fanout_port=5000         포트마다 5000, 5001, ... 에서 기다린다
+    #   OPT:fanout_host=0.0.0.0      다른 PC 에서도 접속 (기본값 127.0.0.1)
+    #   OPT:fanout_raw=1             줄 대신 받은 원본 바이트
+    #   OPT:fanout_write=0           클라이언트가 보낸 데이터를 포트로 쓰지 않음
+    #   OPT:fanout_queue_kb=1024     클라이언트마다 쌓아 둘 최대 크기
+    #   OPT:fanout_policy=disconnect 큐가 넘치면 오래된 데이터를 버리는 대신 연결을 끊음
+    port = int(options.get("fanout_port", 0) or 0)
+    if not port:
+        return None
+    policy = options.get("fanout_policy", "drop_oldest")
+    if policy not in DROP_POLICIES:
+        raise ValueError(f"알 수 없는 fanout_policy '{policy}' ({', '.join(DROP_POLICIES)})")
+    return {
+        "host": options.get("fanout_host", "127.0.0.1"),
+        "port": port,
+        "raw": str(options.get("fanout_raw", "0")) in ("1", "true", "on"),
+        "allow_write": str(options.get("fanout_write", "1")) in ("1", "true", "on"),
+        "max_client_bytes": int(float(options.get("fanout_queue_kb", 1024)) * 1024),
+        "policy": policy,
+    }
+
+
+class FanoutClient:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.chunks = deque()  # 보낼 데이터. 여러 클라이언트가 같은 bytes 객체를 공유한다
+        self.queued = 0
+        self.pending = None  # 보내다 만 나머지 (memoryview)
+        self.dropped = 0  # 아직 알리지 않은 버린 바이트 수
+        self.dropped_total = 0
+        self.sent = 0
+        self.inbox = bytearray()
+        self.discarding = False  # 너무 긴 줄을 버리는 중. 다음 줄바꿈까지 받은 바이트를 버린다
+        self.writing = False  # selector 에 EVENT_WRITE 로 등록되어 있는지
+        self.closing = False  # 큐가 넘쳐서 selector 스레드가 끊을 클라이언트 (disconnect 정책)
+
+
+class FanoutServer:
+    # 포트 하나에서 읽은 줄(또는 원본 바이트)을 TCP 로 여러 클라이언트에게 나눠 준다.
+    # 읽기 스레드는 줄 묶음을 한 번만 인코딩해서 클라이언트마다 큐에 넣고 깨우기만 한다.
+    # 보내기는 selector 스레드 하나가 맡고, 큐가 max_client_bytes 를 넘으면 느린 클라이언트의
+    # 오래된 데이터를 버리거나(drop_oldest) 연결을 끊어서(disconnect) 수신을 세우지 않는다.
+    # 클라이언트가 보낸 줄은 write 함수(전송 스케줄러)로 넘겨서 포트에 차례로 쓴다
+    def __init__(self, host="127.0.0.1", port=0, raw=False, write=None, max_client_bytes=1024 * 1024,
+                 policy="drop_oldest", precision="us"):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"알 수 없는 정책 '{policy}' ({', '.join(DROP_POLICIES)})")
+        self.host = host
+        self.port = port
+        self.raw = raw
+        self.write = write  # None 이면 클라이언트 입력을 버린다
+        self.max_client_bytes = max_client_bytes
+        self.policy = policy
+        self.precision = precision
+        self.clients = ()  # 읽기 스레드가 잠금 없이 훑을 수 있게 바꿀 때마다 새 튜플로 바꾼다
+        self.lock = threading.Lock()
+        self.selector = None
+        self.listener = None
+        self.wake_r = None
+        self.wake_w = None
+        self.wake_pending = False
+        self.running = False
+        self.thread = None
+        self.accepted = 0
+        self.dropped_bytes = 0
+        self.disconnected_slow = 0
+        self.bytes_published = 0
+        self.oversized_lines = 0
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        try:
+            self.listener = socket.create_server((self.host, self.port))
+        except OSError as e:
+            return False, str(e)
+        self.listener.setblocking(False)
+        self.port = self.listener.getsockname()[1]
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ, "accept")
+        self.selector.register(self.wake_r, selectors.EVENT_READ, "wake")
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"fanout-{self.port}", daemon=True)
+        self.thread.start()
+        return True, self.address
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.running = False
+        self.wake()
+        self.thread.join(timeout=2)
+        self.thread = None
+        for client in self.clients:
+            client.sock.close()
+        self.clients = ()
+        for sock in (self.listener, self.wake_r, self.wake_w):
+            sock.close()
+        self.selector.close()
+
+    def publish_lines(self, entries):
+        # 읽기 스레드에서 부른다. 클라이언트가 없으면 아무 일도 하지 않는다
+        if self.raw or not self.clients:
+            return
+        precision = self.precision
+        self.publish("".join(format_log_entry(timestamp_ns, text, precision) + "\n"
+                             for timestamp_ns, text in entries).encode('utf-8'))
+
+    def publish_raw(self, direction, timestamp_ns, data):
+        # UARTHandler 의 원본 리스너. 받은 바이트만 그대로 보낸다
+        if self.raw and direction == DIRECTION_RX and self.clients:
+            self.publish(bytes(data))
+
+    def publish(self, data):
+        limit = self.max_client_bytes
+        with self.lock:
+            self.bytes_published += len(data)
+            for client in self.clients:
+                if client.closing:
+                    continue
+                client.chunks.append(data)
+                client.queued += len(data)
+                if client.queued > limit:
+                    self.overflow(client, limit)
+            if self.wake_pending:
+                return
+            self.wake_pending = True
+        self.wake()
+
+    def overflow(self, client, limit):
+        # self.lock 을 잡은 채로 불린다
+        if self.policy == "disconnect":
+            client.chunks.clear()
+            client.queued = 0
+            client.closing = True  # selector 스레드가 연결을 끊는다
+            return
+        while client.queued > limit and len(client.chunks) > 1:
+            size = len(client.chunks.popleft())
+            client.queued -= size
+            client.dropped += size
+            client.dropped_total += size
+            self.dropped_bytes += size
+
+    def wake(self):
+        try:
+            self.wake_w.send(b'x')
+        except OSError:
+            pass
+
+    def run(self):
+        while self.running:
+            for key, events in self.selector.select():
+                tag = key.data
+                if tag == "accept":
+                    self.accept()
+                elif tag == "wake":
+                    self.drain_wake()
+                else:
+                    if events & selectors.EVENT_READ:
+                        self.receive(tag)
+                    if events & selectors.EVENT_WRITE and tag in self.clients:
+                        self.send(tag)
+
+    def accept(self):
+        try:
+            sock, address = self.listener.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = FanoutClient(sock, address)
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        with self.lock:
+            self.clients = self.clients + (client,)
+        self.accepted += 1
+
+    def close_client(self, client):
+        with self.lock:
+            self.clients = tuple(other for other in self.clients if other is not client)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def drain_wake(self):
+        try:
+            while self.wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+        with self.lock:
+            self.wake_pending = False
+            clients = self.clients
+        for client in clients:
+            if client.closing:
+                self.disconnected_slow += 1
+                self.close_client(client)
+            elif (client.chunks or client.pending is not None) and not client.writing:
+                # 바로 한 번 보내 보고 다 못 보낸 클라이언트만 쓰기 가능 이벤트를 기다린다
+                self.send(client)
+
+    def send(self, client):
+        while True:
+            if client.pending is None:
+                with self.lock:
+                    if not client.chunks:
+                        break
+                    data = b''.join(client.chunks)
+                    client.chunks.clear()
+                    client.queued = 0
+                    dropped, client.dropped = client.dropped, 0
+                if dropped and not self.raw:
+                    data = f"[{dropped} bytes dropped]\n".encode() + data
+                client.pending = memoryview(data)
+            try:
+                sent = client.sock.send(client.pending)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self.close_client(client)
+                return
+            client.sent += sent
+            client.pending = client.pending[sent:] if sent < len(client.pending) else None
+            if client.pending is not None:
+                break
+        writing = client.pending is not None or bool(client.chunks)
+        if writing != client.writing:
+            client.writing = writing
+            self.selector.modify(client.sock, selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0),
+                                 client)
+
+    def receive(self, client):
+        try:
+            data = client.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.close_client(client)
+            return
+        if self.write is None:
+            return
+        if self.raw:
+            self.write(data)
+            return
+        if client.discarding:
+            end = data.find(b'\n')
+            if end < 0:
+                return
+            client.discarding = False
+            data = data[end + 1:]
+        client.inbox += data
+        *lines, rest = client.inbox.split(b'\n')
+        if len(rest) > MAX_INBOX:
+            # 줄바꿈 없이 계속 보내는 클라이언트 때문에 메모리가 늘지 않도록 그 줄은 버린다
+            rest = b''
+            client.discarding = True
+            self.oversized_lines += 1
+        client.inbox = bytearray(rest)
+        for line in lines:
+            self.write(line.rstrip(b'\r').decode('utf-8', errors='replace'))
+
+    def stats(self):
+        clients = self.clients
+        return {
+            "address": self.address,
+            "clients": len(clients),
+            "accepted": self.accepted,
+            "bytes_published": self.bytes_published,
+            "dropped_bytes": self.dropped_bytes,
+            "disconnected_slow": self.disconnected_slow,
+            "oversized_lines": self.oversized_lines,
+            "client_backlog_max": max((client.queued for client in clients), default=0),
+        }
@@ -0,0 +1,230 @@
+import re
+import csv
+from array import array
+from bisect import bisect_left
+from utils import format_timestamp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMBER = r'[-+]?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+)'
+AUTO_FIELD = re.compile(r'\b([A-Za-z_][\w.]*)\s*=\s*(' + NUMBER + ')')
+AUTO = "*"
+MAX_FIELDS = 64  # 포트 하나에서 만드는 필드 수 상한 (FIELD:* 가 이름을 끝없이 만들지 않도록)
+PERCENTILE_SAMPLES = 65536  # numpy 가 없을 때 백분위는 이만큼 고르게 뽑은 표본으로 근사한다
+EXPORT_FORMATS = [".csv", ".npz"]
+
+
+def parse_number(text):
+    if 'x' in text or 'X' in text:
+        return float(int(text, 16))
+    return float(text)
+
+
+class FieldRule:
+    # setup.txt 의 FIELD 줄 하나
+    #   FIELD:temp              "temp=41.2", "temp: 41.2" 형태에서 temp 값을 뽑는다
+    #   FIELD:vbat:V=(\d+)mV     정규식의 첫 그룹 값 (이름 있는 그룹이 있으면 그룹 이름마다 필드 하나)
+    #   FIELD:*                 모든 "이름=숫자"
+    def __init__(self, name, pattern=""):
+        self.name = name
+        self.pattern = pattern
+        # 기본 패턴은 이름이 줄에 없으면 정규식을 돌리지 않는다
+        self.literal = name if not pattern and name != AUTO else None
+        if name == AUTO:
+            self.rx = AUTO_FIELD
+            self.groups = None
+            return
+        try:
+            self.rx = re.compile(pattern or (r'\b' + re.escape(name) + r'\s*[=:]\s*(' + NUMBER + r')'))
+        except re.error as e:
+            raise ValueError(f"잘못된 필드 패턴 '{pattern}': {e}")
+        # (그룹 번호, 필드 이름) 목록
+        named = sorted((index, group) for group, index in self.rx.groupindex.items())
+        self.groups = named or [(1 if self.rx.groups else 0, name)]
+
+
+class FieldExtractor:
+    # 줄이 들어올 때 한 번만 규칙을 적용해서 (필드 이름, 값) 을 뽑는다. 규칙은 모든 포트가 공유한다
+    def __init__(self, rules=None):
+        self.rules = list(rules or [])
+
+    def set_rules(self, rules):
+        self.rules = list(rules)
+
+    def extract(self, text):
+        values = []
+        for rule in self.rules:
+            if rule.literal is not None and rule.literal not in text:
+                continue
+            if rule.groups is None:
+                for match in rule.rx.finditer(text):
+                    values.append((match.group(1), match.group(2)))
+                continue
+            match = rule.rx.search(text)
+            if match is None:
+                continue
+            for index, name in rule.groups:
+                value = match.group(index)
+                if value is not None:
+                    values.append((name, value))
+        return values
+
+
+class FieldSeries:
+    # 시각(ns)과 값을 array 두 개에 열 단위로 쌓는다. numpy 가 있으면 통계와 줄이기를
+    # frombuffer 로 복사 없이 계산한다 (계산이 끝나면 바로 놓아 줘야 다시 append 할 수 있다)
+    def __init__(self, name, max_samples=2000000):
+        self.name = name
+        self.max_samples = max_samples
+        self.timestamps = array('q')
+        self.values = array('d')
+        self.head = 0
+
+    def __len__(self):
+        return len(self.timestamps) - self.head
+
+    def append(self, timestamp_ns, value):
+        self.timestamps.append(timestamp_ns)
+        self.values.append(value)
+        if len(self) > self.max_samples:
+            self.head += 1
+            if self.head > len(self.timestamps) // 2:
+                del self.timestamps[:self.head]
+                del self.values[:self.head]
+                self.head = 0
+
+    def clear(self):
+        self.timestamps = array('q')
+        self.values = array('d')
+        self.head = 0
+
+    def last_timestamp(self):
+        return self.timestamps[-1] if len(self) else None
+
+    def span(self, start_ns=None, end_ns=None):
+        # [start_ns, end_ns) 에 들어가는 표본의 (처음, 끝) 위치
+        first = self.head if start_ns is None else bisect_left(self.timestamps, start_ns, self.head)
+        last = len(self.timestamps) if end_ns is None else bisect_left(self.timestamps, end_ns, first)
+        return first, last
+
+    def stats(self, start_ns=None):
+        first, last = self.span(start_ns)
+        count = last - first
+        if not count:
+            return {"count": 0}
+        if numpy is not None:
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)[first:last]
+            p50, p95, p99 = numpy.percentile(values, [50, 95, 99])
+            result = {"min": float(values.min()), "max": float(values.max()), "mean": float(values.mean()),
+                      "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+            del values
+        else:
+            window = self.values[first:last]
+            result = {"min": min(window), "max": max(window), "mean": sum(window) / count}
+            window = sorted(window[::max(1, count // PERCENTILE_SAMPLES)])
+            size = len(window) - 1
+            result.update({"p50": window[size // 2], "p95": window[size * 95 // 100], "p99": window[size * 99 // 100]})
+        result["count"] = count
+        result["last"] = self.values[last - 1]
+        return result
+
+    def decimate(self, start_ns, end_ns, buckets):
+        # 화면 가로 칸마다 최솟값과 최댓값 두 점만 남긴다. 표본이 수백만 개여도 그리는 점은 2 * buckets 이하
+        first, last = self.span(start_ns, end_ns)
+        if last - first <= 2 * buckets:
+            return list(zip(self.timestamps[first:last], self.values[first:last]))
+        step = (end_ns - start_ns) / buckets
+        bounds = [int(start_ns + step * index) for index in range(1, buckets)]
+        points = []
+        if numpy is not None:
+            timestamps = numpy.frombuffer(self.timestamps, dtype=numpy.int64)[first:last]
+            values = numpy.frombuffer(self.values, dtype=numpy.float64)[first:last]
+            edges = numpy.unique(numpy.concatenate(([0], numpy.searchsorted(timestamps, bounds))))
+            edges = edges[edges < len(values)]
+            lows = numpy.minimum.reduceat(values, edges).tolist()
+            highs = numpy.maximum.reduceat(values, edges).tolist()
+            starts = timestamps[edges].tolist()
+            del timestamps, values
+            for timestamp_ns, low, high in zip(starts, lows, highs):
+                points.append((timestamp_ns, low))
+                points.append((timestamp_ns, high))
+            return points
+        edges = [first] + [bisect_left(self.timestamps, bound, first, last) for bound in bounds] + [last]
+        for start, end in zip(edges, edges[1:]):
+            if end > start:
+                window = self.values[start:end]
+                timestamp_ns = self.timestamps[start]
+                points.append((timestamp_ns, min(window)))
+                points.append((timestamp_ns, max(window)))
+        return points
+
+
+class FieldStore:
+    # 포트 하나에서 뽑은 필드들. 이름 -> FieldSeries
+    def __init__(self, extractor, label=""):
+        self.extractor = extractor
+        self.label = label
+        self.series = {}
+        self.samples = 0
+        self.parse_errors = 0
+
+    def extract(self, entries):
+        extract = self.extractor.extract
+        for timestamp_ns, text in entries:
+            if timestamp_ns is None:
+                continue
+            for name, value in extract(text):
+                series = self.series.get(name)
+                if series is None:
+                    if len(self.series) >= MAX_FIELDS:
+                        continue
+                    series = self.series[name] = FieldSeries(name)
+                try:
+                    series.append(timestamp_ns, parse_number(value))
+                except ValueError:
+                    self.parse_errors += 1
+                    continue
+                self.samples += 1
+
+    def names(self):
+        return sorted(self.series)
+
+    def clear(self):
+        for series in self.series.values():
+            series.clear()
+
+
+def series_label(store, name):
+    return f"{store.label}.{name}" if store.label else name
+
+
+def export_fields(stores, path, precision="us"):
+    # 로그를 다시 읽지 않고 저장된 열을 그대로 쓴다. .csv 는 긴 형식(시각, 필드, 값), .npz 는 필드마다 배열 두 개
+    try:
+        if path.lower().endswith(".npz"):
+            if numpy is None:
+                return False, "npz 로 저장하려면 numpy 가 필요합니다"
+            columns = {}
+            for store in stores:
+                for name, series in store.series.items():
+                    label = series_label(store, name)
+                    columns[f"{label}.timestamp_ns"] = numpy.array(series.timestamps[series.head:], dtype=numpy.int64)
+                    columns[f"{label}.value"] = numpy.array(series.values[series.head:], dtype=numpy.float64)
+            numpy.savez(path, **columns)
+            return True, path
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["timestamp_ns", "time", "field", "value"])
+            for store in stores:
+                for name in store.names():
+                    series = store.series[name]
+                    label = series_label(store, name)
+                    writer.writerows((timestamp_ns, format_timestamp(timestamp_ns, precision), label, repr(value))
+                                     for timestamp_ns, value in zip(series.timestamps[series.head:],
+                                                                    series.values[series.head:]))
+        return True, path
+    except Exception as e:
+        return False, str(e)
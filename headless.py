@@ -0,0 +1,323 @@
+import os
+import re
+import time
+import threading
+from replay_source import create_port_handler
+from log_writer import LogFileWriter
+from capture_format import CaptureWriter, capture_path_for
+from trigger_capture import TriggerCapture, parse_trigger
+from port_watcher import PortWatcher, reconnect_port
+from fanout_server import FanoutServer
+from storm_compactor import StormCompactor, parse_storm_rule
+from line_framer import make_framer
+from utils import format_log_entry, capture_timestamp_ns
+from metrics import port_stats, pipeline_snapshot, dump_stats
+
+DEFAULT_BAUD = 115200
+
+
+def parse_port_spec(spec, default_baud):
+    # "COM3" 또는 "COM3@921600" 형식
+    if "@" in spec and not spec.rstrip().endswith("@"):
+        port, baud = spec.rsplit("@", 1)
+        if baud.isdigit():
+            return port, int(baud)
+    return spec, default_baud
+
+
+def port_tag(port):
+    tag = re.sub(r'[^0-9A-Za-z]+', '_', port).strip('_')
+    return tag or "port"
+
+
+class CaptureSession:
+    def __init__(self, port, baud, out_dir, log_name, framing="LF", precision="s", writer_options=None, raw=False,
+                 triggers=None, log=True, watcher=None, display="text", storm=None):
+        self.port = port
+        self.baud = baud
+        self.out_dir = out_dir
+        self.log_name = log_name
+        self.precision = precision
+        self.uart_handler = create_port_handler(port)
+        self.uart_handler.set_framer(make_framer(framing))
+        self.uart_handler.set_display_mode(display)
+        # 화면이 없으므로 디스크가 잠깐 밀리면 읽기 스레드가 기다린다 (그동안은 OS 수신 버퍼가 받아 둔다)
+        self.writer = LogFileWriter(put_timeout=0.5)
+        self.writer.configure(writer_options or {})
+        self.log = log
+        self.capture_writer = CaptureWriter() if raw and log else None
+        self.trigger = None
+        if triggers:
+            self.trigger = TriggerCapture(port_tag(port), on_event=self.on_trigger_event,
+                                          send_command=self.write_command)
+            self.trigger.configure(writer_options or {})
+            self.trigger.set_rules(triggers)
+            self.trigger.out_dir = out_dir
+            self.trigger.framing = framing
+            self.trigger.display = display
+            self.uart_handler.add_raw_listener(self.trigger.record)
+        self.server = None
+        self.storm = storm  # StormCompactor. 있으면 폭주하는 같은 줄을 요약 줄로 줄여서 저장한다
+        self.write_lock = threading.Lock()  # 트리거 명령과 공유 서버 클라이언트의 쓰기가 섞이지 않게 한다
+        self.watcher = watcher  # 있으면 장치가 끊겨도 다시 연결될 때까지 기다린다
+        self.identity = watcher.identity(port) if watcher is not None else None
+        self.cancel = threading.Event()
+        self.reconnects = 0
+        self.running = False
+        self.thread = None
+        self.error = None
+        self.started_at = None
+        self.stopped_at = None
+
+    def start(self):
+        if self.log:
+            success, file_path = self.writer.start(self.out_dir, self.log_name)
+            if not success:
+                return False, file_path
+        else:
+            file_path = f"트리거 구간만 저장 -> {self.out_dir}"
+        if self.capture_writer is not None:
+            success, message = self.capture_writer.open(capture_path_for(file_path))
+            if not success:
+                self.writer.stop()
+                return False, message
+            self.uart_handler.add_raw_listener(self.capture_writer.record)
+        success, message = self.uart_handler.connect(self.port, self.baud)
+        if not success:
+            self.writer.stop()
+            if self.capture_writer is not None:
+                self.capture_writer.close()
+            return False, message
+        self.running = True
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.read_loop, name=f"capture-{self.port}", daemon=True)
+        self.thread.start()
+        return True, file_path
+
+    def read_loop(self):
+        while self.running:
+            data = self.uart_handler.read_data()
+            if data == "COM_PORT_DISCONNECTED":
+                self.error = "COM 포트 연결이 끊어졌습니다."
+                self.writer.write_lines([self.error])
+                if self.trigger is not None:
+                    self.trigger.on_disconnect()
+                if self.watcher is None or not self.reconnect():
+                    break
+                continue
+            if data == "REPLAY_FINISHED":
+                break
+            if data:
+                self.write_entries(data)
+                if self.trigger is not None:
+                    self.trigger.check_lines(data)
+                if self.server is not None:
+                    self.server.publish_lines(data)
+            elif not self.uart_handler.is_connected():
+                break
+            elif self.storm is not None:
+                self.write_lines(self.storm.flush(capture_timestamp_ns()))
+        self.request_stop()
+
+    def write_entries(self, entries):
+        # 읽은 줄 묶음을 줄이기(있으면)를 거쳐 파일에 쓴다
+        self.write_lines(entries if self.storm is None else self.storm.process(entries))
+
+    def write_lines(self, entries):
+        if entries:
+            self.writer.write_lines([format_log_entry(timestamp_ns, text, self.precision)
+                                     for timestamp_ns, text in entries])
+
+    def serve(self, host, port, raw=False, allow_write=True, max_client_bytes=1024 * 1024, policy="drop_oldest"):
+        self.server = FanoutServer(host, port, raw=raw, write=self.write_command if allow_write else None,
+                                   max_client_bytes=max_client_bytes, policy=policy, precision=self.precision)
+        success, message = self.server.start()
+        if not success:
+            self.server = None
+            return False, message
+        if raw:
+            self.uart_handler.add_raw_listener(self.server.publish_raw)
+        return True, message
+
+    def write_command(self, command):
+        with self.write_lock:
+            if isinstance(command, (bytes, bytearray)):
+                return self.uart_handler.write_bytes(command)
+            return self.uart_handler.write_data(command)
+
+    def reconnect(self):
+        print(f"{self.port}: 연결이 끊어졌습니다. 다시 연결을 기다립니다")
+        port = reconnect_port(self.uart_handler, self.port, self.baud, self.identity, self.watcher, self.cancel)
+        if port is None:
+            return False
+        message = f"다시 연결되었습니다: {port}"
+        print(f"{self.port}: {message}")
+        self.writer.write_lines([message])
+        self.port = port
+        self.reconnects += 1
+        self.error = None
+        return True
+
+    def request_stop(self):
+        self.cancel.set()
+        self.running = False
+        if self.stopped_at is None:
+            self.stopped_at = time.monotonic()
+
+    def stop(self):
+        self.request_stop()
+        self.uart_handler.cancel_read()
+        if self.thread:
+            self.thread.join(timeout=2)
+        # 구분자가 오지 않은 마지막 줄도 다른 줄과 같은 형식과 줄이기를 거친다
+        leftover = self.uart_handler.decode_frames(self.uart_handler.framer.flush())
+        if leftover:
+            timestamp_ns = capture_timestamp_ns()
+            self.write_entries([(timestamp_ns, text) for text in leftover])
+        if self.storm is not None:
+            self.write_lines(self.storm.flush(capture_timestamp_ns(), force=True))
+        self.uart_handler.disconnect()
+        if self.server is not None:
+            self.server.stop()
+        if self.trigger is not None:
+            self.trigger.close()
+        self.writer.stop()
+        if self.capture_writer is not None:
+            self.capture_writer.close()
+
+    def on_trigger_event(self, message):
+        print(f"{self.port}: {message}")
+        self.writer.write_lines([message])
+
+    def stats(self):
+        end = self.stopped_at if self.stopped_at is not None else time.monotonic()
+        elapsed = max(end - (self.started_at or end), 1e-9)
+        return {
+            "port": self.port,
+            "file": self.writer.file_path,
+            "seconds": elapsed,
+            "bytes": self.uart_handler.bytes_read,
+            "lines": self.uart_handler.lines_read,
+            "bytes_per_second": self.uart_handler.bytes_read / elapsed,
+            "lines_per_second": self.uart_handler.lines_read / elapsed,
+            "files": list(self.writer.file_paths),
+            "spilled_lines": self.writer.spilled_lines,
+            "writer_error": self.writer.error,
+            "reconnects": self.reconnects,
+            "triggers": self.trigger.triggers if self.trigger is not None else 0,
+            "trigger_files": list(self.trigger.files) if self.trigger is not None else [],
+            "fanout": self.server.stats() if self.server is not None else None,
+            "storm": self.storm.stats() if self.storm is not None else None,
+            "error": self.error,
+        }
+
+
+def format_stats(stats):
+    return (f"{stats['port']}: {stats['lines']} lines, {stats['bytes']} bytes in {stats['seconds']:.1f}s "
+            f"({stats['lines_per_second']:.0f} lines/s, {stats['bytes_per_second'] / 1024:.1f} KiB/s)"
+            + (f", {len(stats['files'])} files" if len(stats['files']) > 1 else "")
+            + (f", {stats['spilled_lines']} lines spilled by writer" if stats['spilled_lines'] else "")
+            + (f", writer error: {stats['writer_error']}" if stats['writer_error'] else "")
+            + (f", {stats['reconnects']} reconnects" if stats['reconnects'] else "")
+            + (f", {stats['triggers']} triggers -> {len(stats['trigger_files'])} files" if stats['triggers'] else "")
+            + (f", served {stats['fanout']['accepted']} clients ({stats['fanout']['dropped_bytes']} bytes dropped)"
+               if stats['fanout'] and stats['fanout']['accepted'] else "")
+            + (f", {stats['storm']['suppressed']} repeated lines collapsed into {stats['storm']['summaries']} summaries"
+               if stats['storm'] and stats['storm']['suppressed'] else "")
+            + (f" - {stats['error']}" if stats['error'] else ""))
+
+
+def run_capture(args):
+    out_dir = args.out or os.getcwd()
+    os.makedirs(out_dir, exist_ok=True)
+
+    writer_options = {
+        "log_rotate_mb": args.rotate_mb,
+        "log_rotate_minutes": args.rotate_minutes,
+        "log_compress": args.compress,
+        "log_fsync": int(args.fsync),
+        "log_flush_ms": args.flush_ms,
+        "trigger_ring_mb": args.ring_mb,
+        "trigger_pre_s": args.pre,
+        "trigger_post_s": args.post,
+        "trigger_command": args.trigger_command,
+    }
+    try:
+        triggers = [parse_trigger(text) for text in args.trigger]
+    except ValueError as e:
+        print(f"트리거 오류: {e}")
+        return 1
+    try:
+        storm_rules = [parse_storm_rule(text) for text in args.storm_rule]
+        if args.storm != "off":
+            StormCompactor(args.storm, args.storm_rate, args.storm_summary_ms, args.storm_keys, storm_rules)
+    except ValueError as e:
+        print(f"줄이기 설정 오류: {e}")
+        return 1
+    if args.no_log and not triggers:
+        print("--no-log 는 --trigger 와 함께 써야 합니다")
+        return 1
+    watcher = None
+    if args.reconnect:
+        # 경로가 바뀐 USB 장치를 찾을 수 있도록 연결 전에 한 번 조회해 둔다
+        watcher = PortWatcher()
+        watcher.scan()
+        watcher.start()
+    sessions = []
+    for spec in args.port:
+        port, baud = parse_port_spec(spec, args.baud)
+        log_name = args.name if len(args.port) == 1 else f"{args.name}_{port_tag(port)}"
+        storm = None
+        if args.storm != "off":
+            storm = StormCompactor(args.storm, args.storm_rate, args.storm_summary_ms, args.storm_keys, storm_rules)
+        session = CaptureSession(port, baud, out_dir, log_name, args.framing, args.precision, writer_options, args.raw,
+                                 triggers, not args.no_log, watcher, args.display, storm)
+        success, message = session.start()
+        if not success:
+            print(f"{port}: 연결 오류: {message}")
+            for started in sessions:
+                started.stop()
+            return 1
+        print(f"{port} @ {baud} -> {message}")
+        sessions.append(session)
+        if args.serve is not None:
+            success, message = session.serve(args.serve_host, args.serve + len(sessions) - 1 if args.serve else 0,
+                                             args.serve_raw, not args.serve_read_only,
+                                             int(args.serve_queue_kb * 1024), args.serve_policy)
+            if not success:
+                print(f"{port}: 공유 서버 오류: {message}")
+                for started in sessions:
+                    started.stop()
+                return 1
+            print(f"{port} 공유 -> {message}" + (" (원본)" if args.serve_raw else ""))
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while any(session.running for session in sessions):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+
+    for session in sessions:
+        session.request_stop()
+    if watcher is not None:
+        watcher.stop()
+
+    total_lines = 0
+    total_bytes = 0
+    for session in sessions:
+        session.stop()
+        stats = session.stats()
+        total_lines += stats["lines"]
+        total_bytes += stats["bytes"]
+        print(format_stats(stats))
+    if len(sessions) > 1:
+        print(f"total: {total_lines} lines, {total_bytes} bytes")
+    if args.stats_json:
+        stats = pipeline_snapshot([port_stats(session.port, session.uart_handler, session.writer, session.capture_writer,
+                                              server=session.server, storm=session.storm) for session in sessions])
+        success, message = dump_stats(stats, args.stats_json)
+        print(f"stats -> {message}" if success else f"통계 저장 오류: {message}")
+    return 0 if all(session.error is None for session in sessions) else 2
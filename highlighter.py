@@ -0,0 +1,111 @@
+import re
+
+
+class HighlightRule:
+    def __init__(self, pattern, color="blue", regex=False, ignore_case=False):
+        self.pattern = pattern
+        self.color = color
+        self.regex = regex
+        self.ignore_case = ignore_case
+
+    def expression(self):
+        body = self.pattern if self.regex else re.escape(self.pattern)
+        return f"(?i:{body})" if self.ignore_case else f"(?:{body})"
+
+
+class HighlightEngine:
+    # 규칙들을 그룹 없는 정규식 하나로 합쳐서 줄마다 한 번만 검사하고,
+    # 실제로 찾은 구간에 대해서만 어느 규칙인지 확인한다.
+    # 그룹이나 (?i:) 로 감싸면 re 의 리터럴 최적화가 꺼지기 때문에
+    # 대소문자 무시 문자열 규칙은 소문자로 바꾼 줄에 따로 검사한다.
+    # 그룹이 있는 정규식 규칙은 합치면 그룹 번호가 바뀌어 \1 같은 역참조가 깨지고
+    # 이름이 같은 그룹끼리 충돌하므로 합치지 않고 규칙마다 따로 검사한다.
+    def __init__(self):
+        self.rules = []
+        self.case_matcher = None
+        self.case_rules = []
+        self.group_rules = []
+        self.lower_matcher = None
+        self.lower_fallback = None
+        self.lower_rules = []
+        self.lower_fallback_rules = []
+        self.version = 0
+
+    def set_rules(self, rules):
+        case_rules = []
+        group_rules = []
+        lower_rules = []
+        for index, rule in enumerate(rules):
+            try:
+                if rule.ignore_case and not rule.regex:
+                    lower_rules.append((index, re.compile(re.escape(rule.pattern.lower()))))
+                else:
+                    rx = re.compile(rule.expression())
+                    (group_rules if rx.groups else case_rules).append((index, rx))
+            except re.error as e:
+                raise ValueError(f"잘못된 패턴 '{rule.pattern}': {e}")
+        try:
+            case_matcher = self._combine(rx.pattern for _, rx in case_rules)
+            lower_matcher = self._combine(rx.pattern for _, rx in lower_rules)
+            lower_fallback_rules = [(index, re.compile(rx.pattern, re.IGNORECASE)) for index, rx in lower_rules]
+            lower_fallback = self._combine(f"(?i:{rx.pattern})" for _, rx in lower_rules)
+        except re.error as e:
+            raise ValueError(f"규칙을 합칠 수 없습니다: {e}")
+        self.rules = list(rules)
+        self.case_rules = case_rules
+        self.group_rules = group_rules
+        self.lower_rules = lower_rules
+        self.case_matcher = case_matcher
+        self.lower_matcher = lower_matcher
+        self.lower_fallback_rules = lower_fallback_rules
+        self.lower_fallback = lower_fallback
+        self.version += 1
+
+    def _combine(self, patterns):
+        patterns = list(patterns)
+        return re.compile("|".join(patterns)) if patterns else None
+
+    def _identify(self, candidates, text, start, end):
+        # 합친 정규식은 앞쪽 규칙부터 시도하므로 같은 순서로 확인하면 같은 규칙이 나온다
+        for index, rx in candidates:
+            m = rx.match(text, start)
+            if m and m.end() == end:
+                return index
+        return candidates[0][0]
+
+    def _spans(self, matcher, candidates, text):
+        return [(m.start(), m.end(), self._identify(candidates, text, m.start(), m.end()))
+                for m in matcher.finditer(text) if m.end() > m.start()]
+
+    def match(self, text):
+        spans = []
+        if self.case_matcher is not None:
+            spans = self._spans(self.case_matcher, self.case_rules, text)
+        for index, rx in self.group_rules:
+            found = [(m.start(), m.end(), index) for m in rx.finditer(text) if m.end() > m.start()]
+            if found:
+                spans = self._merge(spans, found) if spans else found
+        if self.lower_matcher is not None:
+            lowered = text.lower()
+            if len(lowered) == len(text):
+                lower_spans = self._spans(self.lower_matcher, self.lower_rules, lowered)
+            else:
+                # 소문자로 바꾸면 길이가 변하는 문자가 있으면 위치가 어긋나므로 느린 경로로 검사한다
+                lower_spans = self._spans(self.lower_fallback, self.lower_fallback_rules, text)
+            if lower_spans:
+                spans = self._merge(spans, lower_spans) if spans else lower_spans
+        return spans or None
+
+    def _merge(self, first, second):
+        merged = []
+        last_end = -1
+        for span in sorted(first + second):
+            if span[0] >= last_end:
+                merged.append(span)
+                last_end = span[1]
+        return merged
+
+    def match_batch(self, entries):
+        if self.case_matcher is None and self.lower_matcher is None and not self.group_rules:
+            return None
+        return [self.match(text) for _, text in entries]
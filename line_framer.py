@@ -0,0 +1,187 @@
+FRAMING_OPTIONS = ["LF", "CRLF", "NUL", "FIXED:16", "LEN:1", "LEN:2", "LEN:4", "COBS", "SLIP"]
+
+
+def cobs_decode(frame):
+    # 코드 바이트 하나가 다음 0 까지의 길이를 알려 주므로 바이트가 아니라 블록 단위로 복사한다
+    out = bytearray()
+    index = 0
+    size = len(frame)
+    while index < size:
+        code = frame[index]
+        end = index + code
+        if code == 0 or end > size:
+            raise ValueError("COBS 프레임이 깨졌습니다")
+        out += frame[index + 1:end]
+        index = end
+        if code < 0xFF and index < size:
+            out.append(0)
+    return bytes(out)
+
+
+def slip_decode(frame):
+    # ESC(DB) 는 항상 이스케이프 쌍의 첫 바이트이므로 replace 두 번으로 풀 수 있다
+    if b'\xdb' not in frame:
+        return frame
+    return frame.replace(b'\xdb\xdc', b'\xc0').replace(b'\xdb\xdd', b'\xdb')
+
+
+UNSTUFF = {"cobs": cobs_decode, "slip": slip_decode}
+
+
+class LineFramer:
+    MODE_DELIMITER = "delimiter"
+    MODE_FIXED = "fixed"
+    MODE_LENGTH = "length"
+
+    def __init__(self, mode=MODE_DELIMITER, delimiter=b'\n', frame_length=0,
+                 length_size=1, byteorder='little', strip_cr=True, max_frame_size=65536, unstuff=None):
+        if mode == self.MODE_DELIMITER and not delimiter:
+            raise ValueError("구분자가 비어 있습니다")
+        if mode == self.MODE_FIXED and frame_length <= 0:
+            raise ValueError("고정 길이는 1 이상이어야 합니다")
+        if mode == self.MODE_LENGTH and length_size not in (1, 2, 4):
+            raise ValueError("길이 필드는 1, 2, 4 바이트만 지원합니다")
+        self.mode = mode
+        self.delimiter = bytes(delimiter)
+        self.frame_length = frame_length
+        self.length_size = length_size
+        self.byteorder = byteorder
+        self.strip_cr = strip_cr and self.delimiter == b'\n'
+        self.max_frame_size = max_frame_size
+        self.unstuff = UNSTUFF[unstuff] if unstuff else None  # 구분자로 자른 뒤 COBS/SLIP 을 푼다
+        self.decode_errors = 0
+        self.buffer = bytearray()
+        self.scan_offset = 0  # 구분자 검색을 이어서 시작할 위치
+
+    def reset(self):
+        self.buffer = bytearray()
+        self.scan_offset = 0
+
+    def pending(self):
+        return len(self.buffer)
+
+    def feed(self, data):
+        if data:
+            self.buffer += data
+        if not self.buffer:
+            return []
+        if self.mode == self.MODE_FIXED:
+            frames, consumed = self._split_fixed()
+        elif self.mode == self.MODE_LENGTH:
+            frames, consumed = self._split_length_prefixed()
+        else:
+            frames, consumed = self._split_delimited()
+        if consumed:
+            # 남은 미완성 프레임만 앞으로 당긴다
+            del self.buffer[:consumed]
+            self.scan_offset = max(0, self.scan_offset - consumed)
+        if self.unstuff is not None and frames:
+            return self._unstuff(frames)
+        return frames
+
+    def flush(self):
+        # 구분자가 오지 않은 나머지 데이터를 하나의 프레임으로 내보낸다
+        if not self.buffer:
+            return []
+        frame = bytes(self.buffer)
+        self.reset()
+        if self.strip_cr and frame.endswith(b'\r'):
+            frame = frame[:-1]
+        if self.unstuff is not None:
+            return self._unstuff([frame])
+        return [frame]
+
+    def _unstuff(self, frames):
+        # 빈 프레임(연속된 구분자)은 버리고, 풀 수 없는 프레임은 원본 그대로 넘긴다
+        decode = self.unstuff
+        decoded = []
+        for frame in frames:
+            if not frame:
+                continue
+            try:
+                decoded.append(decode(frame))
+            except ValueError:
+                self.decode_errors += 1
+                decoded.append(frame)
+        return decoded
+
+    def _split_delimited(self):
+        frames = []
+        buf = self.buffer
+        delimiter = self.delimiter
+        delimiter_len = len(delimiter)
+        start = 0
+        # 새로 들어온 구간만 뒤에서부터 검색해서 마지막 구분자 위치를 찾는다
+        last = buf.rfind(delimiter, self.scan_offset)
+        with memoryview(buf) as view:
+            if last >= 0:
+                start = last + delimiter_len
+                block = bytes(view[:start])
+                frames = None
+                if self.strip_cr and b'\r' in block:
+                    # 보통은 모든 줄이 CRLF 로 끝나므로 CRLF 로 바로 나눈다. LF 만 있는 줄이 섞여 있을 때만
+                    # replace 로 한 번 더 복사한다 (replace 는 나누기보다 두 배 가까이 느리다)
+                    frames = block.split(b'\r\n')
+                    if block.count(delimiter) != len(frames) - 1:
+                        frames = block.replace(b'\r\n', b'\n').split(delimiter)
+                if frames is None:
+                    frames = block.split(delimiter)
+                frames.pop()
+            while len(buf) - start > self.max_frame_size:
+                # 구분자 없이 너무 긴 데이터는 강제로 자른다
+                frames.append(bytes(view[start:start + self.max_frame_size]))
+                start += self.max_frame_size
+        # 구분자가 버퍼 경계에 걸칠 수 있으므로 길이-1 만큼 되돌아가서 다시 검색한다
+        self.scan_offset = max(start, len(buf) - delimiter_len + 1)
+        return frames, start
+
+    def _split_fixed(self):
+        frames = []
+        size = self.frame_length
+        total = len(self.buffer) - len(self.buffer) % size
+        with memoryview(self.buffer) as view:
+            for start in range(0, total, size):
+                frames.append(bytes(view[start:start + size]))
+        return frames, total
+
+    def _split_length_prefixed(self):
+        frames = []
+        buf = self.buffer
+        header = self.length_size
+        start = 0
+        with memoryview(buf) as view:
+            while len(buf) - start >= header:
+                length = int.from_bytes(view[start:start + header], self.byteorder)
+                if length > self.max_frame_size:
+                    # 길이 필드가 깨진 경우 한 바이트씩 밀어서 재동기화한다
+                    start += 1
+                    continue
+                end = start + header + length
+                if end > len(buf):
+                    break
+                frames.append(bytes(view[start + header:end]))
+                start = end
+        return frames, start
+
+
+def make_framer(spec):
+    spec = (spec or "LF").strip().upper()
+    if spec == "LF":
+        return LineFramer(delimiter=b'\n')
+    if spec == "CRLF":
+        return LineFramer(delimiter=b'\r\n', strip_cr=False)
+    if spec == "CR":
+        return LineFramer(delimiter=b'\r', strip_cr=False)
+    if spec == "NUL":
+        return LineFramer(delimiter=b'\0', strip_cr=False)
+    if spec == "COBS":
+        return LineFramer(delimiter=b'\0', strip_cr=False, unstuff="cobs")
+    if spec == "SLIP":
+        return LineFramer(delimiter=b'\xc0', strip_cr=False, unstuff="slip")
+    if spec.startswith("FIXED:"):
+        return LineFramer(mode=LineFramer.MODE_FIXED, frame_length=int(spec.split(":", 1)[1]))
+    if spec.startswith("LEN:"):
+        parts = spec.split(":")
+        byteorder = 'big' if len(parts) > 2 and parts[2] == "BE" else 'little'
+        return LineFramer(mode=LineFramer.MODE_LENGTH, length_size=int(parts[1]), byteorder=byteorder)
+    raise ValueError(f"알 수 없는 프레이밍 설정: {spec}")
@@ -0,0 +1,161 @@
+from array import array
+from itertools import accumulate
+
+NO_TIMESTAMP = -1
+LINE_BREAK_MARK = "\u2424".encode('utf-8')  # 줄 안에 들어 있던 줄바꿈을 대신하는 기호
+
+
+class LineStore:
+    # 줄 내용은 하나의 bytes 영역에 "\n" 으로 끝나게 이어 붙이고, 줄마다 시작 위치와 시각만 배열로 갖고 있는다.
+    # 줄 안에는 줄바꿈이 없으므로 여러 줄을 한 번에 꺼내서 정규식으로 훑을 수 있다 (region).
+    # seq 는 처음 저장된 줄부터 0, 1, 2 ... 로 계속 증가하는 번호라서 앞부분을 잘라내도 바뀌지 않는다.
+    def __init__(self, max_lines=2000000, max_bytes=256 * 1024 * 1024):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.arena = bytearray()
+        self.arena_base = 0  # arena[0] 의 논리 위치
+        self.offsets = array('q')
+        self.timestamps = array('q')
+        self.marks = []  # 하이라이트 구간 (없으면 None)
+        self.mark_versions = array('l')  # marks 를 계산할 때의 규칙 버전
+        self.head = 0  # offsets 안에서 살아있는 첫 줄의 위치
+        self.first_seq = 0
+
+    def clear(self):
+        # seq 는 지운 뒤에도 이어서 증가한다
+        self.drop_head(len(self))
+
+    def __len__(self):
+        return len(self.offsets) - self.head
+
+    @property
+    def end_seq(self):
+        return self.first_seq + len(self)
+
+    def byte_size(self):
+        return self.arena_base + len(self.arena) - self.offsets[self.head] if len(self) else 0
+
+    def append_batch(self, entries, marks=None, marks_version=0):
+        if not entries:
+            return
+        encoded = [text.encode('utf-8', errors='replace') for _, text in entries]
+        data = b'\n'.join(encoded) + b'\n'
+        if data.count(b'\n') != len(encoded):
+            # NUL/고정 길이 구분 등으로 줄 안에 줄바꿈이 들어온 경우
+            encoded = [chunk.replace(b'\n', LINE_BREAK_MARK) for chunk in encoded]
+            data = b'\n'.join(encoded) + b'\n'
+        start = self.arena_base + len(self.arena)
+        self.offsets.append(start)
+        self.offsets.extend(start + offset for offset in accumulate(len(chunk) + 1 for chunk in encoded[:-1]))
+        self.timestamps.extend(NO_TIMESTAMP if timestamp_ns is None else timestamp_ns
+                               for timestamp_ns, _ in entries)
+        self.arena += data
+        self.marks.extend(marks if marks is not None else [None] * len(entries))
+        self.mark_versions.extend([marks_version] * len(entries))
+        self.trim()
+
+    def trim(self):
+        excess = len(self) - self.max_lines
+        if excess > 0:
+            self.drop_head(excess)
+        while len(self) > 1 and self.byte_size() > self.max_bytes:
+            self.drop_head(max(1, len(self) // 16))
+
+    def drop_head(self, count):
+        # 앞쪽 줄은 head 만 옮겨서 O(1) 로 버리고, 버린 양이 절반을 넘으면 한 번에 정리한다
+        count = min(count, len(self))
+        self.head += count
+        self.first_seq += count
+        if self.head > len(self.offsets) // 2:
+            self.compact()
+
+    def compact(self):
+        if self.head == 0:
+            return
+        if self.head >= len(self.offsets):
+            self.arena_base += len(self.arena)
+            self.arena = bytearray()
+            self.offsets = array('q')
+            self.timestamps = array('q')
+            self.marks = []
+            self.mark_versions = array('l')
+        else:
+            cut = self.offsets[self.head] - self.arena_base
+            del self.arena[:cut]
+            self.arena_base += cut
+            del self.offsets[:self.head]
+            del self.timestamps[:self.head]
+            del self.marks[:self.head]
+            del self.mark_versions[:self.head]
+        self.head = 0
+
+    def _span(self, index):
+        start = self.offsets[index] - self.arena_base
+        if index + 1 < len(self.offsets):
+            end = self.offsets[index + 1] - self.arena_base
+        else:
+            end = len(self.arena)
+        return start, end
+
+    def get(self, seq):
+        index = seq - self.first_seq + self.head
+        if seq < self.first_seq or index >= len(self.offsets):
+            raise IndexError(seq)
+        start, end = self._span(index)
+        timestamp_ns = self.timestamps[index]
+        return (None if timestamp_ns == NO_TIMESTAMP else timestamp_ns,
+                self.arena[start:end - 1].decode('utf-8', errors='replace'))
+
+    def region(self, seq, stop):
+        # seq 부터 stop 앞까지의 줄을 "\n" 으로 끝나는 bytes 하나로 꺼낸다
+        seq = max(seq, self.first_seq)
+        stop = min(stop, self.end_seq)
+        if seq >= stop:
+            return b""
+        first = seq - self.first_seq + self.head
+        last = stop - self.first_seq + self.head
+        end = self.offsets[last] - self.arena_base if last < len(self.offsets) else len(self.arena)
+        return memoryview(self.arena)[self.offsets[first] - self.arena_base:end].tobytes()
+
+    def line_starts(self, seq, stop):
+        # region() 과 같은 범위의 줄마다 시작 위치 (첫 줄의 시작이 region 의 0 번째 바이트)
+        seq = max(seq, self.first_seq)
+        stop = min(stop, self.end_seq)
+        return self.offsets[seq - self.first_seq + self.head:stop - self.first_seq + self.head].tolist()
+
+    def last_timestamp(self):
+        # 시각이 있는 마지막 줄의 시각 (없으면 None)
+        for index in range(len(self.offsets) - 1, self.head - 1, -1):
+            if self.timestamps[index] != NO_TIMESTAMP:
+                return self.timestamps[index]
+        return None
+
+    def find_timestamp(self, timestamp_ns):
+        # 시각이 timestamp_ns 이상인 첫 줄의 seq. 시각이 없는 줄은 앞 줄과 같은 시각으로 본다
+        low = self.head
+        high = len(self.offsets)
+        timestamps = self.timestamps
+        while low < high:
+            mid = (low + high) // 2
+            probe = mid
+            while probe > self.head and timestamps[probe] == NO_TIMESTAMP:
+                probe -= 1
+            if timestamps[probe] == NO_TIMESTAMP or timestamps[probe] < timestamp_ns:
+                low = mid + 1
+            else:
+                high = mid
+        return low - self.head + self.first_seq
+
+    def get_marks(self, seq):
+        index = seq - self.first_seq + self.head
+        return self.marks[index], self.mark_versions[index]
+
+    def set_marks(self, seq, marks, marks_version):
+        index = seq - self.first_seq + self.head
+        self.marks[index] = marks
+        self.mark_versions[index] = marks_version
+
+    def get_range(self, seq, count):
+        seq = max(seq, self.first_seq)
+        stop = min(seq + count, self.end_seq)
+        return [self.get(index) for index in range(seq, stop)]
@@ -0,0 +1,337 @@
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+WORD = re.compile(rb'[a-z\x80-\xff]{3,}')  # 색인하는 토큰: bytes.lower() 한 뒤 세 글자(바이트) 이상의 글자 묶음
+DIGITS = b"0123456789"
+BLOCK_LINES = 1024  # 색인은 줄 단위가 아니라 이만큼의 줄 묶음 단위로 토큰 위치를 기록한다
+SCAN_LINES = 65536  # 한 번에 꺼내서 훑는 줄 수 (메모리 상한)
+FILTER_TERM = re.compile(r'(-?)(?:(re|port|from|to):)?(?:"([^"]*)"|(\S+))')
+
+
+class LineIndex:
+    # LineStore 의 줄을 묶음이 찰 때마다 한 번만 토큰으로 나눠서 토큰 -> 줄 묶음 번호 목록을 만든다.
+    # 찾을 때는 토큰이 나온 묶음(과 아직 색인하지 않은 마지막 묶음)만 실제 조건으로 다시 훑으므로
+    # 결과는 전체를 훑은 것과 같다.
+    def __init__(self, store):
+        self.store = store
+        self.postings = {}  # 토큰 -> array('q') 묶음 번호 (오름차순)
+        self.indexed_seq = store.end_seq // BLOCK_LINES * BLOCK_LINES  # 여기 앞까지 색인했다 (묶음 경계)
+        self.first_block = 0  # 이보다 앞 묶음은 postings 에서 정리했다
+
+    def update(self):
+        store = self.store
+        self.indexed_seq = max(self.indexed_seq, store.first_seq // BLOCK_LINES * BLOCK_LINES)
+        while self.indexed_seq + BLOCK_LINES <= store.end_seq:
+            block = self.indexed_seq // BLOCK_LINES
+            # 숫자를 지우면 같은 형식의 줄이 하나로 모이므로 서로 다른 줄만 토큰으로 나눈다.
+            # 숫자를 지워서 붙은 글자 묶음은 원래 묶음을 포함하므로 후보에서 빠지는 줄은 없다
+            data = store.region(self.indexed_seq, self.indexed_seq + BLOCK_LINES).lower()
+            templates = set(data.translate(None, DIGITS).split(b"\n"))
+            for token in set(WORD.findall(b"\n".join(templates))):
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = array('q')
+                postings.append(block)
+            self.indexed_seq += BLOCK_LINES
+        self.prune(store.first_seq // BLOCK_LINES)
+
+    def prune(self, first_block):
+        # LineStore 에서 잘려 나간 줄의 묶음이 절반을 넘으면 정리한다
+        if first_block - self.first_block <= (self.indexed_seq // BLOCK_LINES - self.first_block) // 2:
+            return
+        for token in list(self.postings):
+            postings = self.postings[token]
+            cut = bisect_left(postings, first_block)
+            if cut == len(postings):
+                del self.postings[token]
+            elif cut:
+                del postings[:cut]
+        self.first_block = first_block
+
+    def candidate_ranges(self, keys, lo, hi):
+        # 모든 key 를 포함하는 토큰이 나온 묶음들을 [lo, hi) 안의 seq 구간 목록으로 돌려준다
+        if lo >= hi:
+            return []
+        if not keys:
+            return [(lo, hi)]
+        first_block = lo // BLOCK_LINES
+        last_block = (min(hi, self.indexed_seq) - 1) // BLOCK_LINES
+        blocks = None
+        for key in keys:
+            found = set()
+            for token, postings in self.postings.items():
+                if key in token:
+                    found.update(postings[bisect_left(postings, first_block):bisect_right(postings, last_block)])
+            blocks = found if blocks is None else blocks & found
+        ranges = []
+        for block in sorted(blocks):
+            start = max(lo, block * BLOCK_LINES)
+            stop = min(hi, (block + 1) * BLOCK_LINES)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], stop)
+            else:
+                ranges.append((start, stop))
+        if self.indexed_seq < hi:
+            start = max(lo, self.indexed_seq)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], hi)
+            else:
+                ranges.append((start, hi))
+        return ranges
+
+
+class FilterTerm:
+    def __init__(self, pattern, regex=False):
+        self.pattern = pattern
+        self.regex = regex
+        if regex:
+            try:
+                self.rx = re.compile(pattern, re.MULTILINE)
+            except re.error as e:
+                raise ValueError(f"잘못된 정규식 '{pattern}': {e}")
+            self.key = None
+        else:
+            # 문자열 조건은 ASCII 대소문자를 무시한다. 저장된 바이트를 bytes.lower() 로 한 번에 바꾼 뒤 찾는다
+            self.needle = pattern.encode('utf-8', errors='replace').lower()
+            self.rx = re.compile(re.escape(self.needle))
+            words = WORD.findall(self.needle)
+            self.key = max(words, key=len) if words else None  # 색인에서 후보를 고를 때 쓰는 글자 묶음
+
+
+def parse_filter_time(value, end=False):
+    # "12:30", "12:30:05", "12:30:05.250", "2024-05-01T12:30:05" (날짜가 없으면 오늘).
+    # to 는 적은 자리까지 포함하도록 그 단위만큼 뒤로 민다
+    date_text, _, clock = value.rpartition('T')
+    clock, _, fraction = clock.partition('.')
+    unit_ns = 1_000_000_000
+    if clock.count(':') == 1:
+        clock += ":00"
+        unit_ns = 60_000_000_000
+    try:
+        seconds = time.mktime(time.strptime(f"{date_text or time.strftime('%Y-%m-%d')} {clock}",
+                                            "%Y-%m-%d %H:%M:%S"))
+        if fraction and not fraction.isdigit():
+            raise ValueError(fraction)
+    except ValueError:
+        raise ValueError(f"시각 형식이 잘못되었습니다: {value} (예: 12:30, 12:30:05.250, 2024-05-01T12:30:05)")
+    timestamp_ns = int(seconds) * 1_000_000_000
+    if fraction:
+        fraction = fraction[:9]
+        timestamp_ns += int(fraction.ljust(9, "0"))
+        unit_ns = 10 ** (9 - len(fraction))
+    return timestamp_ns + unit_ns if end else timestamp_ns
+
+
+class LineFilter:
+    # 필터 식: 공백으로 나눈 조건을 모두 만족하는 줄만 보인다
+    #   단어 / "여러 단어"   포함 (대소문자 무시)        -단어   제외
+    #   re:정규식          정규식 포함                  -re:정규식  정규식 제외
+    #   port:이름          포트 (여러 개면 그중 하나)
+    #   from:12:30:00 to:12:31  시각 범위
+    def __init__(self, text="", includes=None, excludes=None, ports=None, time_from_ns=None, time_to_ns=None):
+        self.text = text
+        self.includes = includes or []
+        self.excludes = excludes or []
+        self.ports = ports or []
+        self.time_from_ns = time_from_ns
+        self.time_to_ns = time_to_ns
+
+    def port_rule(self, label=None):
+        # 포트 탭(label) 에서는 포트 조건이 참/거짓으로 정해지고, 합친 탭에서는 "[포트] " 접두어를 본다
+        if not self.ports:
+            return None
+        if label is not None:
+            return None if label.lower() in (port.lower() for port in self.ports) else False
+        return tuple(f"[{port}] ".encode('utf-8', errors='replace').lower() for port in self.ports)
+
+
+def parse_filter(text):
+    line_filter = LineFilter(text)
+    for match in FILTER_TERM.finditer(text):
+        exclude, keyword, quoted, plain = match.groups()
+        value = quoted if quoted is not None else plain
+        if not value:
+            continue
+        if keyword == "port":
+            line_filter.ports.append(value)
+        elif keyword == "from":
+            line_filter.time_from_ns = parse_filter_time(value)
+        elif keyword == "to":
+            line_filter.time_to_ns = parse_filter_time(value, end=True)
+        else:
+            term = FilterTerm(value, regex=keyword == "re")
+            (line_filter.excludes if exclude else line_filter.includes).append(term)
+    return line_filter
+
+
+def matching_lines(rx, text):
+    # 정규식 조건: text 는 줄마다 "\n" 으로 끝난다. 정규식을 한 번에 돌려서 매치가 있는 줄 번호를 모으고,
+    # 줄 경계를 넘은 매치만 그 줄 안에서 다시 확인한다
+    lines = []
+    line = 0
+    counted = 0
+    pos = 0
+    size = len(text)
+    while pos < size:
+        match = rx.search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        if start >= size:
+            break  # 마지막 "\n" 뒤의 빈 자리에서 맞은 것 (^$, $ 등). 줄이 아니다
+        line += text.count("\n", counted, start)
+        counted = start
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = size
+        if match.end() <= line_end or rx.search(text, text.rfind("\n", 0, start) + 1, line_end):
+            lines.append(line)
+        pos = line_end + 1
+    return lines
+
+
+def hit_lines(rx, data, starts):
+    # data 안에서 rx 가 나온 줄 번호. starts 는 줄마다 시작 위치 (LineStore.line_starts)
+    base = starts[0]
+    lines = []
+    last = -1
+    for match in rx.finditer(data):
+        line = bisect_right(starts, base + match.start()) - 1
+        if line != last:  # 찾은 위치는 앞에서부터 나오므로 바로 앞 줄과만 비교하면 된다
+            lines.append(line)
+            last = line
+    return lines
+
+
+class FilteredLines:
+    # 필터에 맞는 줄의 seq 목록. LogDisplay 는 LineStore 대신 이것을 같은 방식으로 읽는다.
+    # 여기서 first_seq/end_seq 는 목록 안의 위치이고, 앞쪽이 잘려도 위치 번호는 바뀌지 않는다
+    def __init__(self, store, index, line_filter, label=None):
+        self.store = store
+        self.line_filter = line_filter
+        self.port_rule = line_filter.port_rule(label)
+        self.head = 0
+        self.first_seq = 0
+        self.last_timestamp_ns = store.last_timestamp()
+        self.seqs = array('q') if self.port_rule is False else self.select(index)
+
+    def __len__(self):
+        return len(self.seqs) - self.head
+
+    @property
+    def end_seq(self):
+        return self.first_seq + len(self)
+
+    def select(self, index):
+        store = self.store
+        line_filter = self.line_filter
+        lo, hi = store.first_seq, store.end_seq
+        if line_filter.time_from_ns is not None:
+            lo = max(lo, store.find_timestamp(line_filter.time_from_ns))
+        if line_filter.time_to_ns is not None:
+            hi = min(hi, store.find_timestamp(line_filter.time_to_ns))
+        seqs = array('q')
+        keys = [term.key for term in line_filter.includes if term.key]
+        for start, stop in index.candidate_ranges(keys, lo, hi):
+            for chunk in range(start, stop, SCAN_LINES):
+                seqs.extend(self.scan(chunk, min(stop, chunk + SCAN_LINES)))
+        return seqs
+
+    def scan(self, start, stop):
+        # 줄 번호 목록을 조건마다 좁혀 간다 (None 은 전체)
+        data = self.store.region(start, stop)
+        lowered = data.lower()
+        count = stop - start
+        lines = None
+        text = None
+        selected = None
+        if self.port_rule is not None:
+            lines = lowered.split(b"\n")
+            lines.pop()
+            port_rule = self.port_rule
+            selected = [number for number, line in enumerate(lines) if line.startswith(port_rule)]
+        terms = sorted(self.line_filter.includes, key=lambda term: term.regex)
+        for exclude, term in [(False, term) for term in terms] + [(True, term) for term in self.line_filter.excludes]:
+            if selected is not None and not selected:
+                return []
+            if term.regex:
+                if text is None:
+                    text = data.decode('utf-8', errors='replace')
+                found = set(matching_lines(term.rx, text))
+                candidates = range(count) if selected is None else selected
+                selected = [number for number in candidates if (number in found) != exclude]
+            elif selected is None and not exclude and lowered.count(term.needle) < count // 2:
+                # 드문 문자열은 찾은 위치마다 줄 번호만 센다
+                selected = hit_lines(term.rx, lowered, self.store.line_starts(start, stop))
+            else:
+                if lines is None:
+                    lines = lowered.split(b"\n")
+                    lines.pop()
+                needle = term.needle
+                if selected is None:
+                    selected = [number for number, line in enumerate(lines) if (needle in line) != exclude]
+                else:
+                    selected = [number for number in selected if (needle in lines[number]) != exclude]
+        if selected is None:
+            return range(start, stop)
+        return [start + number for number in selected]
+
+    def matches(self, timestamp_ns, text):
+        # 새로 들어온 줄은 여기서 한 번만 검사한다. 시각이 없는 줄은 앞 줄의 시각을 쓴다
+        if timestamp_ns is None:
+            timestamp_ns = self.last_timestamp_ns
+        else:
+            self.last_timestamp_ns = timestamp_ns
+        line_filter = self.line_filter
+        if line_filter.time_from_ns is not None and (timestamp_ns is None or timestamp_ns < line_filter.time_from_ns):
+            return False
+        if line_filter.time_to_ns is not None and timestamp_ns is not None and timestamp_ns >= line_filter.time_to_ns:
+            return False
+        if self.port_rule is False:
+            return False
+        lowered = text.encode('utf-8', errors='replace').lower()
+        if self.port_rule is not None and not lowered.startswith(self.port_rule):
+            return False
+        for term in line_filter.includes:
+            if (not term.rx.search(text)) if term.regex else lowered.find(term.needle) < 0:
+                return False
+        for term in line_filter.excludes:
+            if term.rx.search(text) if term.regex else lowered.find(term.needle) >= 0:
+                return False
+        return True
+
+    def extend(self, start_seq, entries):
+        self.seqs.extend(start_seq + offset for offset, (timestamp_ns, text) in enumerate(entries)
+                         if self.matches(timestamp_ns, text))
+        self.sync()
+
+    def sync(self):
+        # LineStore 에서 잘려 나간 줄을 목록 앞에서 뺀다
+        cut = bisect_left(self.seqs, self.store.first_seq, self.head)
+        self.first_seq += cut - self.head
+        self.head = cut
+        if self.head > len(self.seqs) // 2:
+            del self.seqs[:self.head]
+            self.head = 0
+
+    def position_of(self, seq):
+        index = bisect_left(self.seqs, seq, self.head)
+        if index < len(self.seqs) and self.seqs[index] == seq:
+            return index - self.head + self.first_seq
+        return None
+
+    def _seq(self, position):
+        return self.seqs[position - self.first_seq + self.head]
+
+    def get_range(self, position, count):
+        position = max(position, self.first_seq)
+        index = position - self.first_seq + self.head
+        return [self.store.get(seq) for seq in self.seqs[index:index + max(0, count)]]
+
+    def get_marks(self, position):
+        return self.store.get_marks(self._seq(position))
+
+    def set_marks(self, position, marks, marks_version):
+        self.store.set_marks(self._seq(position), marks, marks_version)
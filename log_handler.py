@@ -1,86 +1,138 @@
-import os
-import datetime
 import time
-import tkinter as tk
-from collections import deque
+from log_writer import LogFileWriter
+from capture_format import CaptureWriter, capture_path_for
+from line_store import LineStore
+from log_filter import LineIndex, FilteredLines
+from field_extractor import FieldStore
+from highlighter import HighlightEngine, HighlightRule
+from utils import format_log_entry
 
 class LogHandler:
-    def __init__(self, log_text_widget):
-        self.log_text = log_text_widget
-        self.is_logging = False
-        self.log_file = None
+    def __init__(self, log_display, highlight_engine=None, field_extractor=None, label=""):
+        self.log_display = log_display
+        self.writer = LogFileWriter()
+        self.capture_writer = CaptureWriter()  # 원본 바이트 저장 (.ucap)
         self.log_save_path = ""
         self.last_color_update = time.time()
         self.color_update_interval = 1
-        self.auto_scroll_var = tk.BooleanVar(value=True)  # 추가
-        self.log_buffer = deque(maxlen=1000)  # 최대 1000개의 로그 항목 유지
+        self.line_store = LineStore()  # 화면에는 보이는 줄만 그리고 전체 기록은 여기에 보관
+        self.line_index = LineIndex(self.line_store)  # 필터가 후보 줄을 빨리 고르도록 들어온 줄을 한 번씩 색인한다
+        self.filter_view = None  # 필터가 켜져 있으면 맞는 줄의 목록 (FilteredLines)
+        self.timestamp_precision = "s"
+        self.highlight_engine = highlight_engine or HighlightEngine()  # 여러 탭이 같은 규칙을 쓰도록 공유할 수 있다
+        self.highlight_rules = []  # setup.txt 에 정의된 규칙
+        # 숫자 필드는 포트 탭에서만 뽑는다 (합친 탭은 같은 줄을 다시 보므로 None)
+        self.field_store = FieldStore(field_extractor, label) if field_extractor is not None else None
+        self.storm = None  # StormCompactor. 있으면 폭주하는 같은 줄을 화면에서 요약 줄로 줄인다
+        self.storm_file = False  # True 이면 파일에도 줄인 줄을 저장한다
+        self.log_display.attach(self.line_store, self.format_entry, self.highlight_engine)
 
-    def start_logging(self, log_save_path, log_name):
-        current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if log_name:
-            file_name = f"{log_name}_{current_time}.log"
-        else:
-            file_name = f"project_name_{current_time}.log"
-        
-        file_path = os.path.join(log_save_path, file_name)
-        
-        try:
-            self.log_file = open(file_path, 'w', encoding='utf-8')
-            self.is_logging = True
-            return True, file_path
-        except Exception as e:
-            return False, str(e)
+    @property
+    def is_logging(self):
+        return self.writer.is_logging
+
+    def start_logging(self, log_save_path, log_name, raw=False):
+        success, file_path = self.writer.start(log_save_path, log_name)
+        if success and raw:
+            raw_success, message = self.capture_writer.open(capture_path_for(file_path))
+            if not raw_success:
+                self.writer.stop()
+                return False, message
+        return success, file_path
 
     def stop_logging(self):
-        if self.log_file:
-            self.log_file.close()
-            self.log_file = None
-        self.is_logging = False
+        self.writer.stop()
+        self.capture_writer.close()
+
+    def format_entry(self, timestamp_ns, text):
+        return format_log_entry(timestamp_ns, text, self.timestamp_precision)
+
+    def set_timestamp_precision(self, precision):
+        self.timestamp_precision = precision
+        self.log_display.refresh(force=True)
+
+    def append_entries(self, entries):
+        store = self.line_store
+        start_seq = store.end_seq
+        store.append_batch(entries, self.highlight_engine.match_batch(entries), self.highlight_engine.version)
+        self.line_index.update()
+        if self.filter_view is not None:
+            self.filter_view.extend(start_seq, entries)
+
+    def set_filter(self, line_filter, label=None):
+        # label 은 포트 탭의 포트 이름 (합친 탭이면 None)
+        if line_filter is None:
+            self.filter_view = None
+        else:
+            self.filter_view = FilteredLines(self.line_store, self.line_index, line_filter, label)
+        self.log_display.set_view(self.filter_view)
 
     def update_log(self, message):
-        self.log_text.config(state='normal')
-        self.log_text.insert('end', message + "\n")
-        self.log_text.config(state='disabled')
+        self.append_entries([(None, message)])
+        self.log_display.refresh()
         
-        if self.is_logging and self.log_file:
-            self.log_file.write(message + "\n")
-            self.log_file.flush()
+        if self.is_logging:
+            self.writer.write_lines([message])
 
     def clear_log(self):
-        self.log_text.config(state='normal')
-        self.log_text.delete(1.0, 'end')
-        self.log_text.config(state='disabled')
+        self.line_store.clear()
+        if self.filter_view is not None:
+            self.filter_view.sync()
+        self.log_display.refresh(force=True)
 
-    def update_log_batch(self, messages):
-        self.log_text.config(state='normal')
-        for message in messages:
-            self.log_buffer.append(message)
-            self.log_text.insert('end', message + "\n")
-            if self.is_logging and self.log_file:
-                self.log_file.write(message + "\n")
-        if self.is_logging and self.log_file:
-            self.log_file.flush()
-        
-        # 로그 텍스트 위젯의 라인 수 제한
-        while int(self.log_text.index('end-1c').split('.')[0]) > 1000:
-            self.log_text.delete('1.0', '2.0')
-        
-        if self.auto_scroll_var.get():
-            self.log_text.see('end')
-        self.log_text.config(state='disabled')
+    def set_storm(self, compactor, apply_to_file=False):
+        self.storm = compactor
+        self.storm_file = apply_to_file
+
+    def update_log_batch(self, entries):
+        # 하이라이트와 필터는 줄이 들어올 때 한 번만 검사해서 결과를 같이 저장한다.
+        # 화면에 넣은 줄을 돌려준다 (줄이기가 켜져 있으면 줄인 결과).
+        # 화면은 여기서 다시 그리지 않는다. 부른 쪽이 프레임 끝에 log_display.refresh() 를 한 번 부른다
+        shown = entries if self.storm is None else self.storm.process(entries)
+        if shown:
+            self.append_entries(shown)
+        if self.field_store is not None:
+            self.field_store.extract(entries)  # 그래프는 생략한 줄의 값까지 모두 쓴다
+        if self.is_logging:
+            written = shown if self.storm_file else entries
+            self.writer.write_lines([self.format_entry(timestamp_ns, text) for timestamp_ns, text in written])
+        return shown
+
+    def flush_storm(self, now_ns):
+        # 폭주가 멈춘 뒤 남은 요약 줄을 넣는다. 넣은 줄을 돌려준다 (화면 갱신은 update_log_batch 와 같이 부른 쪽에서)
+        if self.storm is None:
+            return []
+        entries = self.storm.flush(now_ns)
+        if entries:
+            self.append_entries(entries)
+            if self.is_logging and self.storm_file:
+                self.writer.write_lines([self.format_entry(timestamp_ns, text) for timestamp_ns, text in entries])
+        return entries
+
+    def find_line(self, timestamp_ns, text, window_ns=1_000_000_000):
+        # 파일에 저장된 시각은 표시 단위로 잘려 있으므로 window_ns 범위 안에서 같은 내용의 줄을 찾는다
+        store = self.line_store
+        seq = store.find_timestamp(timestamp_ns)
+        while seq < store.end_seq:
+            line_timestamp_ns, line_text = store.get(seq)
+            if line_timestamp_ns is not None and line_timestamp_ns >= timestamp_ns + window_ns:
+                break
+            if line_text == text:
+                return seq
+            seq += 1
+        return None
 
     def update_log_color(self, color_var, search_text):
-        if color_var.get() == "on" and search_text:
-            self.log_text.config(state='normal')
-            self.log_text.tag_remove("highlight", "1.0", 'end')
-            start = "1.0"
-            while True:
-                start = self.log_text.search(search_text, start, stopindex='end')
-                if not start:
-                    break
-                end = f"{start}+{len(search_text)}c"
-                self.log_text.tag_add("highlight", start, end)
-                start = end
-            self.log_text.tag_config("highlight", foreground="blue")
-            self.log_text.config(state='disabled')
+        rules = []
+        if color_var.get() == "on":
+            rules.extend(self.highlight_rules)
+            if search_text:
+                rules.append(HighlightRule(search_text, "blue"))
+        try:
+            self.highlight_engine.set_rules(rules)
+        except ValueError as e:
+            self.highlight_engine.set_rules([])
+            return False, str(e)
+        finally:
+            self.log_display.refresh(force=True)
+        return True, None
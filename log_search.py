@@ -0,0 +1,175 @@
+import os
+import re
+import gzip
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from utils import parse_log_timestamp
+
+CHUNK_SIZE = 8 * 1024 * 1024
+GZIP_READ_SIZE = 1024 * 1024  # .gz 는 통째로 풀지 않고 이만큼씩 풀어서 검색
+PARALLEL_THRESHOLD = 4 * 1024 * 1024  # 이보다 작으면 프로세스를 띄우지 않고 바로 검색
+LOG_EXTENSIONS = (".log", ".log.gz")
+
+
+class SearchHit:
+    def __init__(self, path, line_number, timestamp_ns, text):
+        self.path = path
+        self.line_number = line_number
+        self.timestamp_ns = timestamp_ns
+        self.text = text
+
+
+def find_log_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in os.listdir(path):
+                full_path = os.path.join(path, name)
+                if name.endswith(LOG_EXTENSIONS) and os.path.isfile(full_path):
+                    files.append(full_path)
+        elif os.path.isfile(path):
+            files.append(path)
+    # 오래된 세션부터 순서대로
+    return sorted(set(files), key=lambda file_path: (os.path.getmtime(file_path), file_path))
+
+
+def compile_pattern(pattern, regex=False, ignore_case=False):
+    body = pattern.encode('utf-8')
+    if not regex:
+        body = re.escape(body)
+    try:
+        return re.compile(body, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"잘못된 패턴 '{pattern}': {e}")
+
+
+def split_chunks(path, chunk_size=CHUNK_SIZE):
+    # 줄 경계에 맞춰 파일을 나눈다
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    chunks = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(size, start + chunk_size)
+            if end < size:
+                newline = mm.find(b'\n', end)
+                end = size if newline < 0 else newline + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def _scan(buffer, start, end, matcher, max_hits):
+    # buffer[start:end] 에서 찾은 줄을 (청크 안에서의 줄 번호, 줄) 로 돌려주고 청크의 전체 줄 수도 센다
+    hits = []
+    line_count = 0
+    counted_to = start
+    position = start
+    while position < end:
+        match = matcher.search(buffer, position, end)
+        if match is None:
+            break
+        line_start = buffer.rfind(b'\n', start, match.start()) + 1
+        if line_start < start:
+            line_start = start
+        line_end = buffer.find(b'\n', match.start(), end)
+        if line_end < 0:
+            line_end = end
+        line_count += buffer[counted_to:line_start].count(b'\n')
+        counted_to = line_start
+        hits.append((line_count, bytes(buffer[line_start:line_end]).rstrip(b'\r')))
+        position = line_end + 1
+        if max_hits and len(hits) >= max_hits:
+            break
+    line_count += buffer[counted_to:end].count(b'\n')
+    return line_count, hits
+
+
+def search_chunk(path, start, end, matcher, max_hits=0):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _scan(mm, start, end, matcher, max_hits)
+
+
+def search_gzip(path, matcher, max_hits=0, read_size=GZIP_READ_SIZE):
+    # 압축을 풀면서 read_size 씩 읽어서 검색한다. 덜 끝난 마지막 줄은 다음 조각 앞에 붙이고
+    # 줄 번호는 앞 조각까지의 줄 수만큼 더한다
+    hits = []
+    line_count = 0
+    rest = b''
+    with gzip.open(path, 'rb') as file:
+        while True:
+            data = file.read(read_size)
+            if not data:
+                break
+            buffer = rest + data
+            end = buffer.rfind(b'\n') + 1
+            rest = buffer[end:]
+            if not end:
+                continue
+            count, chunk_hits = _scan(buffer, 0, end, matcher, max_hits and max_hits - len(hits))
+            hits.extend((line_count + line_offset, line) for line_offset, line in chunk_hits)
+            line_count += count
+            if max_hits and len(hits) >= max_hits:
+                return line_count, hits
+    if rest:
+        count, chunk_hits = _scan(rest, 0, len(rest), matcher, max_hits and max_hits - len(hits))
+        hits.extend((line_count + line_offset, line) for line_offset, line in chunk_hits)
+        line_count += count
+    return line_count, hits
+
+
+def _make_hit(path, line_number, line):
+    text = line.decode('utf-8', errors='replace')
+    timestamp_ns, _ = parse_log_timestamp(text)
+    return SearchHit(path, line_number, timestamp_ns, text)
+
+
+def search_logs(paths, pattern, regex=False, ignore_case=False, workers=None, max_results=0, cancel=None):
+    matcher = compile_pattern(pattern, regex, ignore_case)
+    files = find_log_files(paths)
+    jobs = []
+    total_size = 0
+    for path in files:
+        if path.endswith(".gz"):
+            jobs.append((path, None))
+            total_size += os.path.getsize(path) * 8
+        else:
+            for start, end in split_chunks(path):
+                jobs.append((path, (start, end)))
+                total_size += end - start
+
+    found = 0
+    executor = None
+    if total_size >= PARALLEL_THRESHOLD and (workers is None or workers > 1) and len(jobs) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if executor is not None:
+            futures = [executor.submit(search_gzip, path, matcher, max_results) if chunk is None
+                       else executor.submit(search_chunk, path, chunk[0], chunk[1], matcher, max_results)
+                       for path, chunk in jobs]
+            results = (future.result() for future in futures)
+        else:
+            results = (search_gzip(path, matcher, max_results) if chunk is None
+                       else search_chunk(path, chunk[0], chunk[1], matcher, max_results)
+                       for path, chunk in jobs)
+
+        # 청크 결과는 순서대로 받아서 파일별 줄 번호를 이어 붙이고 바로 내보낸다
+        current_path = None
+        line_base = 0
+        for (path, _), (line_count, hits) in zip(jobs, results):
+            if path != current_path:
+                current_path = path
+                line_base = 0
+            for line_offset, line in hits:
+                yield _make_hit(path, line_base + line_offset + 1, line)
+                found += 1
+                if max_results and found >= max_results:
+                    return
+            line_base += line_count
+            if cancel is not None and cancel.is_set():
+                return
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
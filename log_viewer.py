@@ -0,0 +1,680 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os
+import queue
+import time
+import threading
+from ui_components import TopFrame, LogFrame, LogTabs, CommandFrame, CustomButtonsFrame, StatusBar, SearchPanel, StatsPanel, PlotPanel
+from log_handler import LogHandler
+from port_watcher import PortWatcher
+from port_session import PortSession, TimelineMerger, SYSTEM_SOURCE, port_label
+from render_scheduler import RenderScheduler
+from tx_scheduler import TxScript, is_script, parse_script
+from byte_format import parse_tx_input
+from log_search import search_logs
+from log_filter import parse_filter
+from trigger_capture import TriggerCapture
+from fanout_server import fanout_settings
+from storm_compactor import StormCompactor, storm_settings
+from field_extractor import FieldExtractor, EXPORT_FORMATS, export_fields, series_label
+from metrics import port_stats, render_stats, pipeline_snapshot, dump_stats, format_pipeline_stats
+from utils import parse_log_timestamp, capture_timestamp_ns
+from utils import get_script_dir, prevent_screen_sleep, allow_screen_sleep
+from setup import (create_default_setup_file, load_custom_commands, load_highlight_rules, load_options,
+                   load_field_rules, load_trigger_rules, load_storm_rules, update_setup_file)
+
+class UARTLogViewer:
+    def __init__(self, master):
+        self.master = master
+        master.title("UART 로그 뷰어")
+        self.setup_ui()
+        self.initialize_variables()
+        self.load_custom_commands()
+        self.create_custom_buttons()
+        
+        # 모든 포트의 줄을 한 큐에서 받아 한 번의 렌더 루프로 그린다
+        self.render_scheduler = RenderScheduler(self.master, self.log_queue, self.ingest,
+                                                status_callback=self.update_status,
+                                                frame_callback=self.flush_timeline)
+        self.render_scheduler.start()
+        # 포트 목록은 백그라운드에서 조회하므로 시작할 때 기다리지 않는다
+        self.port_watcher.start()
+
+    def setup_ui(self):
+        self.top_frame = TopFrame(self.master, self.refresh_ports, self.toggle_connection, self.toggle_prevent_sleep,
+                                  self.change_display_mode)
+        self.top_frame.port_combo.bind("<<ComboboxSelected>>", lambda event: self.update_connect_button())
+        self.log_frame = LogFrame(self.master, self.change_log_path, self.toggle_logging, self.clear_log, self.update_log_color,
+                                  self.change_timestamp_precision, self.open_search, self.open_stats,
+                                  self.apply_filter, self.open_plot, self.manual_trigger)
+        self.log_tabs = LogTabs(self.master, self.on_tab_changed)
+        self.merged_tab, self.log_display = self.log_tabs.add_tab("전체")
+        self.command_frame = CommandFrame(self.master, self.send_command, self.toggle_repeat)
+        self.custom_buttons_frame = CustomButtonsFrame(self.master)
+        self.status_bar = StatusBar(self.master)
+
+    def initialize_variables(self):
+        self.port_watcher = PortWatcher(on_change=lambda: self.render_scheduler.call_soon(self.update_port_list))
+        self.log_handler = LogHandler(self.log_display)  # "전체" 탭. 파일은 포트별로 저장한다
+        self.log_queue = queue.Queue()
+        self.sessions = {}  # source_id -> PortSession
+        self.session_tabs = {}  # 탭 이름 -> PortSession
+        self.next_source_id = SYSTEM_SOURCE + 1
+        self.timeline = TimelineMerger()
+        self.dirty_handlers = set()  # 이번 프레임에 줄을 넣어서 다시 그려야 하는 LogHandler
+        self.is_logging = False
+        self.writer_options = {}
+        self.repeat_session = None
+        self.custom_commands = {}
+        self.log_save_path = get_script_dir()
+        self.setup_file_path = os.path.join(self.log_save_path, 'setup.txt')
+        self.search_panel = None
+        self.search_hits = []
+        self.search_results = queue.Queue()
+        self.search_cancel = None
+        self.stats_panel = None
+        self.line_filter = None
+        self.filter_elapsed = 0.0
+        self.field_extractor = FieldExtractor()  # setup.txt 의 FIELD 규칙. 모든 포트가 공유한다
+        self.plot_panel = None
+        self.trigger_rules = []  # setup.txt 의 TRIG 규칙
+        self.storm_rules = []  # setup.txt 의 STORM 규칙
+
+    def refresh_ports(self):
+        self.port_watcher.refresh()
+
+    def update_port_list(self):
+        ports = self.port_watcher.devices()
+        self.top_frame.port_combo['values'] = ports
+        if ports and not self.top_frame.port_combo.get():
+            self.top_frame.port_combo.set(ports[0])
+        self.update_connect_button()
+
+    def all_handlers(self):
+        return [self.log_handler] + [session.log_handler for session in self.sessions.values()]
+
+    def find_session(self, port):
+        for session in self.sessions.values():
+            if session.port == port:
+                return session
+        return None
+
+    def current_session(self):
+        # 명령을 보낼 포트: 포트 탭을 보고 있으면 그 포트, "전체" 탭이면 포트 목록에서 고른 포트나 연결된 첫 포트
+        session = self.session_tabs.get(self.log_tabs.selected())
+        if session is None:
+            session = self.find_session(self.top_frame.port_combo.get())
+        if session is None or not session.is_connected():
+            session = next((other for other in self.sessions.values() if other.is_connected()), session)
+        return session
+
+    def create_session(self, port):
+        tab, display = self.log_tabs.add_tab(port_label(port))
+        log_handler = LogHandler(display, self.log_handler.highlight_engine, self.field_extractor, port_label(port))
+        log_handler.timestamp_precision = self.log_handler.timestamp_precision
+        log_handler.writer.configure(self.writer_options)
+        settings = storm_settings(self.writer_options)
+        if settings is not None:
+            mode, apply_to_file = settings
+            compactor = StormCompactor(mode, rules=self.storm_rules)
+            compactor.configure(self.writer_options)
+            log_handler.set_storm(compactor, apply_to_file)
+        session = PortSession(self.next_source_id, port, self.log_queue, log_handler, on_event=self.on_session_event)
+        session.tab = tab
+        session.watcher = self.port_watcher
+        session.auto_reconnect = str(self.writer_options.get("auto_reconnect", "1")) in ("1", "true", "on")
+        session.trigger.configure(self.writer_options)
+        session.trigger.set_rules(self.trigger_rules)
+        session.trigger.out_dir = self.log_save_path
+        self.start_session_server(session)
+        self.next_source_id += 1
+        self.sessions[session.source_id] = session
+        self.session_tabs[str(tab)] = session
+        if self.line_filter is not None:
+            log_handler.set_filter(self.line_filter, session.label)
+            self.log_handler.set_filter(self.line_filter, self.merged_filter_label())
+        return session
+
+    def start_session_server(self, session):
+        # 포트마다 TCP 공유 서버를 연다. 다른 포트가 쓰고 있는 번호는 건너뛴다
+        settings = fanout_settings(self.writer_options)
+        if settings is None:
+            return
+        success, message = session.start_server(precision="us", port_tries=32, **settings)
+        session.post([(None, f"공유 서버: {message}" if success else f"공유 서버를 열 수 없습니다: {message}")])
+
+    def remove_session(self, session):
+        session.close()
+        session.log_handler.stop_logging()
+        del self.sessions[session.source_id]
+        self.dirty_handlers.discard(session.log_handler)
+        del self.session_tabs[str(session.tab)]
+        session.tab.destroy()
+        if self.line_filter is not None:
+            self.log_handler.set_filter(self.line_filter, self.merged_filter_label())
+
+    def toggle_connection(self):
+        port = self.top_frame.port_combo.get()
+        if not port:
+            return
+        session = self.find_session(port)
+        if session is not None and session.is_active():
+            if session is self.repeat_session:
+                self.command_frame.repeat_var.set(False)
+            session.disconnect()
+            self.log_tabs.set_title(session.tab, session.label)
+        else:
+            created = session is None
+            if created:
+                session = self.create_session(port)
+            success, message = session.connect(int(self.top_frame.baud_combo.get()),
+                                               self.top_frame.framing_combo.get(), self.top_frame.display_combo.get())
+            if not success:
+                self.log_handler.update_log(f"연결 오류: {port} {message}")
+                if created:
+                    self.remove_session(session)
+            else:
+                self.log_tabs.set_title(session.tab, session.label)
+                if self.is_logging and not session.log_handler.is_logging:
+                    # 저장 중에 연결한 포트도 바로 파일에 남긴다
+                    started, file_path = self.start_session_logging(session)
+                    if not started:
+                        self.log_handler.update_log(f"로그 파일을 생성할 수 없습니다: {file_path}")
+        self.update_connect_button()
+
+    def change_display_mode(self, event=None):
+        # 이미 받은 줄은 그대로 두고 다음에 읽는 데이터부터 바뀐다
+        for session in self.sessions.values():
+            session.handler.set_display_mode(self.top_frame.display_combo.get())
+
+    def read_tx_input(self, session):
+        # 입력 칸의 명령을 전송 방식(text/hex/escape)에 맞게 바꾼다. 잘못된 입력이면 None
+        try:
+            return parse_tx_input(self.command_frame.cmd_entry.get(), self.command_frame.tx_mode_combo.get())
+        except ValueError as e:
+            session.post([(None, f"전송 입력 오류: {e}")])
+            return None
+
+    def update_connect_button(self):
+        session = self.find_session(self.top_frame.port_combo.get())
+        connected = session is not None and session.is_active()
+        self.top_frame.connect_button.config(text="연결 끊기" if connected else "연결")
+
+    def on_tab_changed(self, event=None):
+        session = self.session_tabs.get(self.log_tabs.selected())
+        if session is not None:
+            self.top_frame.port_combo.set(session.port)
+        self.update_connect_button()
+
+    def on_session_event(self, session, event):
+        # 읽기/전송 스레드에서 불린다
+        if event == "COM_PORT_DISCONNECTED":
+            if session.auto_reconnect:
+                session.post([(None, "COM 포트 연결이 끊어졌습니다. 장치가 다시 연결되기를 기다립니다.")])
+            else:
+                session.post([(None, "COM 포트 연결이 끊어졌습니다.")])
+            self.render_scheduler.call_soon(self.update_ui_after_disconnection, session)
+        elif event == "RECONNECTED":
+            session.post([(None, f"다시 연결되었습니다: {session.port}")])
+            self.render_scheduler.call_soon(self.update_ui_after_reconnection, session)
+        elif event == "REPLAY_FINISHED":
+            session.post([(None, "재생이 끝났습니다.")])
+            self.render_scheduler.call_soon(self.update_connect_button)
+        else:
+            session.post([(None, f"전송 실패: {event}")])
+            if session is self.repeat_session:
+                self.render_scheduler.call_soon(self.command_frame.repeat_var.set, False)
+
+    def update_ui_after_disconnection(self, session):
+        # 창을 띄워 사람을 기다리지 않고 탭 이름으로만 알린다
+        if session.source_id in self.sessions:
+            self.log_tabs.set_title(session.tab, f"{session.label} (재연결 대기)" if session.auto_reconnect
+                                    else f"{session.label} (끊김)")
+        self.update_connect_button()
+
+    def update_ui_after_reconnection(self, session):
+        if session.source_id in self.sessions:
+            self.log_tabs.set_title(session.tab, session.label)
+            if self.session_tabs.get(self.log_tabs.selected()) is session:
+                self.top_frame.port_combo.set(session.port)
+        self.update_connect_button()
+
+    def ingest(self, batches):
+        # 포트별 탭과 파일에는 바로 넣고, "전체" 탭은 시각 순서로 합친 뒤 flush_timeline 에서 넣는다
+        show_label = len(self.sessions) > 1
+        for source_id, entries in batches:
+            session = self.sessions.get(source_id)
+            if session is not None:
+                # 합친 탭에는 포트 탭에 실제로 넣은 줄(폭주를 줄인 결과)을 넣는다
+                shown = session.log_handler.update_log_batch(entries)
+                self.dirty_handlers.add(session.log_handler)
+                self.timeline.push(source_id, session.label if show_label else "", shown)
+            else:
+                self.timeline.push(source_id, "", entries)
+
+    def flush_timeline(self):
+        now_ns = None
+        for session in self.sessions.values():
+            if session.log_handler.storm is not None and session.log_handler.storm.storming:
+                now_ns = now_ns or capture_timestamp_ns()
+                summaries = session.log_handler.flush_storm(now_ns)
+                if summaries:
+                    self.dirty_handlers.add(session.log_handler)
+                    self.timeline.push(session.source_id, session.label if len(self.sessions) > 1 else "", summaries)
+        entries = self.timeline.release()
+        if entries:
+            self.log_handler.update_log_batch(entries)
+            self.dirty_handlers.add(self.log_handler)
+        # 이번 프레임에 줄이 들어온 탭만 프레임마다 한 번씩 다시 그린다
+        for handler in self.dirty_handlers:
+            handler.log_display.refresh()
+        self.dirty_handlers.clear()
+
+    def update_status(self, queue_depth, dropped_frames, batch_size):
+        self.status_bar.update_render_stats(queue_depth, dropped_frames, batch_size)
+        self.update_filter_status()
+        session = self.current_session()
+        self.status_bar.update_tx_stats(session.tx_scheduler.stats() if session else None)
+        if self.command_frame.repeat_var.get() and self.repeat_session is not None:
+            loops = self.repeat_session.tx_scheduler.stats()['script_loops']
+            self.command_frame.repeat_count_label.config(text=f"반복 횟수: {loops}")
+        backlogs = [session.log_handler.writer.backlog() for session in self.sessions.values()
+                    if session.log_handler.is_logging]
+        if backlogs:
+            total = {key: sum(backlog[key] for backlog in backlogs) for key in backlogs[0] if key != "error"}
+            total["error"] = next((backlog["error"] for backlog in backlogs if backlog["error"]), None)
+            self.status_bar.update_writer_stats(total)
+        else:
+            self.status_bar.update_writer_stats(None)
+
+    def send_command(self, event=None):
+        session = self.current_session()
+        if session is not None and session.is_connected():
+            command = self.read_tx_input(session)
+            if command:
+                session.tx_scheduler.submit(command)
+                if not self.command_frame.repeat_var.get():
+                    self.command_frame.cmd_entry.delete(0, tk.END)
+
+    def start_session_logging(self, session):
+        log_name = self.log_frame.log_name_entry.get()
+        if len(self.sessions) > 1:
+            # 포트가 여럿이면 파일 이름에 포트 이름을 붙여서 포트별로 저장한다
+            log_name = f"{log_name or 'project_name'}_{session.label}"
+        return session.log_handler.start_logging(self.log_save_path, log_name, self.log_frame.raw_var.get())
+
+    def toggle_logging(self):
+        if self.is_logging:
+            self.is_logging = False
+            for session in self.sessions.values():
+                session.log_handler.stop_logging()
+            self.master.after_idle(lambda: self.log_frame.save_button.config(text="저장 시작"))
+        else:
+            self.is_logging = True
+            for session in self.sessions.values():
+                success, file_path = self.start_session_logging(session)
+                if not success:
+                    self.is_logging = False
+                    for started in self.sessions.values():
+                        started.log_handler.stop_logging()
+                    self.master.after_idle(lambda: messagebox.showerror("로그 저장 오류", f"로그 파일을 생성할 수 없습니다: {file_path}"))
+                    return
+            self.master.after_idle(lambda: self.log_frame.save_button.config(text="저장 중지"))
+
+    def toggle_repeat(self):
+        if self.command_frame.repeat_var.get():
+            self.start_repeat()
+        else:
+            self.stop_repeat()
+
+    def start_repeat(self):
+        # 명령과 주기는 시작할 때 한 번만 읽고, 타이밍은 전송 스레드가 맞춘다 (1ms 미만 주기도 가능)
+        session = self.current_session()
+        if session is None or not session.is_connected():
+            self.command_frame.repeat_var.set(False)
+            return
+        command = self.read_tx_input(session)
+        if not command:
+            self.command_frame.repeat_var.set(False)
+            return
+        try:
+            interval = float(self.command_frame.repeat_interval_entry.get())
+        except ValueError:
+            interval = 1.0
+        if interval <= 0:
+            interval = 1.0
+        self.command_frame.repeat_count_label.config(text="반복 횟수: 0")
+        self.repeat_session = session
+        session.tx_scheduler.run_script(TxScript([("send", command)], period=interval, loops=0, name="반복"))
+
+    def stop_repeat(self):
+        if self.repeat_session is not None:
+            self.repeat_session.tx_scheduler.stop_script()
+            self.repeat_session = None
+
+    def clear_log(self):
+        for log_handler in self.all_handlers():
+            log_handler.clear_log()
+
+    def update_log_color(self):
+        # 하이라이트 엔진은 모든 탭이 공유한다
+        success, error = self.log_handler.update_log_color(self.log_frame.color_var, self.log_frame.color_entry.get())
+        for session in self.sessions.values():
+            session.log_handler.log_display.refresh(force=True)
+        if not success:
+            messagebox.showerror("하이라이트 오류", error)
+
+    def change_timestamp_precision(self, event=None):
+        for log_handler in self.all_handlers():
+            log_handler.set_timestamp_precision(self.log_frame.precision_combo.get())
+
+    def merged_filter_label(self):
+        # 포트가 하나뿐이면 합친 탭의 줄에 "[포트] " 접두어가 없으므로 포트 탭처럼 다룬다
+        if len(self.sessions) == 1:
+            return next(iter(self.sessions.values())).label
+        return None
+
+    def apply_filter(self, event=None):
+        text = self.log_frame.filter_entry.get().strip()
+        try:
+            line_filter = parse_filter(text) if text else None
+        except ValueError as e:
+            messagebox.showerror("필터 오류", str(e))
+            return
+        started = time.perf_counter()
+        self.line_filter = line_filter
+        self.log_handler.set_filter(line_filter, self.merged_filter_label())
+        for session in self.sessions.values():
+            session.log_handler.set_filter(line_filter, session.label)
+        self.filter_elapsed = time.perf_counter() - started
+        self.update_filter_status()
+
+    def clear_filter(self):
+        self.log_frame.filter_entry.delete(0, tk.END)
+        self.apply_filter()
+
+    def update_filter_status(self):
+        if self.line_filter is None:
+            self.log_frame.filter_status.config(text="")
+            return
+        session = self.session_tabs.get(self.log_tabs.selected())
+        log_handler = session.log_handler if session is not None else self.log_handler
+        view = log_handler.filter_view
+        self.log_frame.filter_status.config(
+            text=f"{len(view)} / {len(log_handler.line_store)}줄  ({self.filter_elapsed * 1000:.0f}ms)")
+
+    def toggle_prevent_sleep(self):
+        if self.top_frame.prevent_sleep_var.get():
+            prevent_screen_sleep()
+        else:
+            allow_screen_sleep()
+
+    def load_custom_commands(self):
+        if not os.path.exists(self.setup_file_path):
+            self.custom_commands = create_default_setup_file(self.setup_file_path, self.log_save_path)
+        else:
+            self.log_save_path, self.custom_commands = load_custom_commands(self.setup_file_path)
+            self.log_handler.highlight_rules = load_highlight_rules(self.setup_file_path)
+            try:
+                # 포트마다 만드는 로그 파일에 같은 설정을 쓰므로 여기서 한 번 검사해 둔다
+                options = load_options(self.setup_file_path)
+                self.log_handler.writer.configure(options)
+                TriggerCapture("").configure(options)
+                fanout_settings(options)
+                storm_settings(options)
+                self.writer_options = options
+            except ValueError as e:
+                messagebox.showerror("설정 파일 오류", f"로그 저장 설정을 읽을 수 없습니다: {e}")
+            try:
+                self.field_extractor.set_rules(load_field_rules(self.setup_file_path))
+            except ValueError as e:
+                messagebox.showerror("설정 파일 오류", f"필드 규칙을 읽을 수 없습니다: {e}")
+            try:
+                self.trigger_rules = load_trigger_rules(self.setup_file_path)
+            except ValueError as e:
+                messagebox.showerror("설정 파일 오류", f"트리거 규칙을 읽을 수 없습니다: {e}")
+            try:
+                self.storm_rules = load_storm_rules(self.setup_file_path)
+            except ValueError as e:
+                messagebox.showerror("설정 파일 오류", f"STORM 규칙을 읽을 수 없습니다: {e}")
+
+        self.log_frame.log_path_entry.delete(0, tk.END)
+        self.log_frame.log_path_entry.insert(0, self.log_save_path)
+
+    def create_custom_buttons(self):
+        for i in range(1, 11):
+            number = f"{i:02d}"
+            command = self.custom_commands.get(number, f"Button {i}")
+            btn = ttk.Button(self.custom_buttons_frame.frame, text=command, 
+                             command=lambda cmd=command: self.send_custom_command(cmd))
+            btn.pack(side=tk.LEFT, padx=2, pady=2)
+
+    def send_custom_command(self, command):
+        if is_script(command):
+            session = self.current_session()
+            if session is None or not session.is_connected():
+                return
+            try:
+                session.tx_scheduler.run_script(parse_script(command, name=command))
+            except ValueError as e:
+                session.post([(None, f"스크립트 오류: {e}")])
+            return
+        if command != f"Button {command.split()[-1]}":
+            self.command_frame.cmd_entry.delete(0, tk.END)
+            self.command_frame.cmd_entry.insert(0, command)
+            self.send_command()
+
+    def change_log_path(self):
+        new_path = filedialog.askdirectory()
+        if new_path:
+            self.log_save_path = new_path
+            self.log_frame.log_path_entry.delete(0, tk.END)
+            self.log_frame.log_path_entry.insert(0, self.log_save_path)
+            for session in self.sessions.values():
+                session.trigger.out_dir = self.log_save_path
+            success, error = update_setup_file(self.setup_file_path, self.log_save_path)
+            if success:
+                messagebox.showinfo("설정 업데이트", "저장 경로가 setup.txt 파일에 업데이트되었습니다.")
+            else:
+                messagebox.showerror("설정 파일 업데이트 오류", f"setup.txt 파일 업데이트 중 오류가 발생했습니다: {error}")
+
+    def open_search(self):
+        if self.search_panel is not None and self.search_panel.window.winfo_exists():
+            self.search_panel.window.lift()
+            return
+        self.search_panel = SearchPanel(self.master, self.log_save_path, self.start_search,
+                                        self.stop_search, self.jump_to_hit)
+
+    def start_search(self):
+        pattern = self.search_panel.pattern_entry.get()
+        if not pattern:
+            return
+        self.stop_search()
+        self.search_panel.clear()
+        self.search_hits = []
+        self.search_results = queue.Queue()
+        self.search_cancel = threading.Event()
+        self.search_panel.set_status("검색 중...")
+        threading.Thread(target=self.search_worker, daemon=True,
+                         args=([self.search_panel.path_entry.get()], pattern, self.search_panel.regex_var.get(),
+                               self.search_panel.ignore_case_var.get(), self.search_results, self.search_cancel)).start()
+        self.master.after(50, self.poll_search)
+
+    def stop_search(self):
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+
+    def search_worker(self, paths, pattern, regex, ignore_case, results, cancel):
+        started = time.monotonic()
+        batch = []
+        try:
+            for hit in search_logs(paths, pattern, regex, ignore_case, cancel=cancel):
+                batch.append(hit)
+                if len(batch) >= 200:
+                    results.put(batch)
+                    batch = []
+                if cancel.is_set():
+                    break
+            results.put(batch)
+            results.put(f"완료 ({time.monotonic() - started:.1f}초)")
+        except (OSError, ValueError) as e:
+            results.put(batch)
+            results.put(f"검색 오류: {e}")
+
+    def poll_search(self):
+        if self.search_panel is None or not self.search_panel.window.winfo_exists():
+            self.stop_search()
+            return
+        finished = None
+        while True:
+            try:
+                item = self.search_results.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, str):
+                finished = item
+            elif item:
+                self.search_hits.extend(item)
+                self.search_panel.add_hits(item)
+        if finished is not None:
+            self.search_panel.set_status(f"{len(self.search_hits)}건 - {finished}")
+            return
+        self.search_panel.set_status(f"{len(self.search_hits)}건 검색 중...")
+        self.master.after(50, self.poll_search)
+
+    def jump_to_hit(self, index):
+        if index is None or index >= len(self.search_hits):
+            return
+        hit = self.search_hits[index]
+        timestamp_ns, text = parse_log_timestamp(hit.text)
+        if timestamp_ns is not None:
+            # 전체 탭에서 먼저 찾고, 포트 이름이 붙어 있어서 못 찾으면 포트별 탭에서 찾는다
+            for tab, log_handler in [(self.merged_tab, self.log_handler)] + \
+                    [(session.tab, session.log_handler) for session in self.sessions.values()]:
+                seq = log_handler.find_line(timestamp_ns, text)
+                if seq is not None:
+                    self.log_tabs.select(tab)
+                    if not log_handler.log_display.show_line(seq):
+                        # 필터에 가려진 줄이면 필터를 풀고 보여 준다
+                        self.clear_filter()
+                        log_handler.log_display.show_line(seq)
+                    return
+        self.search_panel.set_status(f"{os.path.basename(hit.path)}:{hit.line_number} 은(는) 현재 화면 기록에 없습니다")
+
+    def collect_stats(self):
+        ports = [port_stats(session.label, session.handler, session.log_handler.writer,
+                            session.log_handler.capture_writer, session.tx_scheduler, session.server,
+                            session.log_handler.storm)
+                 for session in self.sessions.values()]
+        return pipeline_snapshot(ports, render_stats(self.render_scheduler))
+
+    def open_stats(self):
+        if self.stats_panel is not None and self.stats_panel.window.winfo_exists():
+            self.stats_panel.window.lift()
+            return
+        self.stats_panel = StatsPanel(self.master, self.dump_pipeline_stats, self.reset_pipeline_stats)
+        self.poll_stats()
+
+    def poll_stats(self):
+        if self.stats_panel is None or not self.stats_panel.window.winfo_exists():
+            self.stats_panel = None
+            return
+        self.stats_panel.show(format_pipeline_stats(self.collect_stats()))
+        self.master.after(500, self.poll_stats)
+
+    def dump_pipeline_stats(self):
+        path = filedialog.asksaveasfilename(parent=self.stats_panel.window, defaultextension=".json",
+                                            initialdir=self.log_save_path, filetypes=[("JSON", "*.json")])
+        if path:
+            success, message = dump_stats(self.collect_stats(), path)
+            if not success:
+                messagebox.showerror("통계 저장 오류", message, parent=self.stats_panel.window)
+
+    def reset_pipeline_stats(self):
+        scheduler = self.render_scheduler
+        for histogram in (scheduler.queue_latency, scheduler.render_latency, scheduler.frame_time):
+            histogram.reset()
+        scheduler.queue_peak = 0
+        for session in self.sessions.values():
+            session.log_handler.writer.write_latency.reset()
+            session.log_handler.writer.flush_latency.reset()
+
+    def manual_trigger(self):
+        # 링 버퍼에 남아 있는 앞 구간과 지금부터 뒤 구간을 포트마다 파일로 남긴다
+        sessions = [session for session in self.sessions.values() if session.is_connected()]
+        if not sessions:
+            messagebox.showinfo("구간 저장", "연결된 포트가 없습니다.")
+            return
+        for session in sessions:
+            session.trigger.fire("manual")
+
+    def field_series(self):
+        # "포트.필드" -> FieldSeries
+        series = {}
+        for session in self.sessions.values():
+            store = session.log_handler.field_store
+            for name in store.names():
+                series[series_label(store, name)] = store.series[name]
+        return series
+
+    def open_plot(self):
+        if self.plot_panel is not None and self.plot_panel.window.winfo_exists():
+            self.plot_panel.window.lift()
+            return
+        if not self.field_extractor.rules:
+            messagebox.showinfo("필드 그래프", "setup.txt 에 FIELD 규칙이 없습니다.\n"
+                                "예) FIELD:temp  FIELD:vbat:V=(\\d+)mV  FIELD:*")
+            return
+        self.plot_panel = PlotPanel(self.master, self.export_plot_fields, self.redraw_plot)
+        self.poll_plot()
+
+    def poll_plot(self):
+        if self.plot_panel is None or not self.plot_panel.window.winfo_exists():
+            self.plot_panel = None
+            return
+        self.redraw_plot()
+        self.master.after(250, self.poll_plot)
+
+    def redraw_plot(self):
+        panel = self.plot_panel
+        all_series = self.field_series()
+        panel.set_series(sorted(all_series))
+        series = all_series.get(panel.selected_series())
+        if series is None or not len(series):
+            panel.draw([], 0, 0, "필드 값이 아직 없습니다")
+            return
+        end_ns = series.last_timestamp() + 1
+        seconds = panel.window_seconds()
+        start_ns = series.timestamps[series.head] if seconds is None else end_ns - int(seconds * 1e9)
+        stats = series.stats(start_ns)
+        if not stats["count"]:
+            panel.draw([], 0, 0, "구간 안에 값이 없습니다")
+            return
+        text = (f"n={stats['count']}  최소 {stats['min']:g}  최대 {stats['max']:g}  평균 {stats['mean']:g}  "
+                f"p50 {stats['p50']:g}  p95 {stats['p95']:g}  p99 {stats['p99']:g}  마지막 {stats['last']:g}")
+        panel.draw(series.decimate(start_ns, end_ns, panel.plot_width()), start_ns, end_ns, text)
+
+    def export_plot_fields(self):
+        path = filedialog.asksaveasfilename(parent=self.plot_panel.window, defaultextension=EXPORT_FORMATS[0],
+                                            initialdir=self.log_save_path,
+                                            filetypes=[("CSV", "*.csv"), ("NumPy", "*.npz")])
+        if path:
+            stores = [session.log_handler.field_store for session in self.sessions.values()]
+            success, message = export_fields(stores, path, self.log_handler.timestamp_precision)
+            if not success:
+                messagebox.showerror("필드 저장 오류", message, parent=self.plot_panel.window)
+
+    def on_closing(self):
+        self.render_scheduler.stop()
+        self.port_watcher.stop()
+        self.stop_search()
+        for session in self.sessions.values():
+            session.close()
+            session.log_handler.stop_logging()
+        self.master.destroy()
+
+def run_gui():
+    root = tk.Tk()
+    app = UARTLogViewer(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
+    root.mainloop()
@@ -0,0 +1,256 @@
+import os
+import gzip
+import time
+import queue
+import shutil
+import datetime
+import threading
+from metrics import LatencyHistogram
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_OPTIONS = ["none", "gzip", "zstd"]
+
+_FLUSH = object()
+_STOP = object()
+
+
+def available_compression(name):
+    if name == "zstd" and zstandard is None:
+        return "gzip"
+    return name if name in COMPRESS_OPTIONS else "none"
+
+
+class Compressor:
+    # 회전된 로그 파일을 백그라운드에서 압축하고 원본을 지운다
+    def __init__(self, method):
+        self.method = available_compression(method)
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.errors = []
+
+    def submit(self, path):
+        if self.method == "none":
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="log-compressor", daemon=True)
+            self.thread.start()
+        self.jobs.put(path)
+
+    def pending(self):
+        return self.jobs.unfinished_tasks
+
+    def run(self):
+        while True:
+            path = self.jobs.get()
+            try:
+                self.compress(path)
+            except Exception as e:
+                self.errors.append(f"{path}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def compress(self, path):
+        if self.method == "zstd":
+            target = path + ".zst"
+            with open(path, 'rb') as source, open(target, 'wb') as raw:
+                with zstandard.ZstdCompressor().stream_writer(raw) as compressed:
+                    shutil.copyfileobj(source, compressed, 1024 * 1024)
+        else:
+            target = path + ".gz"
+            with open(path, 'rb') as source, gzip.open(target, 'wb', compresslevel=6) as compressed:
+                shutil.copyfileobj(source, compressed, 1024 * 1024)
+        os.remove(path)
+
+    def wait(self):
+        if self.thread is not None:
+            self.jobs.join()
+
+
+class LogFileWriter:
+    # 쓰기는 전용 스레드에서 하고, 호출하는 쪽은 큐에 넣기만 한다.
+    # 큐가 차면 줄을 버리지 않고 넘침 버퍼(spill)에 이어 붙이고, 쓰기 스레드가 큐를 비운 뒤 순서대로 쓴다.
+    # put_timeout 이 0 이면 큐가 찼을 때 기다리지 않는다 (GUI 의 화면 스레드).
+    # 헤드리스 캡처처럼 수신 스레드가 잠시 기다려도 되는 곳에서는 0 보다 크게 줘서 먼저 기다리게 한다
+    def __init__(self, max_queue=4096, buffer_size=1024 * 1024, flush_interval=1.0, flush_bytes=1024 * 1024,
+                 fsync=False, rotate_bytes=0, rotate_seconds=0, compress="none", put_timeout=0):
+        self.max_queue = max_queue
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fsync = fsync
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.put_timeout = put_timeout
+        self.log_file = None
+        self.file_path = None
+        self.file_paths = []
+        self.thread = None
+        self.queue = None
+        self.compressor = None
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.spill = []  # 큐가 찼을 때 쌓아 둔 (data, 줄 수, 시각). 비어 있지 않으면 새 줄도 여기로 간다
+        self.spill_lock = threading.Lock()
+        self.spilled_lines = 0
+        self.queued_lines = 0
+        self.error = None
+        self.write_latency = LatencyHistogram()  # 큐에 넣은 뒤 파일에 쓰기까지
+        self.flush_latency = LatencyHistogram()  # flush (+fsync) 한 번에 걸린 시간
+
+    def configure(self, options):
+        # setup.txt 의 OPT: 항목이나 명령줄 인자로 받은 값을 반영한다
+        self.flush_interval = float(options.get("log_flush_ms", self.flush_interval * 1000)) / 1000
+        self.fsync = str(options.get("log_fsync", int(self.fsync))) in ("1", "true", "on")
+        self.rotate_bytes = int(float(options.get("log_rotate_mb", self.rotate_bytes / 1048576)) * 1048576)
+        self.rotate_seconds = int(float(options.get("log_rotate_minutes", self.rotate_seconds / 60)) * 60)
+        self.compress = options.get("log_compress", self.compress)
+
+    @property
+    def is_logging(self):
+        return self.log_file is not None
+
+    def start(self, log_save_path, log_name):
+        current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if log_name:
+            file_name = f"{log_name}_{current_time}.log"
+        else:
+            file_name = f"project_name_{current_time}.log"
+
+        file_path = os.path.join(log_save_path, file_name)
+
+        try:
+            self.log_file = open(file_path, 'w', encoding='utf-8', buffering=self.buffer_size)
+        except Exception as e:
+            return False, str(e)
+        self.file_path = file_path
+        self.file_paths = [file_path]
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.spill = []
+        self.spilled_lines = 0
+        self.queued_lines = 0
+        self.error = None
+        self.write_latency.reset()
+        self.flush_latency.reset()
+        self.queue = queue.Queue(maxsize=self.max_queue)
+        self.compressor = Compressor(self.compress)
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.thread.start()
+        return True, file_path
+
+    def stop(self):
+        if self.thread is not None:
+            self.queue.put(_STOP)
+            self.thread.join()
+            self.thread = None
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+        if self.compressor is not None:
+            self.compressor.wait()
+
+    def write_lines(self, messages):
+        if self.log_file is None or not messages:
+            return
+        data = "".join(message + "\n" for message in messages)
+        item = (data, len(messages), time.perf_counter())
+        self.queued_lines += len(messages)
+        if not self.spill:
+            try:
+                if self.put_timeout > 0:
+                    self.queue.put(item, timeout=self.put_timeout)
+                else:
+                    self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+        # 디스크가 따라오지 못하면 넘침 버퍼에 모은다. 순서가 바뀌지 않도록 버퍼가 빌 때까지는 큐를 건너뛴다
+        with self.spill_lock:
+            self.spill.append(item)
+        self.spilled_lines += len(messages)
+
+    def flush(self):
+        if self.thread is not None:
+            try:
+                self.queue.put_nowait(_FLUSH)
+            except queue.Full:
+                pass
+
+    def backlog(self):
+        return {
+            "queued_lines": self.queued_lines - self.lines_written,
+            "queued_items": self.queue.qsize() if self.queue else 0,
+            "spilled_lines": self.spilled_lines,
+            "error": self.error,
+            "pending_compression": self.compressor.pending() if self.compressor else 0,
+        }
+
+    def run(self):
+        unflushed = 0
+        last_flush = time.monotonic()
+        file_bytes = 0
+        file_started = last_flush
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            try:
+                items = [] if item is None or item is _FLUSH or item is _STOP else [item]
+                if self.spill and (item is _STOP or self.queue.empty()):
+                    # 넘침 버퍼는 그보다 먼저 큐에 들어간 줄을 모두 쓴 뒤에 쓴다
+                    with self.spill_lock:
+                        items += self.spill
+                        self.spill = []
+                for data, count, queued_at in items:
+                    self.log_file.write(data)
+                    self.write_latency.record(time.perf_counter() - queued_at, count)
+                    self.lines_written += count
+                    self.bytes_written += len(data)
+                    unflushed += len(data)
+                    file_bytes += len(data)
+                if item is _STOP:
+                    self._flush(unflushed)
+                    return
+                now = time.monotonic()
+                if unflushed and (item is _FLUSH or now - last_flush >= self.flush_interval
+                                  or unflushed >= self.flush_bytes):
+                    self._flush(unflushed)
+                    unflushed = 0
+                    last_flush = now
+                if (self.rotate_bytes and file_bytes >= self.rotate_bytes
+                        or self.rotate_seconds and now - file_started >= self.rotate_seconds):
+                    self.rotate()
+                    unflushed = 0
+                    file_bytes = 0
+                    file_started = now
+            except Exception as e:
+                self.error = str(e)
+
+    def _flush(self, unflushed):
+        if self.log_file and unflushed:
+            started = time.perf_counter()
+            self.log_file.flush()
+            if self.fsync:
+                os.fsync(self.log_file.fileno())
+            self.flush_latency.record(time.perf_counter() - started)
+
+    def rotate(self):
+        previous = self.file_path
+        stem, ext = os.path.splitext(self.file_paths[0])
+        next_path = f"{stem}_part{len(self.file_paths):03d}{ext}"
+        new_file = open(next_path, 'w', encoding='utf-8', buffering=self.buffer_size)
+        self.log_file.flush()
+        if self.fsync:
+            os.fsync(self.log_file.fileno())
+        self.log_file.close()
+        self.log_file = new_file
+        self.file_path = next_path
+        self.file_paths.append(next_path)
+        self.compressor.submit(previous)
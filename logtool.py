@@ -1,236 +1,183 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
 import os
 import sys
-import queue
-import time
-import threading
-from ui_components import TopFrame, LogFrame, LogDisplay, CommandFrame, CustomButtonsFrame
-from log_handler import LogHandler
-from uart_handler import UARTHandler
-from utils import get_script_dir, get_timestamp, prevent_screen_sleep, allow_screen_sleep
-from setup import create_default_setup_file, load_custom_commands, update_setup_file
-
-class UARTLogViewer:
-    def __init__(self, master):
-        self.master = master
-        master.title("UART 로그 뷰어")
-        self.setup_ui()
-        self.initialize_variables()
-        self.load_custom_commands()
-        self.create_custom_buttons()
-        self.refresh_ports()
-        
-        self.log_queue = queue.Queue()
-        self.log_thread = threading.Thread(target=self.process_log_queue, daemon=True)
-        self.log_thread.start()
-        
-        self.command_queue = queue.Queue()
-        self.command_thread = threading.Thread(target=self.process_command_queue, daemon=True)
-        self.command_thread.start()
-        
-        self.uart_thread = threading.Thread(target=self.read_uart_loop, daemon=True)
-        self.uart_thread.start()
-
-    def setup_ui(self):
-        self.top_frame = TopFrame(self.master, self.refresh_ports, self.toggle_connection, self.toggle_prevent_sleep)
-        self.log_frame = LogFrame(self.master, self.change_log_path, self.toggle_logging, self.clear_log, self.update_log_color)
-        self.log_display = LogDisplay(self.master)
-        self.command_frame = CommandFrame(self.master, self.send_command, self.toggle_repeat)
-        self.custom_buttons_frame = CustomButtonsFrame(self.master)
-
-    def initialize_variables(self):
-        self.uart_handler = UARTHandler()
-        self.log_handler = LogHandler(self.log_display.log_text)
-        self.is_repeating = False
-        self.repeat_count = 0
-        self.custom_commands = {}
-        self.log_save_path = get_script_dir()
-        self.setup_file_path = os.path.join(self.log_save_path, 'setup.txt')
-
-    def refresh_ports(self):
-        ports = self.uart_handler.get_ports()
-        self.top_frame.port_combo['values'] = ports
-        if ports:
-            self.top_frame.port_combo.set(ports[0])
-
-    def toggle_connection(self):
-        if self.uart_handler.is_connected():
-            self.uart_handler.disconnect()
-            self.top_frame.connect_button.config(text="연결")
-        else:
-            port = self.top_frame.port_combo.get()
-            baud = int(self.top_frame.baud_combo.get())
-            success, message = self.uart_handler.connect(port, baud)
-            if success:
-                self.top_frame.connect_button.config(text="연결 끊기")
-                # self.master.after(10, self.read_uart)  # 이 줄을 제거하거나 주석 처리
-            else:
-                self.log_handler.update_log(f"연결 오류: {message}")
-
-    def read_uart_loop(self):
-        while True:
-            if self.uart_handler.is_connected():
-                data = self.uart_handler.read_data()
-                if data == "COM_PORT_DISCONNECTED":
-                    self.handle_com_port_disconnection()
-                elif data:
-                    timestamp = get_timestamp()
-                    self.log_queue.put(f"{timestamp} - {data}")
-                else:
-                    time.sleep(0.001)
-            else:
-                time.sleep(0.1)
-
-    def handle_com_port_disconnection(self):
-        self.log_queue.put("COM 포트 연결이 끊어졌습니다.")
-        self.master.after_idle(self.update_ui_after_disconnection)
-
-    def update_ui_after_disconnection(self):
-        self.top_frame.connect_button.config(text="연결")
-        messagebox.showwarning("연결 해제", "COM 포트 연결이 끊어졌습니다.")
-
-    def process_log_queue(self):
-        while True:
-            try:
-                messages = []
-                for _ in range(100):  # 최대 100개의 메시지를 한 번에 처리
-                    messages.append(self.log_queue.get_nowait())
-            except queue.Empty:
-                pass
-            
-            if messages:
-                self.log_handler.update_log_batch(messages)
-            
-            time.sleep(0.01)  # 10ms 대기
-
-    def send_command(self, event=None):
-        if self.uart_handler.is_connected():
-            command = self.command_frame.cmd_entry.get()
-            if command:
-                success, message = self.uart_handler.write_data(command)
-                if success:
-                    self.log_queue.put(f"전송: {command}")
-                    if not self.command_frame.repeat_var.get():
-                        self.command_frame.cmd_entry.delete(0, tk.END)
-                elif message == "COM_PORT_DISCONNECTED":
-                    self.handle_com_port_disconnection()
-                else:
-                    self.log_queue.put(f"전송 실패: {message}")
-
-    def process_command_queue(self):
-        while True:
-            try:
-                command = self.command_queue.get(timeout=0.1)
-                success, message = self.uart_handler.write_data(command)
-                if success:
-                    self.log_queue.put(f"전송: {command}")
-                    self.master.after_idle(self.update_repeat_count)
-                elif message == "COM_PORT_DISCONNECTED":
-                    self.handle_com_port_disconnection()
-                else:
-                    self.log_queue.put(f"전송 실패: {message}")
-            except queue.Empty:
-                continue
-
-    def update_repeat_count(self):
-        if self.is_repeating:
-            self.repeat_count += 1
-            self.master.after_idle(lambda: self.command_frame.repeat_count_label.config(text=f"반복 횟수: {self.repeat_count}"))
-
-    def toggle_logging(self):
-        if self.log_handler.is_logging:
-            self.log_handler.stop_logging()
-            self.master.after_idle(lambda: self.log_frame.save_button.config(text="저장 시작"))
-        else:
-            success, file_path = self.log_handler.start_logging(
-                self.log_save_path, 
-                self.log_frame.log_name_entry.get()
-            )
-            if success:
-                self.master.after_idle(lambda: self.log_frame.save_button.config(text="저장 중지"))
-            else:
-                self.master.after_idle(lambda: messagebox.showerror("로그 저장 오류", f"로그 파일을 생성할 수 없습니다: {file_path}"))
-
-    def toggle_repeat(self):
-        if self.command_frame.repeat_var.get():
-            self.start_repeat()
-        else:
-            self.stop_repeat()
-
-    def start_repeat(self):
-        self.is_repeating = True
-        self.repeat_count = 0
-        self.command_frame.repeat_count_label.config(text="반복 횟수: 0")
-        self.repeat_command()
-
-    def stop_repeat(self):
-        self.is_repeating = False
-
-    def repeat_command(self):
-        if self.is_repeating:
-            self.send_command()
-            try:
-                interval = int(float(self.command_frame.repeat_interval_entry.get()) * 1000)
-            except ValueError:
-                interval = 1000
-            self.master.after(interval, self.repeat_command)
-
-    def clear_log(self):
-        self.log_handler.clear_log()
-
-    def update_log_color(self):
-        self.log_handler.update_log_color(self.log_frame.color_var, self.log_frame.color_entry.get())
-
-    def toggle_prevent_sleep(self):
-        if self.top_frame.prevent_sleep_var.get():
-            prevent_screen_sleep()
-        else:
-            allow_screen_sleep()
-
-    def load_custom_commands(self):
-        if not os.path.exists(self.setup_file_path):
-            self.custom_commands = create_default_setup_file(self.setup_file_path, self.log_save_path)
-        else:
-            self.log_save_path, self.custom_commands = load_custom_commands(self.setup_file_path)
-
-        self.log_frame.log_path_entry.delete(0, tk.END)
-        self.log_frame.log_path_entry.insert(0, self.log_save_path)
-
-    def create_custom_buttons(self):
-        for i in range(1, 11):
-            number = f"{i:02d}"
-            command = self.custom_commands.get(number, f"Button {i}")
-            btn = ttk.Button(self.custom_buttons_frame.frame, text=command, 
-                             command=lambda cmd=command: self.send_custom_command(cmd))
-            btn.pack(side=tk.LEFT, padx=2, pady=2)
-
-    def send_custom_command(self, command):
-        if command != f"Button {command.split()[-1]}":
-            self.command_frame.cmd_entry.delete(0, tk.END)
-            self.command_frame.cmd_entry.insert(0, command)
-            self.send_command()
-
-    def change_log_path(self):
-        new_path = filedialog.askdirectory()
-        if new_path:
-            self.log_save_path = new_path
-            self.log_frame.log_path_entry.delete(0, tk.END)
-            self.log_frame.log_path_entry.insert(0, self.log_save_path)
-            success, error = update_setup_file(self.setup_file_path, self.log_save_path)
-            if success:
-                messagebox.showinfo("설정 업데이트", "저장 경로가 setup.txt 파일에 업데이트되었습니다.")
-            else:
-                messagebox.showerror("설정 파일 업데이트 오류", f"setup.txt 파일 업데이트 중 오류가 발생했습니다: {error}")
-
-    def on_closing(self):
-        self.stop_repeat()
-        self.log_handler.stop_logging()
-        self.uart_handler.disconnect()
-        self.master.destroy()
+import argparse
+import multiprocessing
+from headless import DEFAULT_BAUD
+from log_writer import COMPRESS_OPTIONS
+from byte_format import DISPLAY_MODES
+from fanout_server import DROP_POLICIES
+from storm_compactor import STORM_MODES
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="logtool", description="UART 로그 뷰어")
+    subparsers = parser.add_subparsers(dest="command")
+
+    capture = subparsers.add_parser("capture", help="GUI 없이 포트를 읽어서 파일로 저장")
+    capture.add_argument("--port", action="append", required=True,
+                         help="포트 이름 또는 pyserial URL, 여러 번 지정 가능 (PORT@BAUD 로 개별 속도 지정)")
+    capture.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    capture.add_argument("--out", help="로그 파일을 저장할 폴더 (기본값: 현재 폴더)")
+    capture.add_argument("--name", default="project_name", help="로그 파일 이름 앞부분")
+    capture.add_argument("--framing", default="LF", help="LF, CRLF, CR, NUL, FIXED:<n>, LEN:<1|2|4>[:BE], COBS, SLIP")
+    capture.add_argument("--precision", default="s", choices=["s", "ms", "us"])
+    capture.add_argument("--display", default="text", choices=DISPLAY_MODES, help="프레임을 텍스트 또는 hex 로 기록")
+    capture.add_argument("--rotate-mb", type=float, default=0, help="파일 크기가 지정한 MB 를 넘으면 새 파일로 나눔")
+    capture.add_argument("--rotate-minutes", type=float, default=0, help="지정한 분마다 새 파일로 나눔")
+    capture.add_argument("--compress", default="none", choices=COMPRESS_OPTIONS, help="나눠진 이전 파일 압축 방식")
+    capture.add_argument("--fsync", action="store_true", help="flush 할 때마다 fsync 호출")
+    capture.add_argument("--flush-ms", type=float, default=1000, help="파일 flush 주기 (ms)")
+    capture.add_argument("--raw", action="store_true", help="수신/송신 원본 바이트를 .ucap 파일로 함께 저장")
+    capture.add_argument("--duration", type=float, default=0, help="지정한 초만큼 기록 후 종료 (0 이면 Ctrl+C 까지)")
+    capture.add_argument("--stats-json", help="종료할 때 단계별 카운터와 지연 분포를 JSON 파일로 저장")
+    capture.add_argument("--trigger", action="append", default=[],
+                         help="pattern:<글자>, regex:<정규식>, disconnect, rate:<줄/초> 중 하나, 여러 번 지정 가능")
+    capture.add_argument("--ring-mb", type=float, default=16, help="트리거 앞 구간을 담아 둘 포트별 원본 링 버퍼 크기")
+    capture.add_argument("--pre", type=float, default=30, help="트리거 앞으로 저장할 초")
+    capture.add_argument("--post", type=float, default=10, help="트리거 뒤로 저장할 초")
+    capture.add_argument("--trigger-command", default="", help="트리거가 걸리면 포트로 보낼 명령")
+    capture.add_argument("--reconnect", action="store_true", help="장치가 끊기면 다시 연결될 때까지 기다렸다가 이어서 기록")
+    capture.add_argument("--serve", type=int, default=None,
+                         help="지정한 TCP 포트로 줄을 나눠 주고 클라이언트가 보낸 줄을 포트로 씀 (포트가 여럿이면 1씩 늘림)")
+    capture.add_argument("--serve-host", default="127.0.0.1", help="공유 서버 주소 (기본값: 이 PC 에서만 접속)")
+    capture.add_argument("--serve-raw", action="store_true", help="줄 대신 받은 원본 바이트를 그대로 나눠 줌")
+    capture.add_argument("--serve-read-only", action="store_true", help="클라이언트가 보낸 데이터를 포트로 쓰지 않음")
+    capture.add_argument("--serve-queue-kb", type=float, default=1024, help="클라이언트마다 보내지 못하고 쌓아 둘 최대 크기")
+    capture.add_argument("--serve-policy", default="drop_oldest", choices=DROP_POLICIES,
+                         help="큐가 넘친 느린 클라이언트 처리: 오래된 데이터 버림 또는 연결 끊기")
+    capture.add_argument("--storm", default="off", choices=STORM_MODES,
+                         help="같은 줄(exact) 또는 숫자만 다른 줄(normalized)이 폭주하면 요약 줄로 줄여서 저장")
+    capture.add_argument("--storm-rate", type=float, default=20, help="같은 줄을 초당 몇 줄까지 그대로 저장할지")
+    capture.add_argument("--storm-summary-ms", type=float, default=1000, help="폭주 중 요약 줄을 쓰는 간격 (ms)")
+    capture.add_argument("--storm-keys", type=int, default=4096, help="기억하는 최근 줄 종류 수")
+    capture.add_argument("--storm-rule", action="append", default=[],
+                         help="RATE:REGEX, 정규식에 맞는 줄은 --storm-rate 대신 이 값을 씀 (0 이면 줄이지 않음)")
+    capture.add_argument("--no-log", action="store_true", help="전체 로그는 쓰지 않고 트리거 구간만 저장")
+
+    search = subparsers.add_parser("search", help="저장된 로그 파일 전체에서 검색")
+    search.add_argument("pattern")
+    search.add_argument("paths", nargs="*", help="로그 파일이나 폴더 (기본값: setup.txt 의 저장 경로)")
+    search.add_argument("--regex", action="store_true", help="검색어를 정규식으로 사용")
+    search.add_argument("-i", "--ignore-case", action="store_true")
+    search.add_argument("--workers", type=int, help="검색 프로세스 수 (기본값: CPU 수)")
+    search.add_argument("--max", type=int, default=0, help="최대 결과 수")
+
+    replay = subparsers.add_parser("replay", help="저장된 .log/.ucap 을 재생")
+    replay.add_argument("file", help=".log 또는 .ucap 파일")
+    replay.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0 이면 최대 속도)")
+    replay.add_argument("--pty", action="store_true", help="가상 시리얼 포트(pty)로 내보내고 경로를 출력")
+    replay.add_argument("--repeat", type=int, default=1, help="--pty 에서 반복 횟수 (0 이면 무한)")
+    replay.add_argument("--framing", default="LF", help="LF, CRLF, CR, NUL, FIXED:<n>, LEN:<1|2|4>[:BE], COBS, SLIP")
+
+    export = subparsers.add_parser("export", help=".ucap 캡처 파일을 텍스트 로그로 변환")
+    export.add_argument("capture", help=".ucap 파일")
+    export.add_argument("--out", help="출력 파일 (기본값: 같은 이름의 .log)")
+    export.add_argument("--start", help="시작 시각 ('YYYY-MM-DD HH:MM:SS[.ffffff]' 또는 캡처 시작 기준 '+초')")
+    export.add_argument("--end", help="끝 시각 (형식은 --start 와 같음)")
+    export.add_argument("--framing", default="LF", help="LF, CRLF, CR, NUL, FIXED:<n>, LEN:<1|2|4>[:BE], COBS, SLIP")
+    export.add_argument("--precision", default="us", choices=["s", "ms", "us"])
+    export.add_argument("--display", default="text", choices=DISPLAY_MODES, help="프레임을 텍스트 또는 hex 로 변환")
+    return parser
+
+def run_export(args):
+    from capture_format import export_text
+    out_path = args.out or os.path.splitext(args.capture)[0] + "_export.log"
+    try:
+        count = export_text(args.capture, out_path, args.start, args.end, args.framing, args.precision,
+                            args.display)
+    except (OSError, ValueError) as e:
+        print(f"변환 오류: {e}")
+        return 1
+    print(f"{count} lines -> {out_path}")
+    return 0
+
+def default_log_paths():
+    from setup import load_custom_commands
+    from utils import get_script_dir
+    setup_file_path = os.path.join(get_script_dir(), 'setup.txt')
+    if os.path.exists(setup_file_path):
+        result = load_custom_commands(setup_file_path)
+        if result[0] and os.path.isdir(result[0]):
+            return [result[0]]
+    return [os.getcwd()]
+
+def run_search(args):
+    from log_search import search_logs
+    count = 0
+    try:
+        for hit in search_logs(args.paths or default_log_paths(), args.pattern, args.regex, args.ignore_case,
+                               args.workers, args.max):
+            print(f"{hit.path}:{hit.line_number}: {hit.text}", flush=count < 100)
+            count += 1
+    except (OSError, ValueError) as e:
+        print(f"검색 오류: {e}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    print(f"{count} matches", file=sys.stderr)
+    return 0 if count else 1
+
+def run_replay(args):
+    import time
+    from replay_source import ReplaySource, PtyFeeder, REPLAY_PREFIX
+    from line_framer import make_framer
+    if args.pty:
+        feeder = PtyFeeder(args.file, args.speed, args.repeat)
+        success, message = feeder.start()
+        if not success:
+            print(f"재생 오류: {message}")
+            return 1
+        print(message, flush=True)
+        try:
+            while feeder.is_running():
+                time.sleep(0.2)
+            feeder.drain()
+        except KeyboardInterrupt:
+            pass
+        feeder.stop()
+        print(f"{feeder.bytes_written} bytes written" + (f" - {feeder.error}" if feeder.error else ""))
+        return 0
+
+    # 포트 없이 재생 입력만 끝까지 읽어서 처리량을 잰다
+    source = ReplaySource()
+    source.set_framer(make_framer(args.framing))
+    success, message = source.connect(f"{REPLAY_PREFIX}{args.file}|{args.speed}")
+    if not success:
+        print(f"재생 오류: {message}")
+        return 1
+    started = time.perf_counter()
+    try:
+        while source.read_data() != "REPLAY_FINISHED":
+            pass
+    except KeyboardInterrupt:
+        source.disconnect()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"{source.lines_read} lines, {source.bytes_read} bytes in {elapsed:.2f}s "
+          f"({source.lines_read / elapsed:.0f} lines/s)")
+    return 0
+
+def main(argv=None):
+    multiprocessing.freeze_support()
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "search" and not any(item.startswith("-") for item in extra):
+        # "search PANIC --regex big.log" 처럼 옵션 뒤에 온 경로도 받는다
+        args.paths += extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "capture":
+        from headless import run_capture
+        return run_capture(args)
+    if args.command == "search":
+        return run_search(args)
+    if args.command == "replay":
+        return run_replay(args)
+    if args.command == "export":
+        return run_export(args)
+
+    # tkinter 는 GUI 를 띄울 때만 불러온다
+    from log_viewer import run_gui
+    run_gui()
+    return 0
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = UARTLogViewer(root)
-    root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import json
+import time
+
+SUB_BUCKETS = 4  # 2배 구간 하나를 4칸으로 나눠서 백분위 오차를 25% 안쪽으로 둔다
+BUCKET_COUNT = 140  # 1us 부터 약 19시간까지
+
+
+def _bucket_index(micros):
+    value = int(micros)
+    if value < SUB_BUCKETS:
+        return value
+    bits = value.bit_length()
+    top = value >> (bits - 3)  # 최상위 3비트 (4~7)
+    return min(BUCKET_COUNT - 1, SUB_BUCKETS * (bits - 2) + top - SUB_BUCKETS)
+
+
+def _bucket_upper(index):
+    if index < SUB_BUCKETS:
+        return index + 1
+    bits = index // SUB_BUCKETS + 2
+    top = index % SUB_BUCKETS + SUB_BUCKETS
+    return (top + 1) << (bits - 3)
+
+
+class LatencyHistogram:
+    # 지연 시간을 로그 간격 구간의 개수로만 센다. 기록은 O(1) 이고 백분위는 구간 경계로 근사한다.
+    # 여러 줄이 같은 시각을 갖는 배치는 count 로 한 번에 기록한다
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds, count=1):
+        if seconds < 0:
+            seconds = 0.0
+        self.counts[_bucket_index(seconds * 1e6)] += count
+        self.count += count
+        self.total += seconds * count
+        if seconds > self.max:
+            self.max = seconds
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(self.max, _bucket_upper(index) / 1e6)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+def port_stats(label, handler, writer=None, capture_writer=None, tx_scheduler=None, server=None, storm=None):
+    # 한 포트의 읽기 -> 프레이밍 -> 파일 저장 단계별 카운터와 지연 분포
+    stats = {
+        "port": label,
+        "bytes_read": handler.bytes_read,
+        "lines_framed": handler.lines_read,
+        "bytes_written_to_port": getattr(handler, "bytes_written", 0),
+    }
+    if writer is not None:
+        stats.update({
+            "file_lines_written": writer.lines_written,
+            "file_bytes_written": writer.bytes_written,
+            "file_spilled_lines": writer.spilled_lines,
+            "file_error": writer.error,
+            "file_backlog_lines": writer.queued_lines - writer.lines_written,
+            "file_write_latency": writer.write_latency.snapshot(),
+            "file_flush_latency": writer.flush_latency.snapshot(),
+        })
+    if capture_writer is not None:
+        stats.update({
+            "capture_records": capture_writer.records_written,
+            "capture_dropped_records": capture_writer.dropped_records,
+        })
+    if tx_scheduler is not None:
+        stats["tx"] = tx_scheduler.stats()
+    if server is not None:
+        stats["fanout"] = server.stats()
+    if storm is not None:
+        stats["storm"] = storm.stats()
+    return stats
+
+
+def render_stats(render_scheduler):
+    # 공용 큐 -> 화면 단계
+    return {
+        "queue_depth": render_scheduler.queue_depth,
+        "queue_peak": render_scheduler.queue_peak,
+        "rendered_lines": render_scheduler.rendered_lines,
+        "dropped_frames": render_scheduler.dropped_frames,
+        "batch_size": render_scheduler.batch_size,
+        "arrival_to_drain": render_scheduler.queue_latency.snapshot(),
+        "arrival_to_render": render_scheduler.render_latency.snapshot(),
+        "frame_time": render_scheduler.frame_time.snapshot(),
+    }
+
+
+def pipeline_snapshot(ports, render=None):
+    return {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ports": ports,
+        "render": render,
+    }
+
+
+def dump_stats(stats, path):
+    try:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(stats, file, ensure_ascii=False, indent=2)
+        return True, path
+    except Exception as e:
+        return False, str(e)
+
+
+def format_histogram(name, snapshot):
+    return (f"{name}: n={snapshot['count']} 평균 {snapshot['mean_ms']:.2f}ms  p50 {snapshot['p50_ms']:.2f}  "
+            f"p90 {snapshot['p90_ms']:.2f}  p99 {snapshot['p99_ms']:.2f}  최대 {snapshot['max_ms']:.2f}ms")
+
+
+def format_pipeline_stats(stats):
+    lines = [f"[{stats['time']}]"]
+    render = stats.get("render")
+    if render:
+        lines.append(f"화면: {render['rendered_lines']}줄  큐 {render['queue_depth']} (최대 {render['queue_peak']})  "
+                     f"드롭 프레임 {render['dropped_frames']}  배치 {render['batch_size']}")
+        lines.append("  " + format_histogram("수신->큐 꺼냄", render['arrival_to_drain']))
+        lines.append("  " + format_histogram("수신->반영", render['arrival_to_render']))
+        lines.append("  " + format_histogram("프레임 처리", render['frame_time']))
+    for port in stats["ports"]:
+        lines.append(f"{port['port']}: 수신 {port['bytes_read']} bytes / {port['lines_framed']}줄  "
+                     f"송신 {port['bytes_written_to_port']} bytes")
+        if "file_lines_written" in port:
+            lines.append(f"  파일: {port['file_lines_written']}줄 저장  대기 {port['file_backlog_lines']}줄  "
+                         f"넘침 {port['file_spilled_lines']}줄"
+                         + (f"  오류: {port['file_error']}" if port['file_error'] else ""))
+            lines.append("  " + format_histogram("파일 쓰기 대기", port['file_write_latency']))
+            lines.append("  " + format_histogram("flush", port['file_flush_latency']))
+        if "capture_records" in port:
+            lines.append(f"  원본: {port['capture_records']} 레코드  누락 {port['capture_dropped_records']}")
+        tx = port.get("tx")
+        if tx and tx["commands"]:
+            lines.append(f"  전송: {tx['commands']}건 {tx['rate']:.0f}/s  지터 평균 {tx['jitter_avg_us']:.0f}us "
+                         f"최대 {tx['jitter_max_us']:.0f}us  대기 {tx['backpressure_waits']}")
+        fanout = port.get("fanout")
+        if fanout:
+            lines.append(f"  공유 {fanout['address']}: 클라이언트 {fanout['clients']}개  "
+                         f"버림 {fanout['dropped_bytes']}B  느려서 끊음 {fanout['disconnected_slow']}")
+        storm = port.get("storm")
+        if storm and storm["suppressed"]:
+            lines.append(f"  줄이기({storm['mode']}): 생략 {storm['suppressed']}줄  요약 {storm['summaries']}줄  "
+                         f"기억 {storm['keys']}종류")
+    return "\n".join(lines)
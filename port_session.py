@@ -0,0 +1,213 @@
+import os
+import heapq
+import threading
+from collections import deque
+from operator import itemgetter
+from replay_source import create_port_handler, parse_replay_port, REPLAY_PREFIX
+from tx_scheduler import TxScheduler
+from trigger_capture import TriggerCapture
+from port_watcher import reconnect_port
+from fanout_server import FanoutServer
+from byte_format import format_sent
+from line_framer import make_framer
+from utils import capture_timestamp_ns
+
+SYSTEM_SOURCE = 0  # 특정 포트에 속하지 않는 안내 메시지
+
+
+def port_label(port):
+    # 탭 이름과 파일 이름에 쓸 짧은 포트 이름
+    if port.startswith(REPLAY_PREFIX):
+        path, _ = parse_replay_port(port)
+        return os.path.splitext(os.path.basename(path))[0]
+    return os.path.basename(port.rstrip("/\\")) or port
+
+
+class PortSession:
+    # 포트 하나의 연결, 읽기 스레드, 전송 스케줄러, 화면/파일 기록(LogHandler) 을 묶는다.
+    # 읽은 줄은 (source_id, [(시각, 줄), ...]) 로 공용 큐에 넣고, 화면 갱신은 RenderScheduler 하나가 맡는다
+    def __init__(self, source_id, port, log_queue, log_handler, on_event=None):
+        self.source_id = source_id
+        self.port = port
+        self.label = port_label(port)
+        self.log_queue = log_queue
+        self.log_handler = log_handler
+        self.on_event = on_event  # (세션, "COM_PORT_DISCONNECTED" / "RECONNECTED" / "REPLAY_FINISHED" / 전송 오류 메시지)
+        self.handler = create_port_handler(port)
+        self.handler.add_raw_listener(self.record_raw)
+        self.connected_event = threading.Event()
+        self.tx_scheduler = TxScheduler(lambda: self.handler, on_sent=self.on_commands_sent,
+                                        on_error=self.on_send_error)
+        # 저장 여부와 상관없이 최근 원본 바이트를 메모리에 두었다가 트리거가 걸리면 앞뒤 구간만 파일로 남긴다
+        self.trigger = TriggerCapture(self.label, source_id, on_event=self.on_trigger_event,
+                                      send_command=self.tx_scheduler.submit)
+        self.handler.add_raw_listener(self.trigger.record)
+        self.thread = None
+        self.tab = None  # 이 포트의 로그 탭 (GUI 에서만 쓴다)
+        self.watcher = None  # PortWatcher. 있으면 경로가 바뀐 USB 장치도 다시 찾는다
+        self.auto_reconnect = False
+        self.reconnecting = False
+        self.reconnect_cancel = threading.Event()
+        self.identity = None
+        self.baud = None
+        self.server = None  # FanoutServer. 있으면 읽은 줄을 TCP 클라이언트들에게도 보낸다
+
+    def record_raw(self, direction, timestamp_ns, data):
+        self.log_handler.capture_writer.record(direction, timestamp_ns, data, self.source_id)
+
+    def connect(self, baud, framing, display="text"):
+        try:
+            self.handler.set_framer(make_framer(framing))
+            self.handler.set_display_mode(display)
+        except ValueError as e:
+            return False, str(e)
+        success, message = self.handler.connect(self.port, baud)
+        if not success:
+            return False, message
+        self.trigger.framing = framing
+        self.trigger.display = display
+        self.baud = baud
+        self.identity = self.watcher.identity(self.port) if self.watcher is not None else None
+        self.reconnect_cancel.clear()
+        self.tx_scheduler.start()
+        self.connected_event.set()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.read_loop, name=f"reader-{self.label}", daemon=True)
+            self.thread.start()
+        return True, message
+
+    def disconnect(self):
+        self.reconnect_cancel.set()
+        self.connected_event.clear()
+        self.tx_scheduler.stop_script()
+        self.handler.disconnect()
+
+    def close(self):
+        self.disconnect()
+        self.tx_scheduler.stop()
+        self.trigger.close()
+        self.stop_server()
+
+    def is_connected(self):
+        return bool(self.handler.is_connected())
+
+    def is_active(self):
+        # 연결되어 있거나 끊어진 장치를 다시 기다리는 중
+        return self.reconnecting or self.is_connected()
+
+    def post(self, entries):
+        self.log_queue.put((self.source_id, entries))
+
+    def read_loop(self):
+        handler = self.handler
+        while True:
+            # 연결되기 전에는 이벤트에서, 연결된 뒤에는 read_data 안에서 데이터가 올 때까지 잠들어 있는다
+            self.connected_event.wait()
+            data = handler.read_data()
+            if data == "COM_PORT_DISCONNECTED" or data == "REPLAY_FINISHED":
+                self.connected_event.clear()
+                if data == "COM_PORT_DISCONNECTED":
+                    self.trigger.on_disconnect()
+                if self.on_event:
+                    self.on_event(self, data)
+                if data == "COM_PORT_DISCONNECTED" and self.auto_reconnect:
+                    self.reconnect()
+            elif data:
+                # 한 번 읽은 줄들은 묶어서 큐에 한 번만 넣는다
+                self.post(data)
+                self.trigger.check_lines(data)
+                server = self.server
+                if server is not None:
+                    server.publish_lines(data)
+            elif not handler.is_connected():
+                self.connected_event.clear()
+
+    def reconnect(self):
+        # 읽기 스레드에서 장치가 다시 열릴 때까지 기다렸다가 바로 이어서 읽는다.
+        # 다시 열린 뒤 첫 바이트부터 놓치지 않도록 화면 갱신을 기다리지 않는다
+        self.reconnecting = True
+        try:
+            port = reconnect_port(self.handler, self.port, self.baud, self.identity, self.watcher,
+                                  self.reconnect_cancel)
+        finally:
+            self.reconnecting = False
+        if port is None:
+            return
+        if self.reconnect_cancel.is_set():
+            self.handler.disconnect()  # 다시 여는 사이에 사용자가 연결을 끊었다
+            return
+        self.port = port
+        self.connected_event.set()
+        if self.on_event:
+            self.on_event(self, "RECONNECTED")
+
+    def start_server(self, host, port, raw=False, allow_write=True, max_client_bytes=1024 * 1024,
+                     policy="drop_oldest", precision="us", port_tries=1):
+        # 이 포트를 TCP 로 나눠 준다. 클라이언트가 보낸 줄은 전송 스케줄러를 거쳐 다른 명령과 섞이지 않게 쓴다.
+        # port_tries 가 1 보다 크면 port 가 사용 중일 때 다음 번호들을 차례로 시도한다
+        self.stop_server()
+        message = ""
+        for offset in range(max(1, port_tries)):
+            try:
+                server = FanoutServer(host, port + offset if port else 0, raw=raw,
+                                      write=self.tx_scheduler.submit if allow_write else None,
+                                      max_client_bytes=max_client_bytes, policy=policy, precision=precision)
+            except ValueError as e:
+                return False, str(e)
+            success, message = server.start()
+            if success:
+                self.server = server
+                if raw:
+                    self.handler.add_raw_listener(server.publish_raw)
+                return True, message
+        return False, message
+
+    def stop_server(self):
+        server = self.server
+        if server is None:
+            return
+        self.server = None
+        self.handler.remove_raw_listener(server.publish_raw)
+        server.stop()
+
+    def on_commands_sent(self, timestamp_ns, commands):
+        self.post([(timestamp_ns, f"전송: {format_sent(command)}") for command in commands])
+
+    def on_trigger_event(self, message):
+        self.post([(None, message)])
+
+    def on_send_error(self, message):
+        if self.on_event:
+            self.on_event(self, message)
+
+
+class TimelineMerger:
+    # 포트마다 따로 들어오는 줄들을 시각 순서로 합친다. 한 포트 안에서는 이미 시각 순서이므로
+    # 다른 포트의 줄이 늦게 도착할 수 있는 reorder_ns 만큼만 붙잡아 두었다가 heapq.merge 로 합친다
+    def __init__(self, reorder_ns=50_000_000):
+        self.reorder_ns = reorder_ns
+        self.pending = {}
+
+    def push(self, source_id, label, entries):
+        now = capture_timestamp_ns()
+        prefix = f"[{label}] " if label else ""
+        pending = self.pending.get(source_id)
+        if pending is None:
+            pending = self.pending[source_id] = deque()
+        # 시각이 없는 안내 메시지는 도착한 시각에 끼워 넣는다
+        pending.extend((now if timestamp_ns is None else timestamp_ns, timestamp_ns, prefix + text)
+                       for timestamp_ns, text in entries)
+
+    def release(self, flush=False):
+        watermark = capture_timestamp_ns() - self.reorder_ns
+        runs = []
+        for pending in self.pending.values():
+            run = []
+            while pending and (flush or pending[0][0] <= watermark):
+                run.append(pending.popleft())
+            if run:
+                runs.append(run)
+        if not runs:
+            return []
+        merged = runs[0] if len(runs) == 1 else heapq.merge(*runs, key=itemgetter(0))
+        return [(timestamp_ns, text) for _, timestamp_ns, text in merged]
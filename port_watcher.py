@@ -0,0 +1,119 @@
+import threading
+import serial.tools.list_ports
+
+
+def list_port_infos():
+    # 경로 -> (VID, PID, 시리얼 번호, USB 위치, 설명)
+    try:
+        return {port.device: (port.vid, port.pid, port.serial_number, port.location, port.description)
+                for port in serial.tools.list_ports.comports()}
+    except Exception:
+        return None
+
+
+def device_identity(info):
+    # 경로가 바뀌어도 같은 장치를 찾기 위한 키. USB 장치가 아니면 None (경로로만 다시 연다)
+    vid, pid, serial_number, location, _ = info
+    if vid is None:
+        return None
+    return vid, pid, serial_number or location
+
+
+class PortWatcher:
+    # 포트 목록 조회(comports)를 UI 스레드 대신 백그라운드 스레드에서 주기적으로 하고 결과를 캐시한다.
+    # 목록이 바뀌면 on_change 를 부른다 (스레드에서 불리므로 UI 는 call_soon 으로 넘겨야 한다).
+    # 재연결을 기다리는 포트가 있으면 fast_interval 로 더 자주 조회한다
+    def __init__(self, interval=2.0, fast_interval=0.1, on_change=None, list_ports=list_port_infos):
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.on_change = on_change
+        self.list_ports = list_ports
+        self.ports = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.scanned = threading.Event()
+        self.fast_holds = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name="port-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    def refresh(self):
+        # 바로 다시 조회하게 한다 (기다리지 않는다)
+        self.wake.set()
+
+    def hold_fast(self):
+        with self.lock:
+            self.fast_holds += 1
+        self.wake.set()
+
+    def release_fast(self):
+        with self.lock:
+            self.fast_holds -= 1
+
+    def run(self):
+        while self.running:
+            self.scan()
+            self.wake.wait(self.fast_interval if self.fast_holds else self.interval)
+            self.wake.clear()
+
+    def scan(self):
+        ports = self.list_ports()
+        if ports is None:
+            return
+        with self.lock:
+            changed = ports != self.ports
+            self.ports = ports
+        self.scanned.set()
+        if changed and self.on_change is not None:
+            self.on_change()
+
+    def devices(self):
+        with self.lock:
+            return list(self.ports)
+
+    def identity(self, device):
+        with self.lock:
+            info = self.ports.get(device)
+        return device_identity(info) if info is not None else None
+
+    def find(self, identity):
+        with self.lock:
+            for device, info in self.ports.items():
+                if device_identity(info) == identity:
+                    return device
+        return None
+
+
+def reconnect_port(handler, port, baud, identity, watcher, cancel, first_delay=0.05, max_delay=0.5):
+    # 끊어진 장치가 다시 나타날 때까지 간격을 늘려 가며 다시 연다. 연결한 경로를 돌려주고
+    # cancel 이 설정되면 None. USB 장치는 경로가 바뀌어도 (VID, PID, 시리얼) 이 같은 포트를 찾고,
+    # 다른 장치가 예전 경로를 받았을 수 있으므로 같은 장치가 목록에 보일 때만 연다
+    delay = first_delay
+    if watcher is not None:
+        watcher.hold_fast()
+    try:
+        while not cancel.is_set():
+            path = port if identity is None or watcher is None else watcher.find(identity)
+            if path is not None:
+                success, _ = handler.connect(path, baud)
+                if success:
+                    return path
+            if cancel.wait(delay):
+                break
+            delay = min(delay * 2, max_delay)
+    finally:
+        if watcher is not None:
+            watcher.release_fast()
+    return None
@@ -0,0 +1,125 @@
+import time
+import queue
+from collections import deque
+from metrics import LatencyHistogram
+from utils import capture_timestamp_ns
+
+
+class RenderScheduler:
+    # 메인 스레드에서 master.after 로 돌면서 로그 큐를 프레임 단위로 비운다.
+    # 큐 항목은 (source_id, [(시각, 줄), ...]) 이고 render_batch 는 그 목록을 받는다
+    def __init__(self, master, log_queue, render_batch, frame_ms=16, status_callback=None,
+                 min_batch=64, max_batch=65536, status_interval=0.25, frame_callback=None):
+        self.master = master
+        self.log_queue = log_queue
+        self.render_batch = render_batch
+        self.frame_callback = frame_callback  # 새 줄이 없어도 매 프레임 불린다
+        self.frame_ms = frame_ms
+        self.frame_budget = frame_ms / 1000.0
+        self.status_callback = status_callback
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.batch_size = min_batch * 4
+        self.status_interval = status_interval
+        self.ui_calls = deque()
+        self.dropped_frames = 0
+        self.rendered_lines = 0
+        self.queue_depth = 0
+        self.queue_peak = 0
+        self.queue_latency = LatencyHistogram()  # 수신 -> 큐에서 꺼낼 때까지
+        self.render_latency = LatencyHistogram()  # 수신 -> 화면/파일 반영까지
+        self.frame_time = LatencyHistogram()  # 프레임 하나를 처리하는 데 걸린 시간
+        self.running = False
+        self.after_id = None
+        self.next_frame_at = None
+        self.last_status_at = 0.0
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.next_frame_at = time.perf_counter()
+            self.after_id = self.master.after(0, self.tick)
+
+    def stop(self):
+        self.running = False
+        if self.after_id is not None:
+            try:
+                self.master.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def call_soon(self, func, *args):
+        # 다른 스레드에서 위젯을 바꿔야 할 때 다음 프레임에 메인 스레드에서 실행한다
+        self.ui_calls.append((func, args))
+
+    def tick(self):
+        self.after_id = None
+        if not self.running:
+            return
+        frame_start = time.perf_counter()
+        if frame_start - self.next_frame_at > self.frame_budget:
+            # 예정된 시각보다 한 프레임 이상 늦게 불렸다
+            self.dropped_frames += int((frame_start - self.next_frame_at) / self.frame_budget)
+
+        while self.ui_calls:
+            func, args = self.ui_calls.popleft()
+            func(*args)
+
+        batches, line_count = self.drain(frame_start + self.frame_budget * 0.5)
+        if batches:
+            self.record_latency(self.queue_latency, batches)
+            self.render_batch(batches)
+            self.rendered_lines += line_count
+        if self.frame_callback:
+            self.frame_callback()
+        if batches:
+            # 화면은 frame_callback 에서 한 번에 다시 그리므로 그 뒤에 잰다
+            self.record_latency(self.render_latency, batches)
+
+        elapsed = time.perf_counter() - frame_start
+        if elapsed > self.frame_budget:
+            self.dropped_frames += int(elapsed / self.frame_budget)
+        self.frame_time.record(elapsed)
+        self.queue_depth = self.log_queue.qsize()
+        if self.queue_depth > self.queue_peak:
+            self.queue_peak = self.queue_depth
+        self.adapt_batch_size(elapsed, line_count)
+
+        if self.status_callback and frame_start - self.last_status_at >= self.status_interval:
+            self.last_status_at = frame_start
+            self.status_callback(self.queue_depth, self.dropped_frames, self.batch_size)
+
+        delay_ms = max(1, int((self.frame_budget - elapsed) * 1000))
+        self.next_frame_at = time.perf_counter() + delay_ms / 1000.0
+        self.after_id = self.master.after(delay_ms, self.tick)
+
+    def record_latency(self, histogram, batches):
+        # 한 번에 읽은 줄들은 같은 수신 시각을 가지므로 배치마다 한 번만 기록한다
+        now = capture_timestamp_ns()
+        for _, entries in batches:
+            timestamp_ns = entries[0][0]
+            if timestamp_ns is not None:
+                histogram.record((now - timestamp_ns) / 1e9, len(entries))
+
+    def drain(self, deadline):
+        batches = []
+        line_count = 0
+        get_nowait = self.log_queue.get_nowait
+        while line_count < self.batch_size:
+            try:
+                item = get_nowait()
+            except queue.Empty:
+                break
+            batches.append(item)
+            line_count += len(item[1])
+            if time.perf_counter() >= deadline:
+                break
+        return batches, line_count
+
+    def adapt_batch_size(self, elapsed, rendered):
+        if elapsed > self.frame_budget:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+        elif rendered >= self.batch_size and self.queue_depth and elapsed < self.frame_budget * 0.5:
+            # 밀린 데이터가 있고 시간이 남으면 한 프레임에 더 많이 그린다
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
@@ -0,0 +1,267 @@
+import os
+import time
+import threading
+from line_framer import LineFramer
+from uart_handler import UARTHandler
+from capture_format import CaptureReader, DIRECTION_RX
+from utils import capture_timestamp_ns, parse_log_timestamp
+from byte_format import decode_text, make_decoder
+
+REPLAY_PREFIX = "replay:"
+
+
+def parse_replay_port(port):
+    # "replay:<파일>" 또는 "replay:<파일>|<배속>" (배속 0 은 최대 속도)
+    spec = port[len(REPLAY_PREFIX):] if port.startswith(REPLAY_PREFIX) else port
+    path, separator, speed = spec.rpartition("|")
+    if not separator:
+        return spec, 1.0
+    try:
+        return path, float(speed)
+    except ValueError:
+        return spec, 1.0
+
+
+def iter_replay_items(path):
+    # (원래 시각 ns 또는 None, 데이터, 원본 바이트인지) 를 파일 순서대로 돌려준다
+    if path.endswith(".ucap"):
+        with CaptureReader(path) as reader:
+            for direction, timestamp_ns, data, _ in reader.records():
+                if direction == DIRECTION_RX:
+                    yield timestamp_ns, data, True
+    else:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            for line in file:
+                timestamp_ns, text = parse_log_timestamp(line.rstrip('\r\n'))
+                yield timestamp_ns, text, False
+
+
+class ReplayClock:
+    # 첫 항목 시각을 기준으로 speed 배속에 맞춰 각 항목을 내보낼 시점을 계산한다
+    def __init__(self, speed):
+        self.speed = speed
+        self.first_ns = None
+        self.started = None
+
+    def delay(self, timestamp_ns):
+        if self.speed <= 0 or timestamp_ns is None:
+            return 0.0
+        if self.first_ns is None:
+            self.first_ns = timestamp_ns
+            self.started = time.monotonic()
+        due = self.started + (timestamp_ns - self.first_ns) / 1e9 / self.speed
+        return due - time.monotonic()
+
+
+class ReplaySource:
+    # UARTHandler 대신 꽂아 쓰는 재생용 입력. 저장된 .log 나 .ucap 을 원래 간격, N 배속, 또는 최대 속도로 내보낸다
+    def __init__(self, retime=False, max_batch=1000, poll_timeout=0.05):
+        self.framer = LineFramer()
+        self.retime = retime  # True 면 원래 시각 대신 재생 시점의 시각을 붙인다
+        self.max_batch = max_batch
+        self.poll_timeout = poll_timeout
+        self.items = None
+        self.pending = None
+        self.clock = None
+        self.connected = False
+        self.path = None
+        self.raw_listeners = []
+        self.decode_frames = decode_text
+        self.bytes_read = 0
+        self.lines_read = 0
+
+    def add_raw_listener(self, listener):
+        if listener not in self.raw_listeners:
+            self.raw_listeners.append(listener)
+
+    def remove_raw_listener(self, listener):
+        if listener in self.raw_listeners:
+            self.raw_listeners.remove(listener)
+
+    def get_ports(self):
+        return []
+
+    def set_framer(self, framer):
+        self.framer = framer
+
+    def set_display_mode(self, mode):
+        self.decode_frames = make_decoder(mode)
+
+    def connect(self, port, baud=None):
+        path, speed = parse_replay_port(port)
+        if not os.path.isfile(path):
+            return False, f"파일이 없습니다: {path}"
+        try:
+            self.items = iter_replay_items(path)
+            self.pending = next(self.items, None)
+        except (OSError, ValueError) as e:
+            return False, str(e)
+        self.path = path
+        self.clock = ReplayClock(speed)
+        self.connected = True
+        return True, "재생 시작"
+
+    def disconnect(self):
+        self.connected = False
+        if self.items is not None:
+            self.items.close()
+        self.items = None
+        self.pending = None
+        self.framer.reset()
+
+    def is_connected(self):
+        return self.connected
+
+    def cancel_read(self):
+        # read_data 는 poll_timeout 보다 오래 잠들지 않으므로 따로 깨울 필요가 없다
+        pass
+
+    def write_data(self, data):
+        return self.write_bytes(data.encode('utf-8', errors='replace') + b'\n')
+
+    def write_bytes(self, data):
+        # 재생 중에는 보낸 명령을 버린다
+        if self.connected:
+            return True, "데이터 전송 성공"
+        return False, "연결되지 않음"
+
+    def out_waiting(self):
+        return 0
+
+    def read_data(self):
+        if not self.connected:
+            return None
+        if self.pending is None:
+            # 파일 끝. 프레임이 덜 된 마지막 데이터까지 내보내고 다음 호출에서 끝을 알린다
+            timestamp_ns = capture_timestamp_ns()
+            entries = [(timestamp_ns, text) for text in self.decode_frames(self.framer.flush())]
+            if entries:
+                self.lines_read += len(entries)
+                return entries
+            self.disconnect()
+            return "REPLAY_FINISHED"
+        entries = []
+        while len(entries) < self.max_batch:
+            item = self.pending
+            if item is None:
+                break
+            timestamp_ns, payload, is_raw = item
+            wait = self.clock.delay(timestamp_ns)
+            if wait > 0:
+                if entries:
+                    return entries
+                # 실제 포트의 read timeout 처럼 잠깐만 기다렸다가 돌아간다
+                time.sleep(min(wait, self.poll_timeout))
+                if wait > self.poll_timeout:
+                    return None
+            self.pending = next(self.items, None)
+
+            if self.retime or timestamp_ns is None:
+                timestamp_ns = capture_timestamp_ns()
+            if is_raw:
+                self.bytes_read += len(payload)
+                for listener in self.raw_listeners:
+                    listener(DIRECTION_RX, timestamp_ns, payload)
+                frames = self.framer.feed(payload)
+                self.lines_read += len(frames)
+                entries.extend((timestamp_ns, text) for text in self.decode_frames(frames))
+            else:
+                # .log 의 줄은 이미 프레임을 나눈 글자이므로 프레이머는 건너뛰지만, 원본 저장(.ucap)과
+                # 트리거 링이 비지 않도록 파일에 저장된 모양(UTF-8 + 줄바꿈)대로 수신 바이트로 넘긴다
+                if self.raw_listeners:
+                    data = payload.encode('utf-8', errors='replace') + b'\n'
+                    for listener in self.raw_listeners:
+                        listener(DIRECTION_RX, timestamp_ns, data)
+                self.bytes_read += len(payload) + 1
+                self.lines_read += 1
+                entries.append((timestamp_ns, payload))
+        return entries
+
+
+class PtyFeeder:
+    # 가상 시리얼 포트(pty)에 저장된 데이터를 흘려 보내서 실제 시리얼 경로까지 그대로 시험한다
+    def __init__(self, path, speed=1.0, repeat=1):
+        self.path = path
+        self.speed = speed
+        self.repeat = repeat
+        self.master_fd = None
+        self.slave_fd = None
+        self.slave_path = None
+        self.thread = None
+        self.running = False
+        self.bytes_written = 0
+        self.error = None
+
+    def start(self):
+        if os.name != 'posix':
+            return False, "pty 재생은 POSIX 에서만 지원합니다"
+        import tty
+        try:
+            self.master_fd, self.slave_fd = os.openpty()
+            tty.setraw(self.slave_fd)  # 줄바꿈 변환 없이 바이트를 그대로 넘긴다
+            self.slave_path = os.ttyname(self.slave_fd)
+        except OSError as e:
+            return False, str(e)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="pty-feeder", daemon=True)
+        self.thread.start()
+        return True, self.slave_path
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.master_fd = None
+        self.slave_fd = None
+
+    def is_running(self):
+        return self.running
+
+    def drain(self, timeout=5.0):
+        # 읽는 쪽이 slave 에 쌓인 데이터를 다 가져갈 때까지 기다린다
+        import fcntl
+        import termios
+        import struct
+        deadline = time.monotonic() + timeout
+        while self.slave_fd is not None and time.monotonic() < deadline:
+            try:
+                waiting = struct.unpack('i', fcntl.ioctl(self.slave_fd, termios.FIONREAD, b'\0' * 4))[0]
+            except OSError:
+                return
+            if waiting == 0:
+                return
+            time.sleep(0.05)
+
+    def run(self):
+        try:
+            count = 0
+            while self.running and (self.repeat <= 0 or count < self.repeat):
+                clock = ReplayClock(self.speed)
+                for timestamp_ns, payload, is_raw in iter_replay_items(self.path):
+                    if not self.running:
+                        break
+                    wait = clock.delay(timestamp_ns)
+                    if wait > 0:
+                        time.sleep(wait)
+                    data = payload if is_raw else payload.encode('utf-8', errors='replace') + b'\n'
+                    view = memoryview(data)
+                    while view:
+                        written = os.write(self.master_fd, view)
+                        view = view[written:]
+                    self.bytes_written += len(data)
+                count += 1
+        except OSError as e:
+            self.error = str(e)
+        self.running = False
+
+
+def create_port_handler(port):
+    if port.startswith(REPLAY_PREFIX):
+        return ReplaySource()
+    return UARTHandler()
@@ -1,4 +1,8 @@
 import os
+from highlighter import HighlightRule
+from field_extractor import FieldRule
+from trigger_capture import TriggerRule
+from storm_compactor import StormRule
 
 def create_default_setup_file(setup_file_path, log_save_path):
     try:
@@ -25,6 +29,77 @@ def load_custom_commands(setup_file_path):
     except Exception as e:
         return None, None, str(e)
 
+def load_highlight_rules(setup_file_path):
+    # HL:<색>:<옵션>:<패턴> 형식, 옵션은 r(정규식) i(대소문자 무시) 조합 또는 -
+    rules = []
+    try:
+        with open(setup_file_path, 'r', encoding='utf-8') as file:
+            for line in file.readlines()[1:]:
+                parts = line.rstrip('\r\n').split(':', 3)
+                if len(parts) == 4 and parts[0].strip() == "HL" and parts[3]:
+                    color, options, pattern = parts[1].strip(), parts[2].strip().lower(), parts[3]
+                    rules.append(HighlightRule(pattern, color or "blue", regex='r' in options, ignore_case='i' in options))
+    except Exception:
+        pass
+    return rules
+
+def load_field_rules(setup_file_path):
+    # FIELD:<이름> 또는 FIELD:<이름>:<정규식> 형식, FIELD:* 는 모든 "이름=숫자".
+    # 패턴이 잘못되면 ValueError
+    rules = []
+    try:
+        with open(setup_file_path, 'r', encoding='utf-8') as file:
+            lines = file.readlines()[1:]
+    except Exception:
+        return rules
+    for line in lines:
+        parts = line.rstrip('\r\n').split(':', 2)
+        if len(parts) >= 2 and parts[0].strip() == "FIELD" and parts[1].strip():
+            rules.append(FieldRule(parts[1].strip(), parts[2] if len(parts) == 3 else ""))
+    return rules
+
+def load_trigger_rules(setup_file_path):
+    # TRIG:<종류>[:<값>] 형식 (pattern, regex, disconnect, rate). 값이 잘못되면 ValueError
+    rules = []
+    try:
+        with open(setup_file_path, 'r', encoding='utf-8') as file:
+            lines = file.readlines()[1:]
+    except Exception:
+        return rules
+    for line in lines:
+        parts = line.rstrip('\r\n').split(':', 2)
+        if len(parts) >= 2 and parts[0].strip() == "TRIG":
+            rules.append(TriggerRule(parts[1].strip(), parts[2] if len(parts) == 3 else ""))
+    return rules
+
+def load_storm_rules(setup_file_path):
+    # STORM:<초당 줄 수>:<정규식> 형식, 정규식에 맞는 줄은 OPT:storm_rate 대신 이 값을 쓴다. 값이 잘못되면 ValueError
+    rules = []
+    try:
+        with open(setup_file_path, 'r', encoding='utf-8') as file:
+            lines = file.readlines()[1:]
+    except Exception:
+        return rules
+    for line in lines:
+        parts = line.rstrip('\r\n').split(':', 2)
+        if len(parts) == 3 and parts[0].strip() == "STORM":
+            rules.append(StormRule(parts[1].strip(), parts[2]))
+    return rules
+
+def load_options(setup_file_path):
+    # OPT:<이름>=<값> 형식의 추가 설정
+    options = {}
+    try:
+        with open(setup_file_path, 'r', encoding='utf-8') as file:
+            for line in file.readlines()[1:]:
+                parts = line.strip().split(':', 1)
+                if len(parts) == 2 and parts[0].strip() == "OPT" and '=' in parts[1]:
+                    key, value = parts[1].split('=', 1)
+                    options[key.strip()] = value.strip()
+    except Exception:
+        pass
+    return options
+
 def update_setup_file(setup_file_path, log_save_path):
     try:
         with open(setup_file_path, 'r', encoding='utf-8') as file:
@@ -0,0 +1,180 @@
+import re
+from collections import OrderedDict
+from functools import partial
+
+STORM_MODES = ["off", "exact", "normalized"]
+# normalized 에서 가리는 값: 단어 경계에서 시작하는 10진수, 소수, 0x 가 붙거나 숫자가 섞인 16진수.
+# 단어 경계에서만 찾으므로 uart1, sensor2 같은 이름은 그대로 남는다
+NUMBER = re.compile(r'\b[0-9A-Fa-f]*[0-9][0-9A-Fa-fxX.]*')
+
+# 키 상태 목록의 칸
+TOKENS, SEEN, RATE, FIRST, LAST, COUNT, SAMPLE = range(7)
+
+
+class StormRule:
+    # setup.txt 의 STORM 줄 하나 (또는 명령줄 --storm-rule)
+    #   STORM:2:watchdog reset      정규식에 맞는 줄은 같은 줄을 초당 2줄까지만 보여 준다
+    #   STORM:0:ASSERT|panic        0 이면 맞는 줄은 줄이지 않는다
+    def __init__(self, rate, pattern):
+        try:
+            self.rate = float(rate)
+        except ValueError:
+            raise ValueError(f"STORM 규칙에는 초당 줄 수가 필요합니다: '{rate}'")
+        if self.rate < 0:
+            raise ValueError(f"STORM 규칙의 초당 줄 수는 0 이상이어야 합니다: '{rate}'")
+        try:
+            self.rx = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"잘못된 STORM 정규식 '{pattern}': {e}")
+        self.pattern = pattern
+
+
+def parse_storm_rule(text):
+    rate, _, pattern = text.partition(":")
+    return StormRule(rate.strip(), pattern)
+
+
+class StormCompactor:
+    # 같은 줄(또는 숫자만 다른 줄)이 폭주하면 키마다 토큰 버킷으로 초당 rate 줄까지만 통과시키고
+    # 나머지는 세기만 했다가 "N회 반복, T ms 동안" 요약 한 줄로 바꾼다.
+    # 최근 키는 max_keys 개까지만 LRU 로 기억하므로 메모리는 줄 종류 수와 상관없이 제한된다
+    def __init__(self, mode="exact", rate=20.0, summary_ms=1000, max_keys=4096, rules=()):
+        self.rules = list(rules)
+        self.keys = OrderedDict()  # 키 -> [토큰, 마지막 시각, rate, 첫 생략 시각, 마지막 생략 시각, 생략 수, 마지막 생략 줄]
+        self.storming = {}  # 생략한 줄이 있어서 요약을 내보내야 하는 키
+        self.last_ns = 0  # 지금까지 본 가장 늦은 시각. 요약 줄이 시각 순서를 깨지 않도록 쓴다
+        self.passed = 0
+        self.suppressed = 0
+        self.summaries = 0
+        self.evicted = 0
+        self.set_mode(mode)
+        self.rate = float(rate)
+        self.summary_ns = int(summary_ms * 1e6)
+        self.max_keys = max_keys
+        self.check()
+
+    def set_mode(self, mode):
+        if mode not in STORM_MODES[1:]:
+            raise ValueError(f"알 수 없는 줄이기 방식 '{mode}' ({', '.join(STORM_MODES)})")
+        self.mode = mode
+        self.make_key = None if mode == "exact" else partial(NUMBER.sub, "#")
+        self.keys.clear()
+        self.storming.clear()
+
+    def configure(self, options):
+        # setup.txt 의 OPT: 항목이나 명령줄 인자로 받은 값을 반영한다
+        self.rate = float(options.get("storm_rate", self.rate))
+        self.summary_ns = int(float(options.get("storm_summary_ms", self.summary_ns / 1e6)) * 1e6)
+        self.max_keys = int(options.get("storm_keys", self.max_keys))
+        self.check()
+
+    def check(self):
+        if self.rate < 0 or self.summary_ns <= 0 or self.max_keys <= 0:
+            raise ValueError("storm_rate 는 0 이상, storm_summary_ms 와 storm_keys 는 0 보다 커야 합니다")
+
+    def rate_for(self, text):
+        for rule in self.rules:
+            if rule.rx.search(text):
+                return rule.rate
+        return self.rate
+
+    def process(self, entries):
+        # 보여 줄 (시각, 줄) 목록을 돌려준다. 시각이 없는 안내 메시지는 그대로 통과한다
+        keys = self.keys
+        make_key = self.make_key
+        out = []
+        append = out.append
+        dropped = 0
+        for entry in entries:
+            timestamp_ns, text = entry
+            if timestamp_ns is None:
+                append(entry)
+                continue
+            key = text if make_key is None else make_key(text)
+            state = keys.get(key)
+            if state is None:
+                rate = self.rate_for(text)
+                keys[key] = [max(rate, 1.0) - 1, timestamp_ns, rate, 0, 0, 0, None]
+                if len(keys) > self.max_keys:
+                    self.evict(out)
+                append(entry)
+                continue
+            keys.move_to_end(key)
+            rate = state[RATE]
+            if not rate:
+                append(entry)
+                continue
+            tokens = min(max(rate, 1.0), state[TOKENS] + (timestamp_ns - state[SEEN]) * rate / 1e9)
+            state[SEEN] = timestamp_ns
+            if tokens >= 1:
+                # 폭주 중에도 rate 만큼은 실제 줄을 보여 주고, 요약은 flush 가 summary_ms 마다 한 줄씩 낸다
+                state[TOKENS] = tokens - 1
+                append(entry)
+            else:
+                state[TOKENS] = tokens
+                dropped += 1
+                if not state[COUNT]:
+                    state[FIRST] = timestamp_ns
+                    self.storming[key] = state
+                state[COUNT] += 1
+                state[LAST] = timestamp_ns
+                state[SAMPLE] = text
+        if entries:
+            self.passed += len(entries) - dropped
+            self.suppressed += dropped
+            last_ns = entries[-1][0]
+            if last_ns is not None and last_ns > self.last_ns:
+                self.last_ns = last_ns
+        if self.storming:
+            out.extend(self.flush(self.last_ns))
+        return out
+
+    def flush(self, now_ns, force=False):
+        # 생략을 시작한 지 summary_ms 가 지난 키의 요약을 내보낸다 (폭주 중에도 주기마다 한 줄).
+        # 읽을 줄이 없을 때도 화면 갱신 주기나 읽기 시간 초과 때 불러서 마지막 요약이 늦지 않게 한다
+        if not self.storming:
+            return []
+        summary_ns = self.summary_ns
+        due = [key for key, state in self.storming.items() if force or now_ns - state[FIRST] >= summary_ns]
+        return [self.summarize(key, self.storming[key], max(now_ns, self.last_ns)) for key in due]
+
+    def summarize(self, key, state, timestamp_ns):
+        count = state[COUNT]
+        span_ms = (state[LAST] - state[FIRST]) / 1e6
+        kind = "같은 줄" if self.make_key is None else "비슷한 줄"
+        state[COUNT] = 0
+        state[SAMPLE], sample = None, state[SAMPLE]
+        self.storming.pop(key, None)
+        self.summaries += 1
+        if timestamp_ns > self.last_ns:
+            self.last_ns = timestamp_ns
+        return timestamp_ns, f"{sample}  [{kind} {count}회 반복, {span_ms:.0f} ms 동안]"
+
+    def evict(self, out):
+        key, state = self.keys.popitem(last=False)
+        self.evicted += 1
+        if state[COUNT]:
+            out.append(self.summarize(key, state, self.last_ns))
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "passed": self.passed,
+            "suppressed": self.suppressed,
+            "summaries": self.summaries,
+            "keys": len(self.keys),
+            "evicted_keys": self.evicted,
+        }
+
+
+def storm_settings(options):
+    # OPT:storm=exact|normalized 이면 화면에 보일 줄을 줄인다. 없거나 off 이면 None
+    #   OPT:storm_rate=20          같은 줄을 초당 몇 줄까지 보여 줄지
+    #   OPT:storm_summary_ms=1000  폭주 중 요약 줄을 내보내는 간격
+    #   OPT:storm_keys=4096        기억하는 최근 줄 종류 수
+    #   OPT:storm_file=1           파일에도 줄인 줄을 저장 (기본값은 파일에는 모두 저장)
+    mode = str(options.get("storm", "off")).strip() or "off"
+    if mode == "off":
+        return None
+    StormCompactor(mode).configure(options)
+    return mode, str(options.get("storm_file", "0")) in ("1", "true", "on")
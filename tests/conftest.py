@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 바로 있으므로 benchmarks 와 같은 방식으로 경로를 넣는다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import pytest
+from byte_format import parse_tx_input, decode_hex, make_decoder, format_sent
+
+
+def test_hex_input():
+    assert parse_tx_input("01 02 ff", "hex") == b"\x01\x02\xff"
+    assert parse_tx_input("0x01,0X02", "hex") == b"\x01\x02"
+    with pytest.raises(ValueError):
+        parse_tx_input("0g", "hex")
+
+
+def test_escape_input():
+    assert parse_tx_input("AT\\r\\n", "escape") == b"AT\r\n"
+    assert parse_tx_input("\\x02data\\x03\\t\\0\\\\", "escape") == b"\x02data\x03\t\0\\"
+    assert parse_tx_input("한글 \\xFF", "escape") == "한글 ".encode('utf-8') + b"\xff"
+    for text in ("\\q", "end\\", "\\x4"):
+        with pytest.raises(ValueError):
+            parse_tx_input(text, "escape")
+
+
+def test_text_input_and_unknown_mode():
+    assert parse_tx_input("AT\\r", "text") == "AT\\r"
+    with pytest.raises(ValueError):
+        parse_tx_input("x", "binary")
+
+
+def test_hex_display():
+    assert decode_hex([b"A\x00\xff"]) == ["41 00 ff  |A..|"]
+    assert make_decoder("text")([b"\xed\x95\x9c\xff"]) == ["한�"]
+    assert format_sent(b"\x01\x02") == "01 02"
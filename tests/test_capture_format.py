@@ -0,0 +1,95 @@
+import pytest
+from capture_format import (CaptureWriter, CaptureReader, DIRECTION_RX, DIRECTION_TX, INDEX_SUFFIX, RECORD_HEADER,
+                            export_text, parse_time_arg, capture_path_for)
+
+BASE_NS = 1_700_000_000 * 1_000_000_000
+
+
+def write_capture(path, records, **options):
+    writer = CaptureWriter(**options)
+    success, _ = writer.open(str(path))
+    assert success
+    for record in records:
+        writer.record(*record)
+    writer.close()
+    assert writer.error is None
+    assert writer.records_written == len(records)
+    return writer
+
+
+def make_records(count):
+    return [(DIRECTION_TX if i % 10 == 0 else DIRECTION_RX, BASE_NS + i * 1_000_000,
+             f"rec {i}\n".encode() if i % 3 else bytes(range(i % 256)), i % 2) for i in range(count)]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "a.ucap"
+    records = make_records(500)
+    write_capture(path, records)
+    with CaptureReader(str(path)) as reader:
+        assert [(d, t, data, s) for d, t, data, s in reader.records()] == records
+
+
+def test_index_seek_gives_same_window(tmp_path):
+    path = tmp_path / "a.ucap"
+    records = make_records(2000)
+    write_capture(path, records, index_bytes=256, index_seconds=0.05)
+    with CaptureReader(str(path)) as reader:
+        assert len(reader.index_offsets) > 10
+        start_ns, end_ns = records[700][1], records[1300][1]
+        assert list(reader.records(start_ns, end_ns)) == records[700:1301]
+        assert reader.seek_offset(start_ns) > reader.index_offsets[0]
+
+
+def test_missing_index_and_truncated_tail(tmp_path):
+    path = tmp_path / "a.ucap"
+    records = make_records(50)
+    write_capture(path, records)
+    (tmp_path / ("a.ucap" + INDEX_SUFFIX)).unlink()
+    with open(path, 'ab') as file:
+        file.write(RECORD_HEADER.pack(DIRECTION_RX, 0, 0, BASE_NS, 100) + b"short")
+    with CaptureReader(str(path)) as reader:
+        assert list(reader.records()) == records
+
+
+def test_iter_lines_frames_each_direction_and_source(tmp_path):
+    path = tmp_path / "a.ucap"
+    write_capture(path, [(DIRECTION_RX, BASE_NS, b"hel", 0),
+                         (DIRECTION_TX, BASE_NS + 1, b"AT\r\n", 0),
+                         (DIRECTION_RX, BASE_NS + 2, b"lo\r\nwor", 0),
+                         (DIRECTION_RX, BASE_NS + 3, b"other\n", 1),
+                         (DIRECTION_RX, BASE_NS + 4, b"ld", 0)])
+    with CaptureReader(str(path)) as reader:
+        lines = list(reader.iter_lines())
+    assert [(direction, source, text) for _, direction, source, text in lines] == [
+        (DIRECTION_TX, 0, "AT"), (DIRECTION_RX, 0, "hello"), (DIRECTION_RX, 1, "other"), (DIRECTION_RX, 0, "world")]
+    assert lines[-1][0] is None
+
+
+def test_export_text(tmp_path):
+    path = tmp_path / "a.ucap"
+    write_capture(path, [(DIRECTION_RX, BASE_NS, b"one\ntwo\n", 0), (DIRECTION_TX, BASE_NS + 5, b"cmd\n", 0)])
+    out = tmp_path / "a.log"
+    assert export_text(str(path), str(out), display="hex") == 3
+    lines = out.read_text(encoding='utf-8').splitlines()
+    assert lines[0].endswith("6f 6e 65  |one|")
+    assert "전송: 63 6d 64  |cmd|" in lines[2]
+
+
+def test_bad_files(tmp_path):
+    empty = tmp_path / "empty.ucap"
+    empty.write_bytes(b"")
+    other = tmp_path / "other.ucap"
+    other.write_bytes(b"NOPE" + bytes(12))
+    for path in (empty, other):
+        with pytest.raises(ValueError):
+            CaptureReader(str(path))
+
+
+def test_parse_time_arg():
+    assert parse_time_arg(None, BASE_NS) is None
+    assert parse_time_arg("+1.5", BASE_NS) == BASE_NS + 1_500_000_000
+    assert parse_time_arg("2024-05-01 12:30:05.25", 0) % 1_000_000_000 == 250_000_000
+    with pytest.raises(ValueError):
+        parse_time_arg("yesterday", BASE_NS)
+    assert capture_path_for("/x/run_1.log") == "/x/run_1.ucap"
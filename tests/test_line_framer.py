@@ -0,0 +1,107 @@
+import pytest
+from line_framer import LineFramer, make_framer, cobs_decode, slip_decode
+
+
+def cobs_encode(data):
+    out = bytearray()
+    block = bytearray()
+    for byte in data:
+        if byte == 0:
+            out += bytes([len(block) + 1]) + block
+            block = bytearray()
+        else:
+            block.append(byte)
+            if len(block) == 254:
+                out += b'\xff' + block
+                block = bytearray()
+    out += bytes([len(block) + 1]) + block
+    return bytes(out)
+
+
+def feed_all(framer, data, chunk_size):
+    frames = []
+    for offset in range(0, len(data), chunk_size):
+        frames += framer.feed(data[offset:offset + chunk_size])
+    return frames
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 4096])
+def test_lf_strips_cr_at_any_chunk_boundary(chunk_size):
+    data = b"one\r\ntwo\nthree\r\n\r\nfour"
+    framer = make_framer("LF")
+    assert feed_all(framer, data, chunk_size) == [b"one", b"two", b"three", b""]
+    assert framer.flush() == [b"four"]
+    assert framer.pending() == 0
+
+
+def test_all_crlf_block_splits_like_replace_path():
+    data = b"".join(f"line {i}\r\n".encode() for i in range(100))
+    assert make_framer("LF").feed(data) == [f"line {i}".encode() for i in range(100)]
+
+
+def test_lone_cr_inside_line_is_kept():
+    assert make_framer("LF").feed(b"a\rb\r\nc\n") == [b"a\rb", b"c"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_multibyte_delimiter_split_across_chunks(chunk_size):
+    framer = make_framer("CRLF")
+    assert feed_all(framer, b"ab\r\ncd\r\n\r\nef", chunk_size) == [b"ab", b"cd", b""]
+    assert framer.flush() == [b"ef"]
+
+
+def test_nul_and_cr_delimiters():
+    assert make_framer("NUL").feed(b"a\0b\0c") == [b"a", b"b"]
+    assert make_framer("CR").feed(b"a\rb\r") == [b"a", b"b"]
+
+
+def test_max_frame_size_forces_split():
+    framer = LineFramer(max_frame_size=4)
+    assert framer.feed(b"abcdefghij") == [b"abcd", b"efgh"]
+    assert framer.feed(b"\n") == [b"ij"]
+
+
+def test_fixed_frames_keep_remainder():
+    framer = make_framer("FIXED:3")
+    assert framer.feed(b"abcdefgh") == [b"abc", b"def"]
+    assert framer.feed(b"i") == [b"ghi"]
+
+
+@pytest.mark.parametrize("spec, header", [("LEN:1", lambda n: bytes([n])),
+                                           ("LEN:2", lambda n: n.to_bytes(2, 'little')),
+                                           ("LEN:2:BE", lambda n: n.to_bytes(2, 'big')),
+                                           ("LEN:4", lambda n: n.to_bytes(4, 'little'))])
+def test_length_prefixed(spec, header):
+    payloads = [b"", b"x", b"hello", bytes(range(200))]
+    data = b"".join(header(len(payload)) + payload for payload in payloads)
+    assert feed_all(make_framer(spec), data, 3) == payloads
+
+
+def test_length_prefixed_resyncs_on_oversized_length():
+    framer = LineFramer(mode=LineFramer.MODE_LENGTH, length_size=1, max_frame_size=8)
+    assert framer.feed(b"\xff\x02ab") == [b"ab"]
+
+
+@pytest.mark.parametrize("payload", [b"", b"\0", b"abc", b"a\0b\0\0c", bytes(range(256)), b"x" * 600])
+def test_cobs_round_trip(payload):
+    assert cobs_decode(cobs_encode(payload)) == payload
+    framer = make_framer("COBS")
+    assert feed_all(framer, b"\0" + cobs_encode(payload) + b"\0", 5) == [payload]
+
+
+def test_cobs_broken_frame_is_passed_through_and_counted():
+    framer = make_framer("COBS")
+    assert framer.feed(b"\x05ab\0") == [b"\x05ab"]
+    assert framer.decode_errors == 1
+
+
+def test_slip_unescapes():
+    assert slip_decode(b"a\xdb\xdcb\xdb\xddc") == b"a\xc0b\xdbc"
+    framer = make_framer("SLIP")
+    assert framer.feed(b"\xc0a\xdb\xdc\xc0\xc0b\xc0") == [b"a\xc0", b"b"]
+
+
+def test_invalid_specs():
+    for spec in ("BOGUS", "FIXED:0", "LEN:3"):
+        with pytest.raises(ValueError):
+            make_framer(spec)
@@ -0,0 +1,122 @@
+import re
+import pytest
+from line_store import LineStore
+from log_filter import (BLOCK_LINES, LineIndex, FilteredLines, parse_filter, parse_filter_time, matching_lines,
+                        hit_lines)
+
+BASE_NS = 1_700_000_000 * 1_000_000_000
+
+
+def make_lines(count):
+    lines = []
+    for i in range(count):
+        port = ("COM3", "COM4")[i % 2]
+        if i % 97 == 0:
+            text = f"[{port}] E (1234) spi: transfer timeout addr=0x{i:04x}"
+        elif i % 13 == 0:
+            text = f"[{port}] W sensor{i % 5} temp={i % 40} Warning"
+        elif i % 211 == 0:
+            text = f"[{port}] 한글 메시지 {i}"
+        else:
+            text = f"[{port}] I heartbeat seq={i}"
+        lines.append((BASE_NS + i * 1_000_000, text))
+    return lines
+
+
+def build(count=3 * BLOCK_LINES + 100):
+    store = LineStore()
+    index = LineIndex(store)
+    entries = make_lines(count)
+    for start in range(0, count, 500):
+        store.append_batch(entries[start:start + 500])
+        index.update()
+    return store, index, entries
+
+
+def expected(store, line_filter, label=None):
+    # 색인 없이 줄마다 matches 로 검사한 결과 (빈 저장소 위에 만들면 matches 만 쓸 수 있다)
+    checker = FilteredLines(LineStore(), LineIndex(LineStore()), line_filter, label)
+    if checker.port_rule is False:
+        return []
+    return [seq for seq in range(store.first_seq, store.end_seq) if checker.matches(*store.get(seq))]
+
+
+def test_parse_filter_terms():
+    line_filter = parse_filter('timeout -heartbeat "two words" re:^E -re:x\\d port:COM3 port:COM4')
+    assert [term.pattern for term in line_filter.includes] == ["timeout", "two words", "^E"]
+    assert [term.regex for term in line_filter.includes] == [False, False, True]
+    assert [term.pattern for term in line_filter.excludes] == ["heartbeat", "x\\d"]
+    assert line_filter.ports == ["COM3", "COM4"]
+    assert line_filter.includes[0].key == b"timeout"
+
+
+def test_parse_filter_rejects_bad_regex_and_time():
+    with pytest.raises(ValueError):
+        parse_filter("re:(")
+    with pytest.raises(ValueError):
+        parse_filter("from:25:99")
+
+
+def test_filter_time_units():
+    start = parse_filter_time("2024-05-01T12:30")
+    assert parse_filter_time("2024-05-01T12:30", end=True) - start == 60_000_000_000
+    assert parse_filter_time("2024-05-01T12:30:05.25", end=True) - parse_filter_time("2024-05-01T12:30:05.25") \
+        == 10_000_000
+
+
+@pytest.mark.parametrize("text", ["timeout", "TIMEOUT", "-heartbeat", "warning sensor3", "re:addr=0x0[0-9a-f]{3}",
+                                  "-re:seq=\\d+$", "heartbeat -re:seq=\\d*7$", "한글", "nothing_here",
+                                  "re:^$", "re:$", "spi -re:^\\[COM4\\]"])
+def test_indexed_scan_matches_line_by_line(text):
+    store, index, _ = build()
+    line_filter = parse_filter(text)
+    assert list(FilteredLines(store, index, line_filter).seqs) == expected(store, line_filter)
+
+
+@pytest.mark.parametrize("label", [None, "COM3", "COM5"])
+def test_port_terms(label):
+    store, index, _ = build()
+    line_filter = parse_filter("port:com3 timeout")
+    assert list(FilteredLines(store, index, line_filter, label).seqs) == expected(store, line_filter, label)
+
+
+def test_time_range():
+    store, index, entries = build()
+    line_filter = parse_filter("heartbeat")
+    line_filter.time_from_ns = entries[1500][0]
+    line_filter.time_to_ns = entries[2500][0]
+    seqs = list(FilteredLines(store, index, line_filter).seqs)
+    assert seqs and seqs[0] >= 1500 and seqs[-1] < 2500
+    assert seqs == [seq for seq in expected(store, parse_filter("heartbeat")) if 1500 <= seq < 2500]
+
+
+def test_extend_and_trim_keep_positions():
+    store = LineStore(max_lines=BLOCK_LINES * 2)
+    index = LineIndex(store)
+    view = FilteredLines(store, index, parse_filter("timeout"))
+    entries = make_lines(BLOCK_LINES * 4)
+    for start in range(0, len(entries), 300):
+        batch = entries[start:start + 300]
+        start_seq = store.end_seq
+        store.append_batch(batch)
+        index.update()
+        view.extend(start_seq, batch)
+    assert list(view.seqs[view.head:]) == [seq for seq in range(store.first_seq, store.end_seq)
+                                           if "timeout" in store.get(seq)[1]]
+    first = view.first_seq
+    assert view.position_of(view.seqs[view.head]) == first
+    assert view.get_range(first, 1)[0] == store.get(view.seqs[view.head])
+
+
+def test_matching_lines_edges():
+    text = "a\nbb\n\nccc\n"
+    assert matching_lines(re.compile("^$", re.MULTILINE), text) == [2]
+    assert matching_lines(re.compile("$", re.MULTILINE), text) == [0, 1, 2, 3]
+    assert matching_lines(re.compile("b\nc|c"), text) == [3]
+
+
+def test_hit_lines_reports_each_line_once():
+    store = LineStore()
+    store.append_batch([(None, "xx"), (None, "y"), (None, "x")])
+    data = store.region(0, 3)
+    assert hit_lines(re.compile(b"x"), data, store.line_starts(0, 3)) == [0, 2]
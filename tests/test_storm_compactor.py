@@ -0,0 +1,89 @@
+import pytest
+from storm_compactor import StormCompactor, parse_storm_rule, storm_settings
+
+MS = 1_000_000
+
+
+def feed(compactor, texts, step_ns=MS, start_ns=0, batch=50):
+    shown = []
+    entries = [(start_ns + index * step_ns, text) for index, text in enumerate(texts)]
+    for offset in range(0, len(entries), batch):
+        shown += compactor.process(entries[offset:offset + batch])
+    return shown
+
+
+def test_rate_limits_same_line_and_summarizes():
+    compactor = StormCompactor("exact", rate=10, summary_ms=1000)
+    shown = feed(compactor, ["boom"] * 2000)  # 1 ms 간격으로 2초
+    summaries = [text for _, text in shown if "회 반복" in text]
+    passed = [text for _, text in shown if text == "boom"]
+    assert 15 <= len(passed) <= 35
+    assert summaries
+    shown += compactor.flush(2000 * MS, force=True)
+    total = sum(int(text.split("같은 줄 ")[1].split("회")[0]) for _, text in shown if "회 반복" in text)
+    assert total + len(passed) == 2000
+    assert compactor.passed + compactor.suppressed == 2000
+
+
+def test_distinct_lines_pass_untouched():
+    compactor = StormCompactor("exact", rate=1)
+    texts = [f"line {i}" for i in range(500)]
+    assert [text for _, text in feed(compactor, texts)] == texts
+
+
+def test_normalized_groups_numbers_but_not_names():
+    compactor = StormCompactor("normalized", rate=1, summary_ms=100)
+    texts = [f"uart1 timeout addr=0x{i:04x} retry={i}" for i in range(300)]
+    shown = feed(compactor, texts) + compactor.flush(300 * MS, force=True)
+    assert any("비슷한 줄" in text for _, text in shown)
+    assert all(text.startswith("uart1 ") for _, text in shown)
+    exact = StormCompactor("exact", rate=1)
+    assert len(feed(exact, texts)) == 300
+
+
+def test_untimed_messages_always_pass():
+    compactor = StormCompactor("exact", rate=1)
+    feed(compactor, ["x"] * 100)
+    assert compactor.process([(None, "x"), (None, "x")]) == [(None, "x"), (None, "x")]
+
+
+def test_rule_rate_zero_never_limits():
+    compactor = StormCompactor("exact", rate=1, rules=[parse_storm_rule("0:ASSERT")])
+    assert len(feed(compactor, ["ASSERT failed"] * 200)) == 200
+
+
+def test_summaries_keep_timestamps_ordered():
+    compactor = StormCompactor("exact", rate=5, summary_ms=50)
+    shown = feed(compactor, ["a", "b"] * 1000, step_ns=100_000)
+    shown += compactor.flush(0, force=True)
+    timestamps = [timestamp_ns for timestamp_ns, _ in shown]
+    assert timestamps == sorted(timestamps)
+
+
+def test_lru_bounds_keys_and_flushes_evicted_storm():
+    compactor = StormCompactor("exact", rate=1, max_keys=4)
+    shown = feed(compactor, ["hot"] * 50)
+    shown += feed(compactor, [f"cold {i}" for i in range(10)], start_ns=50 * MS)
+    assert len(compactor.keys) == 4
+    assert compactor.evicted == 7
+    assert any(text.startswith("hot  [") for _, text in shown)
+    assert not compactor.storming
+
+
+def test_bad_settings():
+    with pytest.raises(ValueError):
+        StormCompactor("bogus")
+    with pytest.raises(ValueError):
+        StormCompactor("exact", summary_ms=0)
+    with pytest.raises(ValueError):
+        parse_storm_rule("fast:x")
+    with pytest.raises(ValueError):
+        parse_storm_rule("1:(")
+    with pytest.raises(ValueError):
+        storm_settings({"storm": "exact", "storm_keys": "0"})
+
+
+def test_storm_settings():
+    assert storm_settings({}) is None
+    assert storm_settings({"storm": "off"}) is None
+    assert storm_settings({"storm": "normalized", "storm_file": "1"}) == ("normalized", True)
@@ -0,0 +1,32 @@
+import pytest
+from tx_scheduler import parse_script, parse_duration, is_script
+
+
+def test_parse_duration_units():
+    assert parse_duration("1s") == 1.0
+    assert parse_duration("0.5ms") == pytest.approx(0.0005)
+    assert parse_duration("200us") == pytest.approx(0.0002)
+    assert parse_duration("250") == pytest.approx(0.25)
+
+
+def test_parse_script_steps():
+    script = parse_script("@period 1ms; loop 1000; PING; wait 2ms; send AT+RST; ; STATUS", name="btn")
+    assert is_script("@PING") and not is_script("PING")
+    assert script.period == pytest.approx(0.001)
+    assert script.loops == 1000
+    assert script.name == "btn"
+    assert script.steps == [("send", "PING"), ("wait", pytest.approx(0.002)), ("send", "AT+RST"),
+                            ("send", "STATUS")]
+
+
+def test_parse_script_defaults_and_keyword_case():
+    script = parse_script("WAIT 5; Hello world")
+    assert (script.period, script.loops) == (0.0, 1)
+    assert script.steps == [("wait", pytest.approx(0.005)), ("send", "Hello world")]
+
+
+@pytest.mark.parametrize("text", ["@wait 1ms", "@loop many; PING", "@wait soon; PING", "@loop -1; PING",
+                                  "@period -1ms; PING", "@"])
+def test_parse_script_errors(text):
+    with pytest.raises(ValueError):
+        parse_script(text)
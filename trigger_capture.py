@@ -0,0 +1,273 @@
+import os
+import re
+import datetime
+import threading
+from bisect import bisect_right
+from collections import deque
+from capture_format import (FILE_HEADER, FILE_MAGIC, FILE_VERSION, RECORD_HEADER, INDEX_ENTRY, INDEX_SUFFIX,
+                            export_text)
+from utils import capture_timestamp_ns
+
+TRIGGER_KINDS = ["pattern", "regex", "disconnect", "rate"]  # "manual" 은 구간 저장 버튼이 fire 에 넘기는 이유일 뿐이다
+SEGMENT_SIZE = 1024 * 1024
+
+
+class RawRing:
+    # 최근 원본 바이트를 .ucap 레코드 형식 그대로 segment_size 크기의 bytearray 조각에 쌓는다.
+    # 전체가 capacity 를 넘으면 가장 오래된 조각을 통째로 버린다. 레코드마다 객체를 만들지 않으므로
+    # 메모리 사용량은 capacity + 조각 하나를 넘지 않는다
+    def __init__(self, capacity=16 * 1024 * 1024, segment_size=SEGMENT_SIZE):
+        self.capacity = capacity
+        self.segment_size = segment_size
+        self.lock = threading.Lock()
+        self.segments = deque()  # [첫 시각, 마지막 시각, bytearray]
+        self.size = 0
+        self.evicted_bytes = 0
+
+    def append(self, direction, timestamp_ns, data, source=0):
+        with self.lock:
+            segment = self.segments[-1] if self.segments else None
+            if segment is None or len(segment[2]) >= self.segment_size:
+                segment = [timestamp_ns, timestamp_ns, bytearray()]
+                self.segments.append(segment)
+                while self.size > self.capacity and len(self.segments) > 1:
+                    dropped = len(self.segments.popleft()[2])
+                    self.size -= dropped
+                    self.evicted_bytes += dropped
+            buffer = segment[2]
+            buffer += RECORD_HEADER.pack(direction, 0, source, timestamp_ns, len(data))
+            buffer += data
+            segment[1] = timestamp_ns
+            self.size += RECORD_HEADER.size + len(data)
+
+    def oldest_timestamp(self):
+        with self.lock:
+            return self.segments[0][0] if self.segments else None
+
+    def snapshot(self, start_ns, end_ns):
+        # [start_ns, end_ns] 와 겹치는 조각들의 (첫 시각, 마지막 시각, 바이트). 꽉 찬 조각은 더 바뀌지 않으므로
+        # 쓰고 있는 마지막 조각만 복사한다
+        with self.lock:
+            chunks = [(first, last, buffer) for first, last, buffer in self.segments
+                      if last >= start_ns and first <= end_ns]
+            if chunks and chunks[-1][2] is self.segments[-1][2]:
+                first, last, buffer = chunks[-1]
+                chunks[-1] = (first, last, bytes(buffer))
+        return chunks
+
+
+def iter_records(buffer):
+    # 조각 안 레코드의 (시작 위치, 끝 위치, 시각)
+    offset = 0
+    end = len(buffer)
+    while offset < end:
+        _, _, _, timestamp_ns, length = RECORD_HEADER.unpack_from(buffer, offset)
+        next_offset = offset + RECORD_HEADER.size + length
+        yield offset, next_offset, timestamp_ns
+        offset = next_offset
+
+
+def write_window(path, chunks, start_ns, end_ns):
+    # 조각들에서 시각이 [start_ns, end_ns] 인 레코드만 .ucap 파일로 쓴다.
+    # 창 안에 통째로 들어가는 조각은 그대로 쓰고 양 끝 조각만 레코드 단위로 자른다
+    with open(path, 'wb') as file, open(path + INDEX_SUFFIX, 'wb') as index_file:
+        file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0, start_ns))
+        for first, last, buffer in chunks:
+            view = memoryview(buffer)
+            if first >= start_ns and last <= end_ns:
+                index_file.write(INDEX_ENTRY.pack(first, file.tell()))
+                file.write(view)
+                continue
+            wrote_index = False
+            for begin, end, timestamp_ns in iter_records(buffer):
+                if timestamp_ns > end_ns:
+                    break
+                if timestamp_ns < start_ns:
+                    continue
+                if not wrote_index:
+                    index_file.write(INDEX_ENTRY.pack(timestamp_ns, file.tell()))
+                    wrote_index = True
+                file.write(view[begin:end])
+
+
+def entry_at(entries, position):
+    # "\n" 으로 이은 줄 묶음 안의 위치가 몇 번째 줄인지. 프레이밍에 따라 줄 안에도 "\n" 이 있을 수 있으므로
+    # 개행을 세지 않고 줄 길이로 시작 위치를 센다 (트리거가 걸렸을 때만 부른다)
+    starts = []
+    offset = 0
+    for _, line in entries:
+        starts.append(offset)
+        offset += len(line) + 1
+    return bisect_right(starts, position) - 1
+
+
+class TriggerRule:
+    # setup.txt 의 TRIG 줄 하나 (또는 명령줄 --trigger)
+    #   TRIG:pattern:Guru Meditation    글자 그대로 포함
+    #   TRIG:regex:panic|assert failed  정규식
+    #   TRIG:disconnect                 포트 연결 끊김
+    #   TRIG:rate:5000                  1초 동안 들어온 줄 수가 지정한 값을 넘음
+    def __init__(self, kind, argument=""):
+        if kind not in TRIGGER_KINDS:
+            raise ValueError(f"알 수 없는 트리거 종류 '{kind}' ({', '.join(TRIGGER_KINDS)})")
+        self.kind = kind
+        self.argument = argument
+        self.name = f"{kind}:{argument}" if argument else kind
+        self.needle = None
+        self.rx = None
+        self.rate = None
+        if kind == "pattern":
+            if not argument:
+                raise ValueError("pattern 트리거에 찾을 글자가 없습니다")
+            self.needle = argument
+        elif kind == "regex":
+            try:
+                self.rx = re.compile(argument, re.MULTILINE)
+            except re.error as e:
+                raise ValueError(f"잘못된 트리거 정규식 '{argument}': {e}")
+        elif kind == "rate":
+            try:
+                self.rate = float(argument)
+            except ValueError:
+                raise ValueError(f"rate 트리거에는 초당 줄 수가 필요합니다: '{argument}'")
+
+
+def parse_trigger(text):
+    kind, _, argument = text.partition(":")
+    return TriggerRule(kind.strip(), argument)
+
+
+class TriggerCapture:
+    # 포트 하나의 원본 바이트를 RawRing 에 늘 기록해 두다가 트리거가 걸리면
+    # 앞 pre_seconds 와 뒤 post_seconds 를 .ucap (와 텍스트 .log) 파일로 저장한다.
+    # 저장을 기다리는 동안 다시 걸린 트리거는 같은 파일에 포함되므로 파일을 새로 만들지 않는다
+    def __init__(self, label, source=0, on_event=None, send_command=None):
+        self.label = label
+        self.source = source
+        self.on_event = on_event  # 안내 메시지를 받는 함수
+        self.send_command = send_command  # 트리거 때 보낼 명령을 포트로 쓰는 함수
+        self.ring = RawRing()
+        self.set_rules([])
+        self.pre_seconds = 30.0
+        self.post_seconds = 10.0
+        self.command = ""
+        self.out_dir = os.getcwd()
+        self.framing = "LF"
+        self.display = "text"
+        self.precision = "ms"
+        self.lock = threading.Lock()
+        self.pending = None  # [트리거 시각, 시작, 끝, 이유, 걸린 횟수]
+        self.timer = None
+        self.rate_second = None
+        self.rate_count = 0
+        self.rate_fired = False
+        self.triggers = 0
+        self.files = []
+        self.error = None
+
+    def configure(self, options):
+        # setup.txt 의 OPT: 항목이나 명령줄 인자로 받은 값을 반영한다
+        self.ring.capacity = int(float(options.get("trigger_ring_mb", self.ring.capacity / 1048576)) * 1048576)
+        self.pre_seconds = float(options.get("trigger_pre_s", self.pre_seconds))
+        self.post_seconds = float(options.get("trigger_post_s", self.post_seconds))
+        self.command = options.get("trigger_command", self.command)
+
+    def set_rules(self, rules):
+        self.rules = list(rules)
+        self.text_rules = [rule for rule in self.rules if rule.needle is not None or rule.rx is not None]
+        self.rate_rules = [rule for rule in self.rules if rule.rate is not None]
+        self.disconnect_rules = [rule for rule in self.rules if rule.kind == "disconnect"]
+
+    def record(self, direction, timestamp_ns, data):
+        self.ring.append(direction, timestamp_ns, data, self.source)
+
+    def check_lines(self, entries):
+        # 읽기 스레드에서 한 번 읽은 줄 묶음마다 부른다. 묶음을 한 문자열로 이어서 규칙마다 한 번만 찾는다
+        if not self.rules or not entries:
+            return
+        if self.text_rules:
+            text = "\n".join(line for _, line in entries)
+            for rule in self.text_rules:
+                if rule.needle is not None:
+                    position = text.find(rule.needle)
+                else:
+                    match = rule.rx.search(text)
+                    position = -1 if match is None else match.start()
+                if position >= 0:
+                    self.fire(rule.name, entries[entry_at(entries, position)][0])
+        if self.rate_rules:
+            timestamp_ns = entries[-1][0]
+            second = timestamp_ns // 1_000_000_000
+            if second != self.rate_second:
+                self.rate_second = second
+                self.rate_count = 0
+                self.rate_fired = False
+            self.rate_count += len(entries)
+            if not self.rate_fired:
+                for rule in self.rate_rules:
+                    if self.rate_count > rule.rate:
+                        self.rate_fired = True
+                        self.fire(rule.name, timestamp_ns)
+                        break
+
+    def on_disconnect(self):
+        if self.disconnect_rules:
+            self.fire("disconnect")
+
+    def fire(self, reason, timestamp_ns=None):
+        if timestamp_ns is None:
+            timestamp_ns = capture_timestamp_ns()
+        with self.lock:
+            self.triggers += 1
+            pending = self.pending
+            if pending is not None and timestamp_ns <= pending[2]:
+                pending[4] += 1
+                return
+            end_ns = timestamp_ns + int(self.post_seconds * 1e9)
+            self.pending = [timestamp_ns, timestamp_ns - int(self.pre_seconds * 1e9), end_ns, reason, 1]
+            # 읽기 스레드가 마지막 청크를 넘겨줄 때까지 조금 더 기다린다
+            self.timer = threading.Timer(self.post_seconds + 0.2, self.dump)
+            self.timer.daemon = True
+            self.timer.start()
+        self.notify(f"트리거 [{reason}]: 앞 {self.pre_seconds:g}초, 뒤 {self.post_seconds:g}초를 저장합니다")
+        if self.command and self.send_command is not None:
+            self.send_command(self.command)
+
+    def dump(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = None
+            self.timer = None
+        if pending is None:
+            return None
+        fired_ns, start_ns, end_ns, reason, hits = pending
+        oldest = self.ring.oldest_timestamp()
+        tag = re.sub(r'[^0-9A-Za-z]+', '_', reason).strip('_')[:32]
+        moment = datetime.datetime.fromtimestamp(fired_ns / 1e9).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.out_dir, f"{self.label}_trigger_{moment}_{tag}.ucap")
+        try:
+            write_window(path, self.ring.snapshot(start_ns, end_ns), start_ns, end_ns)
+            export_text(path, os.path.splitext(path)[0] + ".log", framing=self.framing, precision=self.precision,
+                        display=self.display)
+        except Exception as e:
+            self.error = str(e)
+            self.notify(f"트리거 저장 오류: {e}")
+            return None
+        self.files.append(path)
+        note = ""
+        if oldest and oldest > start_ns and self.ring.evicted_bytes:
+            note = f" (링 버퍼가 작아서 앞 {(oldest - start_ns) / 1e9:.1f}초는 없음)"
+        self.notify(f"트리거 [{reason}] {hits}회 -> {path}{note}")
+        return path
+
+    def close(self):
+        # 저장을 기다리던 창은 지금까지 받은 것만으로 저장한다
+        with self.lock:
+            timer = self.timer
+        if timer is not None:
+            timer.cancel()
+            self.dump()
+
+    def notify(self, message):
+        if self.on_event is not None:
+            self.on_event(message)
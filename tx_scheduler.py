@@ -0,0 +1,277 @@
+import time
+import queue
+import threading
+from utils import capture_timestamp_ns
+
+SCRIPT_PREFIX = "@"
+SPIN_SECONDS = 0.002  # 예정 시각까지 이만큼 남으면 sleep 대신 바쁜 대기로 맞춘다
+STATS_WINDOW = 1.0
+
+
+class TxScript:
+    def __init__(self, steps, period=0.0, loops=1, name=""):
+        self.steps = steps  # ("send", 명령) 또는 ("wait", 초)
+        self.period = period  # 0 이면 한 바퀴가 끝나는 대로 다음 바퀴를 시작한다
+        self.loops = loops  # 0 이면 멈출 때까지 반복
+        self.name = name
+
+
+def is_script(text):
+    return text.startswith(SCRIPT_PREFIX)
+
+
+def parse_duration(value):
+    # "0.5ms", "200us", "1s" 또는 단위 없는 밀리초
+    value = value.strip().lower()
+    for suffix, scale in (("us", 1e-6), ("ms", 1e-3), ("s", 1.0)):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * scale
+    return float(value) * 1e-3
+
+
+def parse_script(text, name=""):
+    # setup.txt 버튼 값이 @ 로 시작하면 스크립트: 단계는 ; 로 나눈다
+    #   period <시간>  한 바퀴의 시작 간격     loop <횟수>  반복 횟수 (0 은 무한)
+    #   wait <시간>    다음 단계까지 대기       send <명령> 또는 그냥 <명령>  전송
+    # 예) 05:@period 1ms; loop 1000; PING
+    body = text[len(SCRIPT_PREFIX):] if is_script(text) else text
+    steps = []
+    period = 0.0
+    loops = 1
+    for part in body.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        keyword, _, argument = part.partition(' ')
+        keyword = keyword.lower()
+        try:
+            if keyword == "wait":
+                steps.append(("wait", parse_duration(argument)))
+            elif keyword == "period":
+                period = parse_duration(argument)
+            elif keyword == "loop":
+                loops = int(argument)
+            elif keyword == "send":
+                steps.append(("send", argument))
+            else:
+                steps.append(("send", part))
+        except ValueError:
+            raise ValueError(f"스크립트 단계를 해석할 수 없습니다: {part}")
+    if not any(kind == "send" for kind, _ in steps):
+        raise ValueError("스크립트에 보낼 명령이 없습니다")
+    if period < 0 or loops < 0:
+        raise ValueError("period 와 loop 는 0 이상이어야 합니다")
+    return TxScript(steps, period, loops, name)
+
+
+class ScriptRun:
+    def __init__(self, script, now):
+        self.script = script
+        self.index = 0
+        self.loops_done = 0
+        self.cycle_start = now
+        self.next_time = now
+        self.finished = False
+
+
+class TxScheduler:
+    # 명령 전송 전용 스레드. 스크립트는 perf_counter 기준의 절대 시각으로 예약해서 오차가 쌓이지 않게 하고,
+    # 같은 시점에 보낼 명령은 한 번의 write 로 묶는다. 포트 출력 버퍼가 차 있으면 버리지 않고 비워질 때까지 기다린다.
+    def __init__(self, get_handler, on_sent=None, on_error=None, max_out_waiting=4096, line_ending=b'\n'):
+        self.get_handler = get_handler
+        self.on_sent = on_sent  # (전송 시각 ns, [명령들])
+        self.on_error = on_error  # (메시지)
+        self.max_out_waiting = max_out_waiting
+        self.line_ending = line_ending
+        self.commands = queue.Queue()
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        self.next_script = None
+        self.cancel_script = False
+        self.current = None
+        self.running = False
+        self.thread = None
+
+        self.commands_sent = 0
+        self.bytes_sent = 0
+        self.writes = 0
+        self.overruns = 0  # 한 주기 이상 늦어서 일정을 다시 잡은 횟수
+        self.backpressure_waits = 0
+        self.script_loops = 0
+        self.window_started = time.perf_counter()
+        self.window_commands = 0
+        self.window_late_sum = 0.0
+        self.window_late_max = 0.0
+        self.window_late_count = 0
+        self.rate = 0.0
+        self.jitter_avg = 0.0
+        self.jitter_max = 0.0
+        self.window_ended = self.window_started
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="tx-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def submit(self, command):
+        self.commands.put(command)
+        self.wake.set()
+
+    def run_script(self, script):
+        with self.lock:
+            self.next_script = script
+            self.cancel_script = False
+        self.wake.set()
+
+    def stop_script(self):
+        with self.lock:
+            self.next_script = None
+            self.cancel_script = True
+        self.wake.set()
+
+    def is_script_running(self):
+        return self.current is not None or self.next_script is not None
+
+    def stats(self):
+        stale = time.perf_counter() - self.window_ended > 2 * STATS_WINDOW
+        return {
+            "commands": self.commands_sent,
+            "bytes": self.bytes_sent,
+            "writes": self.writes,
+            "rate": 0.0 if stale else self.rate,
+            "jitter_avg_us": 0.0 if stale else self.jitter_avg * 1e6,
+            "jitter_max_us": 0.0 if stale else self.jitter_max * 1e6,
+            "overruns": self.overruns,
+            "backpressure_waits": self.backpressure_waits,
+            "script_loops": self.script_loops,
+            "script_running": self.is_script_running(),
+        }
+
+    def run(self):
+        while self.running:
+            self._switch_script()
+            batch = []
+            while True:
+                try:
+                    batch.append(self.commands.get_nowait())
+                except queue.Empty:
+                    break
+            due = None
+            run = self.current
+            if run is not None:
+                now = time.perf_counter()
+                if run.next_time <= now:
+                    due = run.next_time
+                    self._collect(run, now, batch)
+                    if run.finished:
+                        self.current = None
+            if batch:
+                self._send(batch, due)
+                continue
+            if run is not None and not run.finished:
+                self._sleep_until(run.next_time)
+            else:
+                self.wake.wait()
+                self.wake.clear()
+
+    def _switch_script(self):
+        with self.lock:
+            if self.cancel_script:
+                self.current = None
+                self.cancel_script = False
+            if self.next_script is not None:
+                self.current = ScriptRun(self.next_script, time.perf_counter())
+                self.next_script = None
+                self.script_loops = 0
+
+    def _collect(self, run, now, batch):
+        # 예정 시각이 지난 단계들을 모은다. 한 바퀴가 끝나면 다음 바퀴는 다음 write 로 넘긴다
+        steps = run.script.steps
+        while run.next_time <= now:
+            kind, value = steps[run.index]
+            run.index += 1
+            if kind == "send":
+                batch.append(value)
+            else:
+                run.next_time += value
+            if run.index < len(steps):
+                continue
+            run.index = 0
+            run.loops_done += 1
+            self.script_loops = run.loops_done
+            if run.script.loops and run.loops_done >= run.script.loops:
+                run.finished = True
+                return
+            if run.script.period:
+                run.cycle_start += run.script.period
+                if run.cycle_start < now - run.script.period:
+                    # 한 주기 넘게 밀렸으면 몰아서 보내지 않고 지금부터 다시 맞춘다
+                    self.overruns += 1
+                    run.cycle_start = now
+                run.next_time = run.cycle_start
+            elif run.next_time < now:
+                # 주기가 없으면 앞 바퀴를 보낸 직후부터 다음 바퀴를 센다
+                run.next_time = now
+            return
+
+    def _sleep_until(self, deadline):
+        while self.running:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            if remaining > SPIN_SECONDS:
+                # 새 명령이나 스크립트 변경이 오면 바로 깨어난다
+                if self.wake.wait(remaining - SPIN_SECONDS):
+                    self.wake.clear()
+                    return
+            else:
+                time.sleep(0)
+
+    def _send(self, batch, due):
+        handler = self.get_handler()
+        while self.running and handler.out_waiting() > self.max_out_waiting:
+            self.backpressure_waits += 1
+            time.sleep(0.0002)
+        # 문자열 명령은 줄 끝을 붙이고, bytes (hex/escape 입력) 는 그대로 보낸다
+        data = b''.join(command if isinstance(command, bytes)
+                        else command.encode('utf-8', errors='replace') + self.line_ending for command in batch)
+        success, message = handler.write_bytes(data)
+        sent_at = time.perf_counter()
+        if not success:
+            with self.lock:
+                self.current = None
+            if self.on_error:
+                self.on_error(message)
+            return
+        self.commands_sent += len(batch)
+        self.bytes_sent += len(data)
+        self.writes += 1
+        self.window_commands += len(batch)
+        if due is not None:
+            late = sent_at - due
+            self.window_late_sum += late
+            self.window_late_count += 1
+            if late > self.window_late_max:
+                self.window_late_max = late
+        if sent_at - self.window_started >= STATS_WINDOW:
+            elapsed = sent_at - self.window_started
+            self.rate = self.window_commands / elapsed
+            self.jitter_avg = self.window_late_sum / self.window_late_count if self.window_late_count else 0.0
+            self.jitter_max = self.window_late_max
+            self.window_started = sent_at
+            self.window_ended = sent_at
+            self.window_commands = 0
+            self.window_late_sum = 0.0
+            self.window_late_max = 0.0
+            self.window_late_count = 0
+        if self.on_sent:
+            self.on_sent(capture_timestamp_ns(), batch)
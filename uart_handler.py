@@ -1,13 +1,34 @@
+import os
+import select
 import serial
 import serial.tools.list_ports
-from collections import deque
+from line_framer import LineFramer
+from utils import capture_timestamp_ns
+from capture_format import DIRECTION_RX, DIRECTION_TX
+from byte_format import decode_text, make_decoder
 
 class UARTHandler:
     def __init__(self):
         self.serial = None
-        self.read_buffer = bytearray()
-        self.write_buffer = deque()
-        self.max_write_buffer = 1000  # 최대 쓰기 버퍼 크기
+        self.framer = LineFramer()
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.lines_read = 0
+        self.raw_listeners = []  # (방향, 시각, 원본 바이트) 를 받는 함수들
+        self.decode_frames = decode_text  # 프레임 목록 -> 화면에 보일 문자열 목록 (텍스트 또는 hex)
+        self.read_timeout = 1.0  # 데이터가 없을 때 읽기 스레드가 깨어나는 간격
+        self.read_chunk_size = 64 * 1024
+        self.read_fd = None
+        self.wake_r = None
+        self.wake_w = None
+
+    def add_raw_listener(self, listener):
+        if listener not in self.raw_listeners:
+            self.raw_listeners.append(listener)
+
+    def remove_raw_listener(self, listener):
+        if listener in self.raw_listeners:
+            self.raw_listeners.remove(listener)
 
     def get_ports(self):
         try:
@@ -17,55 +38,131 @@ class UARTHandler:
 
     def connect(self, port, baud):
         try:
-            self.serial = serial.Serial(port, baud, timeout=1)
-            return True, "연결 성공"
+            # serial_for_url 은 일반 포트 이름과 loop://, socket:// 같은 URL 을 모두 받는다
+            self.serial = serial.serial_for_url(port, baud, timeout=self.read_timeout)
         except serial.SerialException as e:
             return False, str(e)
+        if hasattr(self.serial, 'set_buffer_size'):
+            try:
+                # Windows 드라이버 수신 버퍼를 키워서 빠른 속도에서도 넘치지 않게 한다
+                self.serial.set_buffer_size(rx_size=1024 * 1024)
+            except Exception:
+                pass
+        self.read_fd = None
+        if os.name == 'posix':
+            try:
+                self.read_fd = self.serial.fileno()
+            except Exception:
+                pass  # loop://, socket:// 같은 URL 포트
+        if self.read_fd is not None and self.wake_r is None:
+            self.wake_r, self.wake_w = os.pipe()
+        return True, "연결 성공"
+
+    def set_framer(self, framer):
+        self.framer = framer
+
+    def set_display_mode(self, mode):
+        # 읽기 스레드는 다음 청크부터 새 방식으로 바꾼다
+        self.decode_frames = make_decoder(mode)
 
     def disconnect(self):
-        if self.serial and self.serial.is_open:
+        serial_port = self.serial
+        # 읽기 스레드가 사용자가 끊은 것과 장치가 빠진 것을 구분할 수 있게 먼저 비운다
+        self.serial = None
+        if serial_port and serial_port.is_open:
+            self.cancel_read()
+            try:
+                serial_port.cancel_read()
+            except Exception:
+                pass
             try:
-                self.serial.close()
+                serial_port.close()
             except:
                 pass
-        self.serial = None
+        self.framer.reset()
 
     def is_connected(self):
         return self.serial and self.serial.is_open
 
-    def read_data(self):
-        if self.is_connected():
+    def cancel_read(self):
+        # 데이터를 기다리며 잠들어 있는 읽기 스레드를 바로 깨운다
+        if self.wake_w is not None:
             try:
-                data = self.serial.read(self.serial.in_waiting or 1)
-                if data:
-                    self.read_buffer += data
-                    if b'\n' in self.read_buffer:
-                        lines = self.read_buffer.split(b'\n')
-                        self.read_buffer = lines[-1]
-                        return b'\n'.join(lines[:-1]).decode('utf-8', errors='replace').strip()
-            except (serial.SerialException, OSError) as e:
-                self.disconnect()
-                return "COM_PORT_DISCONNECTED"
+                os.write(self.wake_w, b'x')
+            except OSError:
+                pass
+
+    def _wait_and_read(self, serial_port, fd):
+        if fd is not None:
+            # POSIX: 포트 fd 와 깨우기용 파이프를 select 로 기다렸다가 쌓인 만큼 한 번에 읽는다
+            ready, _, _ = select.select([fd, self.wake_r], [], [], self.read_timeout)
+            if self.wake_r in ready:
+                os.read(self.wake_r, 1024)
+            if fd not in ready:
+                return b''
+            try:
+                data = os.read(fd, self.read_chunk_size)
+            except BlockingIOError:
+                return b''
+            if not data:
+                raise serial.SerialException("장치가 응답하지 않습니다")
+            return data
+        # 그 밖의 포트(Windows, loop:// 등): 첫 바이트가 올 때까지 드라이버 안에서 기다리고 나머지는 한 번에 읽는다
+        data = serial_port.read(1)
+        if data:
+            waiting = serial_port.in_waiting
+            if waiting:
+                data += serial_port.read(min(waiting, self.read_chunk_size))
+        return data
+
+    def read_data(self):
+        serial_port = self.serial
+        if not (serial_port and serial_port.is_open):
+            return None
+        try:
+            data = self._wait_and_read(serial_port, self.read_fd)
+        except (serial.SerialException, OSError, TypeError, AttributeError):
+            if self.serial is not serial_port:
+                return None  # 사용자가 연결을 끊는 중이었다
+            self.disconnect()
+            return "COM_PORT_DISCONNECTED"
+        if data:
+            # 구분자가 도착한 청크를 읽은 시점을 각 줄의 수신 시각으로 쓴다
+            timestamp_ns = capture_timestamp_ns()
+            self.bytes_read += len(data)
+            for listener in self.raw_listeners:
+                listener(DIRECTION_RX, timestamp_ns, data)
+            frames = self.framer.feed(data)
+            if frames:
+                self.lines_read += len(frames)
+                return [(timestamp_ns, text) for text in self.decode_frames(frames)]
         return None
 
     def write_data(self, data):
-        if self.is_connected():
-            try:
-                encoded_data = data.encode('utf-8', errors='replace') + b'\n'
-                self.write_buffer.append(encoded_data)
-                if len(self.write_buffer) > self.max_write_buffer:
-                    self.write_buffer.popleft()
-                self.flush_write_buffer()
-                return True, "데이터 전송 성공"
-            except (serial.SerialException, OSError) as e:
-                self.disconnect()
-                return False, "COM_PORT_DISCONNECTED"
-        return False, "연결되지 않음"
+        return self.write_bytes(data.encode('utf-8', errors='replace') + b'\n')
 
-    def flush_write_buffer(self):
-        while self.write_buffer:
-            try:
-                self.serial.write(self.write_buffer.popleft())
-            except (serial.SerialException, OSError):
-                self.disconnect()
-                break
+    def write_bytes(self, data):
+        # 버퍼에 쌓아 두고 오래된 것을 버리는 대신 바로 쓴다. 흐름 조절은 out_waiting 을 보는 쪽에서 한다
+        serial_port = self.serial
+        if not (serial_port and serial_port.is_open):
+            return False, "연결되지 않음"
+        try:
+            serial_port.write(data)
+        except (serial.SerialException, OSError, TypeError, AttributeError):
+            if self.serial is not serial_port:
+                return False, "연결되지 않음"  # 쓰는 도중에 사용자가 연결을 끊었다
+            self.disconnect()
+            return False, "COM_PORT_DISCONNECTED"
+        self.bytes_written += len(data)
+        if self.raw_listeners:
+            timestamp_ns = capture_timestamp_ns()
+            for listener in self.raw_listeners:
+                listener(DIRECTION_TX, timestamp_ns, data)
+        return True, "데이터 전송 성공"
+
+    def out_waiting(self):
+        # 아직 포트로 나가지 못하고 OS 출력 버퍼에 남아 있는 바이트 수
+        try:
+            return self.serial.out_waiting
+        except Exception:
+            return 0
@@ -1,8 +1,13 @@
+import os
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+import tkinter.font as tkfont
+from tkinter import ttk
+from line_framer import FRAMING_OPTIONS
+from utils import TIMESTAMP_PRECISIONS
+from byte_format import DISPLAY_MODES, TX_MODES
 
 class TopFrame:
-    def __init__(self, parent, refresh_ports, toggle_connection, toggle_prevent_sleep):
+    def __init__(self, parent, refresh_ports, toggle_connection, toggle_prevent_sleep, change_display_mode):
         self.frame = ttk.Frame(parent)
         self.frame.pack(fill=tk.X, padx=5, pady=5)
 
@@ -17,6 +22,17 @@ class TopFrame:
         self.baud_combo.set(115200)
         self.baud_combo.pack(side=tk.LEFT, padx=(0, 5))
 
+        ttk.Label(self.frame, text="구분자:").pack(side=tk.LEFT, padx=(0, 5))
+        self.framing_combo = ttk.Combobox(self.frame, values=FRAMING_OPTIONS, width=8)
+        self.framing_combo.set(FRAMING_OPTIONS[0])
+        self.framing_combo.pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Label(self.frame, text="표시:").pack(side=tk.LEFT, padx=(0, 5))
+        self.display_combo = ttk.Combobox(self.frame, values=DISPLAY_MODES, width=5, state="readonly")
+        self.display_combo.set(DISPLAY_MODES[0])
+        self.display_combo.bind("<<ComboboxSelected>>", change_display_mode)
+        self.display_combo.pack(side=tk.LEFT, padx=(0, 5))
+
         self.connect_button = ttk.Button(self.frame, text="연결", command=toggle_connection)
         self.connect_button.pack(side=tk.LEFT, padx=(0, 5))
 
@@ -27,7 +43,8 @@ class TopFrame:
         self.prevent_sleep_check.pack(side=tk.LEFT)
 
 class LogFrame:
-    def __init__(self, parent, change_log_path, toggle_logging, clear_log, update_log_color):
+    def __init__(self, parent, change_log_path, toggle_logging, clear_log, update_log_color, change_timestamp_precision,
+                 open_search, open_stats, apply_filter, open_plot, manual_trigger):
         self.frame = ttk.Frame(parent)
         self.frame.pack(fill=tk.X, padx=5, pady=5)
 
@@ -44,9 +61,17 @@ class LogFrame:
         self.save_button = ttk.Button(self.frame, text="저장 시작", command=toggle_logging)
         self.save_button.pack(side=tk.LEFT, padx=(5, 0))
 
+        self.raw_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.frame, text="원본(.ucap)", variable=self.raw_var).pack(side=tk.LEFT, padx=(5, 0))
+
         self.clear_log_button = tk.Button(self.frame, text="Log Clear", command=clear_log)
         self.clear_log_button.pack(side=tk.LEFT, padx=(5, 0))
 
+        ttk.Button(self.frame, text="검색", command=open_search).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(self.frame, text="통계", command=open_stats).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(self.frame, text="그래프", command=open_plot).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(self.frame, text="구간 저장", command=manual_trigger).pack(side=tk.LEFT, padx=(5, 0))
+
         self.color_var = tk.StringVar(value="off")
         self.color_check = tk.Checkbutton(self.frame, text="Color", variable=self.color_var, 
                                           onvalue="on", offvalue="off", command=update_log_color)
@@ -55,20 +80,214 @@ class LogFrame:
         self.color_entry = tk.Entry(self.frame)
         self.color_entry.pack(side=tk.LEFT, padx=(0, 5))
 
+        ttk.Label(self.frame, text="시간 단위:").pack(side=tk.LEFT, padx=(5, 5))
+        self.precision_combo = ttk.Combobox(self.frame, values=TIMESTAMP_PRECISIONS, width=4, state="readonly")
+        self.precision_combo.set(TIMESTAMP_PRECISIONS[0])
+        self.precision_combo.bind("<<ComboboxSelected>>", change_timestamp_precision)
+        self.precision_combo.pack(side=tk.LEFT)
+
+        self.filter_frame = ttk.Frame(parent)
+        self.filter_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(self.filter_frame, text="필터:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_entry = ttk.Entry(self.filter_frame, width=60)
+        self.filter_entry.pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_entry.bind("<Return>", apply_filter)
+        ttk.Button(self.filter_frame, text="적용", command=apply_filter).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Label(self.filter_frame, text="단어  -제외  re:정규식  port:포트  from:12:30 to:12:31",
+                  foreground="gray").pack(side=tk.LEFT, padx=(5, 0))
+        self.filter_status = ttk.Label(self.filter_frame, text="")
+        self.filter_status.pack(side=tk.RIGHT)
+
 class LogDisplay:
+    # LineStore 의 전체 기록 중 화면에 보이는 줄만 Text 위젯에 그리는 가상 스크롤 뷰.
+    # 필터가 켜지면 같은 방식으로 FilteredLines 를 읽는다 (top_seq 는 그 안의 위치)
     def __init__(self, parent):
-        self.log_text = scrolledtext.ScrolledText(parent, tabs=("1c", "2c", "3c", "4c"))
-        self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.log_text = tk.Text(self.frame, tabs=("1c", "2c", "3c", "4c"))
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
 
         self.auto_scroll_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(parent, text="자동 스크롤", variable=self.auto_scroll_var).pack(anchor=tk.W, padx=5)
+        ttk.Checkbutton(parent, text="자동 스크롤", variable=self.auto_scroll_var,
+                        command=self.on_auto_scroll).pack(anchor=tk.W, padx=5)
+
+        self.store = None
+        self.lines = None  # store 또는 필터 결과
+        self.format_entry = None
+        self.top_seq = 0
+        self.follow_tail = True
+        self.rendered_key = None
+        self.highlight_engine = None
+        self.marked_seq = None
+        self.line_height = max(1, tkfont.Font(font=self.log_text.cget("font")).metrics("linespace"))
+        self.rows = 1
+
+        self.log_text.bind("<Configure>", self.on_configure)
+        self.log_text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.log_text.bind("<Button-4>", lambda event: self.scroll_lines(-3))
+        self.log_text.bind("<Button-5>", lambda event: self.scroll_lines(3))
+        self.log_text.bind("<Prior>", lambda event: self.scroll_lines(-self.rows))
+        self.log_text.bind("<Next>", lambda event: self.scroll_lines(self.rows))
+        self.log_text.bind("<Map>", lambda event: self.refresh(force=True))
+
+    def attach(self, store, format_entry, highlight_engine=None):
+        self.store = store
+        self.lines = store
+        self.format_entry = format_entry
+        self.highlight_engine = highlight_engine
+        self.refresh(force=True)
+
+    def set_view(self, view):
+        self.lines = view if view is not None else self.store
+        self.marked_seq = None
+        self.follow_tail = True
+        self.refresh(force=True)
+
+    def on_configure(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh(force=True)
+
+    def on_auto_scroll(self):
+        if self.auto_scroll_var.get():
+            self.follow_tail = True
+            self.refresh()
+
+    def on_mouse_wheel(self, event):
+        self.scroll_lines(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def scroll_lines(self, count):
+        if self.lines is None:
+            return "break"
+        self.scroll_to(self.top_seq + count)
+        return "break"
+
+    def scroll_to(self, top_seq):
+        store = self.lines
+        last_top = max(store.first_seq, store.end_seq - self.rows)
+        self.top_seq = min(max(top_seq, store.first_seq), last_top)
+        self.follow_tail = self.top_seq >= last_top
+        self.refresh()
+
+    def show_line(self, seq):
+        # 검색 결과로 이동할 때 해당 줄을 가운데에 두고 표시한다. 필터에 가려진 줄이면 False
+        if self.lines is not self.store:
+            seq = self.lines.position_of(seq)
+            if seq is None:
+                return False
+        self.marked_seq = seq
+        self.follow_tail = False
+        self.top_seq = seq - self.rows // 2
+        self.refresh(force=True)
+        return True
+
+    def yview(self, *args):
+        if self.lines is None or not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(self.lines.first_seq + int(float(args[1]) * len(self.lines)))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll_lines(int(args[1]) * step)
+
+    def refresh(self, force=False):
+        store = self.lines
+        if store is None:
+            return
+        if not force and not self.log_text.winfo_ismapped():
+            # 다른 탭에 가려져 있으면 그리지 않고 다시 보일 때(<Map>) 그린다
+            return
+        last_top = max(store.first_seq, store.end_seq - self.rows)
+        if self.follow_tail and self.auto_scroll_var.get():
+            self.top_seq = last_top
+        else:
+            self.top_seq = min(max(self.top_seq, store.first_seq), last_top)
+
+        total = len(store)
+        if total:
+            first = (self.top_seq - store.first_seq) / total
+            self.scrollbar.set(first, min(1.0, first + self.rows / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        key = (self.top_seq, min(store.end_seq, self.top_seq + self.rows))
+        if not force and key == self.rendered_key:
+            return
+        self.rendered_key = key
+
+        entries = store.get_range(self.top_seq, self.rows)
+        lines = [self.format_entry(timestamp_ns, text) for timestamp_ns, text in entries]
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete("1.0", tk.END)
+        self.log_text.insert("1.0", "\n".join(lines))
+        if self.highlight_engine is not None:
+            self.apply_highlight(entries, lines)
+        if self.marked_seq is not None and self.top_seq <= self.marked_seq < self.top_seq + len(entries):
+            row = self.marked_seq - self.top_seq + 1
+            self.log_text.tag_add("marked", f"{row}.0", f"{row}.end")
+            self.log_text.tag_config("marked", background="yellow")
+        if self.follow_tail:
+            # 줄바꿈된 줄이 있으면 마지막 줄이 가려질 수 있다
+            self.log_text.see(tk.END)
+        self.log_text.config(state=tk.DISABLED)
+
+    def apply_highlight(self, entries, lines):
+        # 화면에 보이는 줄만 태그를 붙인다. 규칙이 바뀐 뒤의 예전 줄은 보일 때 다시 계산한다
+        engine = self.highlight_engine
+        ranges = {}
+        for row, ((timestamp_ns, text), line) in enumerate(zip(entries, lines), start=1):
+            seq = self.top_seq + row - 1
+            marks, version = self.lines.get_marks(seq)
+            if version != engine.version:
+                marks = engine.match(text)
+                self.lines.set_marks(seq, marks, engine.version)
+            if not marks:
+                continue
+            prefix = len(line) - len(text)
+            for start, end, rule_index in marks:
+                ranges.setdefault(rule_index, []).extend((f"{row}.{prefix + start}", f"{row}.{prefix + end}"))
+        for rule_index, indexes in ranges.items():
+            tag = f"highlight{rule_index}"
+            self.log_text.tag_config(tag, foreground=engine.rules[rule_index].color)
+            self.log_text.tag_add(tag, *indexes)
+
+class LogTabs:
+    # 모든 포트를 시각 순서로 합친 "전체" 탭과 포트별 탭
+    def __init__(self, parent, on_tab_changed):
+        self.notebook = ttk.Notebook(parent)
+        self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    def add_tab(self, title):
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=title)
+        return frame, LogDisplay(frame)
+
+    def set_title(self, frame, title):
+        self.notebook.tab(frame, text=title)
+
+    def select(self, frame):
+        self.notebook.select(frame)
+
+    def selected(self):
+        # 선택된 탭 frame 의 이름 (str(frame) 과 같다)
+        return self.notebook.select()
 
 class CommandFrame:
     def __init__(self, parent, send_command, toggle_repeat):
         self.frame = ttk.Frame(parent)
         self.frame.pack(fill=tk.X, padx=5, pady=5)
 
+        self.tx_mode_combo = ttk.Combobox(self.frame, values=TX_MODES, width=6, state="readonly")
+        self.tx_mode_combo.set(TX_MODES[0])
+        self.tx_mode_combo.pack(side=tk.LEFT, padx=(0, 5))
+
         self.cmd_entry = ttk.Entry(self.frame, width=30)
         self.cmd_entry.pack(side=tk.LEFT, expand=True, fill=tk.X)
         self.cmd_entry.bind("<Return>", send_command)
@@ -86,6 +305,189 @@ class CommandFrame:
 
         ttk.Button(self.frame, text="입력", command=send_command).pack(side=tk.RIGHT, padx=(5, 0))
 
+class StatusBar:
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=(0, 5))
+
+        self.render_label = ttk.Label(self.frame, text="큐: 0  드롭 프레임: 0")
+        self.render_label.pack(side=tk.RIGHT)
+
+        self.writer_label = ttk.Label(self.frame, text="")
+        self.writer_label.pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.tx_label = ttk.Label(self.frame, text="")
+        self.tx_label.pack(side=tk.RIGHT, padx=(0, 10))
+
+    def update_render_stats(self, queue_depth, dropped_frames, batch_size):
+        self.render_label.config(text=f"큐: {queue_depth}  드롭 프레임: {dropped_frames}  배치: {batch_size}")
+
+    def update_writer_stats(self, backlog):
+        if backlog is None:
+            self.writer_label.config(text="")
+            return
+        text = f"저장 대기: {backlog['queued_lines']}줄"
+        if backlog['spilled_lines']:
+            # 디스크가 느려서 큐를 넘친 줄. 버리지 않고 나중에 쓴다
+            text += f"  저장 지연: {backlog['spilled_lines']}줄"
+        if backlog['error']:
+            text += f"  저장 오류: {backlog['error']}"
+        if backlog['pending_compression']:
+            text += f"  압축 대기: {backlog['pending_compression']}"
+        self.writer_label.config(text=text)
+
+    def update_tx_stats(self, stats):
+        if not stats or not stats['commands']:
+            self.tx_label.config(text="")
+            return
+        text = f"전송: {stats['rate']:.0f}/s  지터 평균 {stats['jitter_avg_us']:.0f}us 최대 {stats['jitter_max_us']:.0f}us"
+        if stats['overruns']:
+            text += f"  밀림: {stats['overruns']}"
+        self.tx_label.config(text=text)
+
+class SearchPanel:
+    def __init__(self, parent, default_path, start_search, stop_search, jump_to_hit):
+        self.window = tk.Toplevel(parent)
+        self.window.title("로그 검색")
+        self.window.geometry("800x400")
+
+        top = ttk.Frame(self.window)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(top, text="검색어:").pack(side=tk.LEFT)
+        self.pattern_entry = ttk.Entry(top, width=30)
+        self.pattern_entry.pack(side=tk.LEFT, padx=(5, 5))
+        self.pattern_entry.bind("<Return>", lambda event: start_search())
+        self.regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="정규식", variable=self.regex_var).pack(side=tk.LEFT)
+        self.ignore_case_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(top, text="대소문자 무시", variable=self.ignore_case_var).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(top, text="검색", command=start_search).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(top, text="중지", command=stop_search).pack(side=tk.LEFT, padx=(5, 0))
+
+        path_frame = ttk.Frame(self.window)
+        path_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(path_frame, text="폴더:").pack(side=tk.LEFT)
+        self.path_entry = ttk.Entry(path_frame)
+        self.path_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        self.path_entry.insert(0, default_path)
+
+        list_frame = ttk.Frame(self.window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.result_list = tk.Listbox(list_frame, yscrollcommand=scrollbar.set)
+        self.result_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.result_list.yview)
+        self.result_list.bind("<Double-Button-1>", lambda event: jump_to_hit(self.selected_index()))
+
+        self.status_label = ttk.Label(self.window, text="")
+        self.status_label.pack(anchor=tk.W, padx=5, pady=(0, 5))
+
+    def selected_index(self):
+        selection = self.result_list.curselection()
+        return selection[0] if selection else None
+
+    def clear(self):
+        self.result_list.delete(0, tk.END)
+
+    def add_hits(self, hits):
+        self.result_list.insert(tk.END, *(f"{os.path.basename(hit.path)}:{hit.line_number}: {hit.text}" for hit in hits))
+
+    def set_status(self, text):
+        self.status_label.config(text=text)
+
+class StatsPanel:
+    # 단계별 카운터와 지연 분포를 주기적으로 보여 준다
+    def __init__(self, parent, dump_stats, reset_stats):
+        self.window = tk.Toplevel(parent)
+        self.window.title("파이프라인 통계")
+        self.window.geometry("760x360")
+
+        top = ttk.Frame(self.window)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(top, text="JSON 저장", command=dump_stats).pack(side=tk.LEFT)
+        ttk.Button(top, text="분포 초기화", command=reset_stats).pack(side=tk.LEFT, padx=(5, 0))
+
+        self.text = tk.Text(self.window, font=("Courier", 9), wrap=tk.NONE)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.text.config(state=tk.DISABLED)
+
+    def show(self, text):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", text)
+        self.text.config(state=tk.DISABLED)
+
+class PlotPanel:
+    # 뽑아 낸 숫자 필드 하나를 시간 축 그래프와 구간 통계로 보여 준다.
+    # 점은 부르는 쪽이 캔버스 폭에 맞게 줄여서 넘긴다
+    WINDOWS = [("10초", 10), ("1분", 60), ("10분", 600), ("전체", None)]
+
+    def __init__(self, parent, export_fields, redraw):
+        self.window = tk.Toplevel(parent)
+        self.window.title("필드 그래프")
+        self.window.geometry("800x380")
+
+        top = ttk.Frame(self.window)
+        top.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(top, text="필드:").pack(side=tk.LEFT, padx=(0, 5))
+        self.series_combo = ttk.Combobox(top, width=30, state="readonly")
+        self.series_combo.pack(side=tk.LEFT, padx=(0, 5))
+        self.series_combo.bind("<<ComboboxSelected>>", lambda event: redraw())
+        ttk.Label(top, text="구간:").pack(side=tk.LEFT, padx=(5, 5))
+        self.window_combo = ttk.Combobox(top, values=[name for name, _ in self.WINDOWS], width=5, state="readonly")
+        self.window_combo.set(self.WINDOWS[1][0])
+        self.window_combo.pack(side=tk.LEFT)
+        self.window_combo.bind("<<ComboboxSelected>>", lambda event: redraw())
+        ttk.Button(top, text="CSV/NPZ 저장", command=export_fields).pack(side=tk.LEFT, padx=(10, 0))
+
+        self.canvas = tk.Canvas(self.window, background="white", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.stats_label = ttk.Label(self.window, text="", font=("Courier", 9))
+        self.stats_label.pack(fill=tk.X, padx=5, pady=5)
+
+    def selected_series(self):
+        return self.series_combo.get()
+
+    def set_series(self, names):
+        if list(self.series_combo['values']) != names:
+            self.series_combo['values'] = names
+        if names and self.series_combo.get() not in names:
+            self.series_combo.set(names[0])
+
+    def window_seconds(self):
+        return dict(self.WINDOWS).get(self.window_combo.get())
+
+    def plot_width(self):
+        return max(10, self.canvas.winfo_width() - 70)
+
+    def draw(self, points, start_ns, end_ns, stats_text):
+        canvas = self.canvas
+        canvas.delete("all")
+        self.stats_label.config(text=stats_text)
+        if not points or end_ns <= start_ns:
+            return
+        width = self.plot_width()
+        height = max(10, canvas.winfo_height() - 20)
+        low = min(value for _, value in points)
+        high = max(value for _, value in points)
+        if high == low:
+            high, low = high + 1, low - 1
+        x_scale = width / (end_ns - start_ns)
+        y_scale = (height - 10) / (high - low)
+        coords = []
+        for timestamp_ns, value in points:
+            coords.append(60 + (timestamp_ns - start_ns) * x_scale)
+            coords.append(5 + (high - value) * y_scale)
+        if len(coords) == 2:
+            coords.extend(coords)
+        canvas.create_line(60, 5, 60, height - 5, fill="gray")
+        canvas.create_text(55, 5, text=f"{high:g}", anchor=tk.NE, font=("Courier", 8))
+        canvas.create_text(55, height - 5, text=f"{low:g}", anchor=tk.SE, font=("Courier", 8))
+        canvas.create_text(60, height + 8, text=f"-{(end_ns - start_ns) / 1e9:g}s", anchor=tk.W,
+                           font=("Courier", 8))
+        canvas.create_line(*coords, fill="blue")
+
 class CustomButtonsFrame:
     def __init__(self, parent):
         self.frame = ttk.Frame(parent)
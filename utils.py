@@ -1,8 +1,19 @@
 import os
+import re
 import sys
+import time
 import datetime
 import ctypes
 
+TIMESTAMP_PRECISIONS = ["s", "ms", "us"]
+
+# 시작 시 한 번만 벽시계와 단조 시계를 맞춰 두고 이후에는 단조 시계만 읽는다
+_WALL_ANCHOR_NS = time.time_ns()
+_MONOTONIC_ANCHOR_NS = time.monotonic_ns()
+_second_cache = (None, "")
+_parse_cache = (None, 0)
+_LOG_TIMESTAMP = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:\.(\d{1,9}))? - ')
+
 def get_script_dir():
     if getattr(sys, 'frozen', False):
         return os.path.dirname(sys.executable)
@@ -11,6 +22,42 @@ def get_script_dir():
 def get_timestamp():
     return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+def capture_timestamp_ns():
+    return _WALL_ANCHOR_NS + (time.monotonic_ns() - _MONOTONIC_ANCHOR_NS)
+
+def format_timestamp(timestamp_ns, precision="s"):
+    global _second_cache
+    seconds, remainder = divmod(timestamp_ns, 1_000_000_000)
+    cached_second, text = _second_cache
+    if cached_second != seconds:
+        # 같은 초에 들어온 줄들은 strftime 결과를 재사용한다
+        text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+        _second_cache = (seconds, text)
+    if precision == "ms":
+        return f"{text}.{remainder // 1_000_000:03d}"
+    if precision == "us":
+        return f"{text}.{remainder // 1_000:06d}"
+    return text
+
+def format_log_entry(timestamp_ns, text, precision="s"):
+    if timestamp_ns is None:
+        return text
+    return f"{format_timestamp(timestamp_ns, precision)} - {text}"
+
+def parse_log_timestamp(line):
+    # format_log_entry 로 쓴 줄에서 (시각 ns, 본문) 을 꺼낸다. 시각이 없으면 (None, 줄)
+    global _parse_cache
+    match = _LOG_TIMESTAMP.match(line)
+    if match is None:
+        return None, line
+    second_text, fraction = match.groups()
+    cached_text, seconds = _parse_cache
+    if cached_text != second_text:
+        seconds = int(time.mktime(time.strptime(second_text, "%Y-%m-%d %H:%M:%S")))
+        _parse_cache = (second_text, seconds)
+    nanoseconds = int(fraction.ljust(9, "0")) if fraction else 0
+    return seconds * 1_000_000_000 + nanoseconds, line[match.end():]
+
 def prevent_screen_sleep():
     if sys.platform == 'win32':
         ctypes.windll.kernel32.SetThreadExecutionState(0x80000002)